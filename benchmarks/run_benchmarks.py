@@ -0,0 +1,379 @@
+"""
+Times the hot paths of palm on synthetic data and writes the
+results as JSON, so runs on two commits can be compared.
+
+Usage:
+------
+python benchmarks/run_benchmarks.py --days 2520 --symbols 500 --output before.json
+python benchmarks/run_benchmarks.py --days 2520 --symbols 500 --output after.json
+python benchmarks/run_benchmarks.py --compare before.json after.json
+python benchmarks/run_benchmarks.py --import-time
+"""
+
+import argparse
+from datetime import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from palm.backtestsession import BacktestSubscribeSession, Strategy
+from palm.broker.simulated_broker import SimulatedBroker
+from palm.context import ContextEOD, Schedule
+from palm.data import synthetic_equity_eod
+from palm.orders import MarketOrder
+from palm.trader import SimulatedTrader
+
+
+def bench_eod_slice(eod_data, config):
+    """
+    Slices of a year of data from random start dates.
+    """
+    dates = eod_data["dates"]
+    generator = np.random.default_rng(0)
+    starts = generator.integers(0, max(len(dates) - 252, 1), size=100)
+    for start in starts:
+        stop = min(start + 252, len(dates) - 1)
+        eod_data.slice(dates[start], dates[stop])
+    return len(starts)
+
+
+def bench_context_iter(eod_data, config):
+    """
+    Iterating over every tick of the context.
+    """
+    events = 0
+    for _ in ContextEOD(eod_data):
+        events += 1
+    return events
+
+
+def bench_broker_submit_order(eod_data, config):
+    """
+    A buy of every symbol, then a sell of half of each.
+    """
+    context = ContextEOD(eod_data, start_index=_first_complete_day(eod_data))
+    broker = SimulatedBroker(context, 1e12, use_position_book=config.position_book)
+    for symbol in eod_data.symbols:
+        broker.submit_order(MarketOrder.Buy(symbol, 10))
+    for symbol in eod_data.symbols:
+        broker.submit_order(MarketOrder.Sell(symbol, 5))
+    return 2 * len(eod_data.symbols)
+
+
+def bench_broker_portfolio_value(eod_data, config):
+    """
+    Valuing a portfolio holding every symbol, on each of 100 ticks.
+    """
+    context = ContextEOD(eod_data, start_index=_first_complete_day(eod_data))
+    broker = SimulatedBroker(context, 1e12, use_position_book=config.position_book)
+    broker.submit_orders(np.full(len(eod_data.symbols), 10.0))
+    calls = 0
+    for _ in range(100):
+        broker.portfolio_value()
+        calls += 1
+        if not context.can_still_update():
+            break
+        context.update()
+    return calls
+
+
+def bench_trader_rebalance(eod_data, config):
+    """
+    Rebalancing to random weights on each of 50 closes.
+    """
+    start = _first_complete_day(eod_data)
+    context = ContextEOD(eod_data, start_index=start)
+    trader = SimulatedTrader(context, 1e9, use_position_book=config.position_book)
+    generator = np.random.default_rng(0)
+    N = len(eod_data.symbols)
+    calls = 0
+    for date_index in range(start, min(start + 50, eod_data.shape[0])):
+        context.advance_to(date_index)
+        trader.rebalance_to_weights(generator.dirichlet(np.ones(N)))
+        calls += 1
+    return calls
+
+
+class _EqualWeight(Strategy):
+    """
+    Rebalances to equal weights over the symbols trading, on the
+    ticks of its schedule, or only on `rebalance_ticks` if given.
+    """
+
+    def __init__(self, symbols, schedule=None, rebalance_ticks=None):
+        self.symbols = symbols
+        self.schedule = schedule
+        self._rebalance_ticks = rebalance_ticks
+
+    def on_update(self, historical_data, context, trader):
+        if self._rebalance_ticks is not None:
+            if context.current_tick_index() not in self._rebalance_ticks:
+                return
+        prices = context.current_market_prices()
+        trading = np.isfinite(prices)
+        weights = np.where(trading, 1.0 / max(np.sum(trading), 1), np.nan)
+        trader.rebalance_to_weights(weights)
+
+
+def bench_session_run(eod_data, config):
+    """
+    Full session rebalancing at each month end through a schedule,
+    recording daily closes. Returns the ticks simulated.
+    """
+    strategy = _EqualWeight(eod_data.symbols, schedule=Schedule.month_end())
+    return _run_session(strategy, eod_data, config)
+
+
+def bench_session_run_every_tick(eod_data, config):
+    """
+    As session_run, but with the strategy called on every tick
+    and only rebalancing at month ends.
+    """
+    month_ends = set(Schedule.month_end().compile(eod_data["dates"]).tolist())
+    strategy = _EqualWeight(eod_data.symbols, rebalance_ticks=month_ends)
+    return _run_session(strategy, eod_data, config)
+
+
+def _run_session(strategy, eod_data, config):
+
+    session = BacktestSubscribeSession(
+        strategy,
+        eod_data,
+        look_back_days=min(30, eod_data.shape[0] - 1),
+        initial_capital=1e9,
+        use_position_book=config.position_book,
+    )
+    start_tick = session._context.current_tick_index()
+    session.run()
+    return session._context.current_tick_index() - start_tick + 1
+
+
+benchmarks = {
+    "eod_slice": bench_eod_slice,
+    "context_iter": bench_context_iter,
+    "broker_submit_order": bench_broker_submit_order,
+    "broker_portfolio_value": bench_broker_portfolio_value,
+    "trader_rebalance": bench_trader_rebalance,
+    "session_run": bench_session_run,
+    "session_run_every_tick": bench_session_run_every_tick,
+}
+
+
+## Seconds each module may take to import in a fresh interpreter,
+## after numpy and pandas, which every use of palm needs anyway.
+import_time_budget = {
+    "palm": 0.01,
+    "palm.backtestsession": 0.15,
+}
+
+
+def measure_import_time(repeat=3):
+    """
+    Best time to import each module of `import_time_budget`, each
+    in a fresh interpreter, and the modules it shouldn't import.
+    """
+    results = {}
+    for module in import_time_budget.keys():
+        times = []
+        for _ in range(repeat):
+            output = subprocess.check_output(
+                [sys.executable, "-c", _import_time_script.format(module=module)],
+                cwd=os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."),
+            )
+            measured = json.loads(output)
+            times.append(measured["time"])
+        results[module] = {
+            "time": min(times),
+            "budget": import_time_budget[module],
+            "within_budget": min(times) <= import_time_budget[module],
+            "unexpected_modules": measured["unexpected_modules"],
+        }
+    return results
+
+
+_import_time_script = """
+import json, sys, time
+import numpy, pandas
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+unexpected = [name for name in ("polygon", "tqdm") if name in sys.modules]
+print(json.dumps({{"time": elapsed, "unexpected_modules": unexpected}}))
+"""
+
+
+def _first_complete_day(eod_data):
+    ## First day every symbol has a price, so orders don't fail.
+    complete = np.flatnonzero(~np.any(np.isnan(eod_data["close"]), axis=1))
+    return int(complete[0]) if len(complete) > 0 else 0
+
+
+def run(config):
+
+    data_started = time.perf_counter()
+    eod_data = synthetic_equity_eod(
+        n_days=config.days,
+        n_symbols=config.symbols,
+        seed=config.seed,
+        ragged=config.ragged,
+        nan_fraction=config.nan_fraction,
+    )
+    data_time = time.perf_counter() - data_started
+
+    names = config.only if config.only else list(benchmarks.keys())
+    results = {}
+    for name in names:
+        times = []
+        operations = 0
+        for _ in range(config.repeat):
+            started = time.perf_counter()
+            operations = benchmarks[name](eod_data, config)
+            times.append(time.perf_counter() - started)
+        results[name] = {
+            "times": times,
+            "min": min(times),
+            "median": float(np.median(times)),
+            "operations": operations,
+            "operations_per_second": (
+                operations / min(times) if min(times) > 0 else None
+            ),
+        }
+        print(
+            "{:<24} {:>10.4f}s {:>14.0f} ops/s".format(
+                name, min(times), results[name]["operations_per_second"] or 0.0
+            ),
+            file=sys.stderr,
+        )
+
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "config": {
+            "days": config.days,
+            "symbols": config.symbols,
+            "seed": config.seed,
+            "ragged": config.ragged,
+            "nan_fraction": config.nan_fraction,
+            "position_book": config.position_book,
+            "repeat": config.repeat,
+        },
+        "data_time": data_time,
+        "results": results,
+    }
+
+
+def compare(before_path, after_path):
+    """
+    Prints the ratio of the best times of two result files,
+    above 1 meaning the second is slower.
+    """
+    with open(before_path) as before_file, open(after_path) as after_file:
+        before = json.load(before_file)
+        after = json.load(after_file)
+    if before["config"] != after["config"]:
+        print("Warning: the runs have different configs.", file=sys.stderr)
+
+    print("{:<24} {:>10} {:>10} {:>8}".format("benchmark", "before", "after", "ratio"))
+    for name in before["results"].keys():
+        if name not in after["results"]:
+            continue
+        before_time = before["results"][name]["min"]
+        after_time = after["results"][name]["min"]
+        print(
+            "{:<24} {:>9.4f}s {:>9.4f}s {:>8.2f}".format(
+                name, before_time, after_time, after_time / before_time
+            )
+        )
+
+
+def check_import_time(repeat):
+    """
+    Prints the import times and exits with status 1 if any is over
+    budget or imports a module it shouldn't.
+    """
+    results = measure_import_time(repeat)
+    failed = False
+    for (module, result) in results.items():
+        print(
+            "{:<24} {:>9.4f}s budget {:>7.4f}s {}".format(
+                module,
+                result["time"],
+                result["budget"],
+                ", ".join(result["unexpected_modules"]),
+            )
+        )
+        failed |= not result["within_budget"] or len(result["unexpected_modules"]) > 0
+    if failed:
+        sys.exit(1)
+
+
+def _git_commit():
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "rev-parse", "HEAD"],
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+                stderr=subprocess.DEVNULL,
+            )
+            .decode()
+            .strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_arguments(argv=None):
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--days", type=int, default=2520)
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--ragged", action="store_true")
+    parser.add_argument("--nan-fraction", type=float, default=0.0)
+    parser.add_argument("--position-book", action="store_true")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="+", choices=list(benchmarks.keys()))
+    parser.add_argument("--output", help="JSON file to write, stdout if not given.")
+    parser.add_argument(
+        "--import-time",
+        action="store_true",
+        help="Check the import time of palm against its budget instead of running.",
+    )
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("BEFORE", "AFTER"),
+        help="Compare two result files instead of running.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+
+    config = parse_arguments(argv)
+    if config.compare:
+        compare(*config.compare)
+        return
+    if config.import_time:
+        check_import_time(config.repeat)
+        return
+
+    output = json.dumps(run(config), indent=2)
+    if config.output is None:
+        print(output)
+    else:
+        with open(config.output, "w") as output_file:
+            output_file.write(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,134 @@
-from .broker import *
-from .context import *
-from .data import *
-from .orders import *
-from .positions import *
-from .trader import *
-from .trades import *
-from .backtestsession import *
+"""
+Names are imported from their module on first use (PEP 562), so
+`import palm` is cheap and e.g. `palm.SimulatedTrader` only imports
+the trader and what it needs. The names are those a star import of
+each subpackage gives, mapped to the module defining them in
+`_modules`, and subpackages resolve as submodules, e.g. `palm.data`.
+"""
+
+import importlib
+
+_subpackages = [
+    "analytics",
+    "backtestsession",
+    "broker",
+    "context",
+    "data",
+    "orders",
+    "positions",
+    "research",
+    "trader",
+    "trades",
+    "utils",
+]
+
+## Module defining each public name, relative to palm.
+_modules = {
+    ".analytics.performance": ["performance_summary"],
+    ".backtestsession.backtestsession": ["BacktestSubscribeSession", "Strategy"],
+    ".backtestsession.batch_session": ["BacktestBatchSession"],
+    ".backtestsession.multi_session": ["MultiStrategySession"],
+    ".backtestsession.recorder": ["record_granularities", "SessionRecorder"],
+    ".backtestsession.sweep": ["parameter_grid", "run_parameter_sweep"],
+    ".broker.cash_account": [
+        "CashAccount",
+        "DepositResponse",
+        "DepositResult",
+        "Transaction",
+        "transaction_ledger_dtype",
+        "TransactionRecord",
+        "WithdrawalResponse",
+        "WithdrawalResult",
+    ],
+    ".broker.simulated_broker": ["fill_log_dtype", "SimulatedBroker"],
+    ".context.context_observable": ["ContextObservable"],
+    ".context.daily_bar_context": [
+        "ContextEOD",
+        "EODEvent",
+        "tick_index",
+        "TimeInMarketDay",
+    ],
+    ".context.schedule": [
+        "DateListSchedule",
+        "EveryNDaysSchedule",
+        "MonthEndSchedule",
+        "Schedule",
+        "WeeklySchedule",
+    ],
+    ".data.data_utils": [
+        "equity_eod_from_polygon_columns",
+        "polygon_symbol_indexed_to_OHCLV_indexed",
+        "pull_polygon_eod",
+    ],
+    ".data.eod_cache": [
+        "day_number",
+        "day_number_to_string",
+        "empty_polygon_columns",
+        "merge_polygon_columns",
+        "milliseconds_per_day",
+        "polygon_aggregate_columns",
+        "polygon_field_columns",
+        "polygon_results_to_columns",
+        "PolygonEODCache",
+        "select_days",
+        "unique_keeping_last",
+    ],
+    ".data.equity_eod": ["equity_eod_fields", "EquityEOD"],
+    ".data.equity_eod_window": ["EquityEODWindow"],
+    ".data.indicators": ["indicator_kinds", "IndicatorCache"],
+    ".data.ingest": ["ingest_file_formats", "load_equity_eod", "read_bars"],
+    ".data.synthetic": ["synthetic_equity_eod"],
+    ".data.trading_calendar": ["to_day_number", "to_day_numbers", "TradingCalendar"],
+    ".orders.market_order": ["MarketOrder", "MarketOrderStatus", "MarketOrderType"],
+    ".positions.long_position": ["LongPosition"],
+    ".positions.position": ["Position"],
+    ".positions.position_book": ["PositionBook"],
+    ".positions.short_position": ["ShortPosition"],
+    ".trader.exit_rules": ["ExitRuleBook"],
+    ".trader.trader": [
+        "SimulatedTrader",
+        "weights_as_a_percentage_of_total_portfolio_value",
+    ],
+    ".trades.trade": ["Trade"],
+    ".utils.generate_id": [
+        "generate_hex_id",
+        "IdSequence",
+        "active_sequence",
+        "next_id",
+        "next_sequence_id",
+    ],
+    ".utils.growable_array": ["GrowableRecordArray"],
+    ".utils.profiler": ["Profiler"],
+    ".utils.rate_limiter": ["RateLimiter"],
+}
+
+_module_of = dict(
+    (name, module) for (module, names) in _modules.items() for name in names
+)
+
+__all__ = sorted(_module_of.keys()) + [
+    "backtestsession",
+    "broker",
+    "context",
+    "data",
+    "orders",
+    "positions",
+    "trader",
+    "trades",
+]
+
+
+def __getattr__(name):
+    if name in _module_of:
+        value = getattr(importlib.import_module(_module_of[name], __name__), name)
+    elif name in _subpackages:
+        value = importlib.import_module("." + name, __name__)
+    else:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    ## Cached, so __getattr__ isn't called for it again.
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals().keys()) | set(_module_of.keys()) | set(_subpackages))
@@ -0,0 +1,349 @@
+"""
+Performance analytics over equity curves, i.e. portfolio values
+such as SessionRecorder.portfolio_value or
+BacktestBatchSession.portfolio_value.
+
+Every function takes time along `axis`, 0 by default as for a TxN
+price matrix, and is vectorized over the other axes. A sweep of S
+equity curves of length T can be scored in one pass, either as a
+TxS matrix or as an SxT matrix with axis=1.
+
+Rolling versions return arrays aligned with the equity curve: the
+value at t uses the `window` returns up to t, and is NaN until
+there are `window` of them. Rolling means and standard deviations
+are differences of cumulative sums, so they take O(T) time and
+memory whatever the window, instead of one copy of every window.
+"""
+
+import numpy as np
+
+from ..research.research_utils import returns_from_series
+
+
+def returns(equity: np.ndarray, axis: int = 0):
+    """
+    Period returns of equity curves, one shorter along `axis`.
+    """
+    equity = np.moveaxis(np.asarray(equity, dtype=np.float64), axis, 0)
+    return np.moveaxis(returns_from_series(equity), 0, axis)
+
+
+def sharpe_ratio(equity: np.ndarray, periods_per_year: int = 252, axis: int = 0):
+    """
+    Annualized mean over sample standard deviation of the returns,
+    NaN where the returns don't vary.
+    """
+    return _along_time(equity, axis, _sharpe, periods_per_year=periods_per_year)
+
+
+def sortino_ratio(equity: np.ndarray, periods_per_year: int = 252, axis: int = 0):
+    """
+    Annualized mean return over the downside deviation,
+    sqrt(mean(min(return, 0)^2)). NaN without losing periods.
+    """
+    return _along_time(equity, axis, _sortino, periods_per_year=periods_per_year)
+
+
+def annualized_volatility(
+    equity: np.ndarray, periods_per_year: int = 252, axis: int = 0
+):
+    return _along_time(equity, axis, _volatility, periods_per_year=periods_per_year)
+
+
+def total_return(equity: np.ndarray, axis: int = 0):
+    equity = np.moveaxis(np.asarray(equity, dtype=np.float64), axis, 0)
+    return equity[-1] / equity[0] - 1.0
+
+
+def drawdowns(equity: np.ndarray, axis: int = 0):
+    """
+    Fraction below the running peak at each period, same shape as `equity`.
+    """
+    equity = np.moveaxis(np.asarray(equity, dtype=np.float64), axis, 0)
+    return np.moveaxis(_drawdowns(equity), 0, axis)
+
+
+def max_drawdown(equity: np.ndarray, axis: int = 0):
+    equity = np.moveaxis(np.asarray(equity, dtype=np.float64), axis, 0)
+    return np.max(_drawdowns(equity), axis=0)
+
+
+def max_drawdown_duration(equity: np.ndarray, axis: int = 0):
+    """
+    Longest number of periods spent below a previous peak.
+    """
+    equity = np.moveaxis(np.asarray(equity, dtype=np.float64), axis, 0)
+    return np.max(_periods_since_peak(equity), axis=0)
+
+
+def hit_rate(equity: np.ndarray, axis: int = 0):
+    """
+    Fraction of the periods with a non-zero return that were
+    gains, NaN if the equity never moved.
+    """
+    return _along_time(equity, axis, _hit_rate)
+
+
+def turnover(traded_value: np.ndarray, equity: np.ndarray, axis: int = 0):
+    """
+    Mean of the value traded in each period over the equity
+    at that period, e.g. 2.0 for a portfolio fully sold and
+    bought back every period.
+    """
+    traded_value = np.moveaxis(np.asarray(traded_value, dtype=np.float64), axis, 0)
+    equity = np.moveaxis(np.asarray(equity, dtype=np.float64), axis, 0)
+    return np.mean(traded_value / equity, axis=0)
+
+
+def traded_value_from_fills(fills: np.ndarray, date_indices: np.ndarray):
+    """
+    Value traded per recorded period from a broker's fill log,
+    see SimulatedBroker.fills. Fills are summed into the last
+    entry of `date_indices` (sorted) at or before their date index,
+    e.g. date_indices = SessionRecorder.ticks // 2.
+    """
+    date_indices = np.asarray(date_indices)
+    period = np.searchsorted(date_indices, fills["date_index"], side="right") - 1
+    in_range = period >= 0
+    value = np.abs(fills["quantity"] * fills["price"])
+    return np.bincount(
+        period[in_range], weights=value[in_range], minlength=len(date_indices)
+    )
+
+
+def traded_value_from_holdings(holdings: np.ndarray, prices: np.ndarray):
+    """
+    Value traded per period to go from one row of a TxN holdings
+    matrix to the next, starting from no holdings, at TxN prices,
+    e.g. BacktestBatchSession.holdings and the trade prices.
+    """
+    holdings = np.asarray(holdings, dtype=np.float64)
+    traded = np.diff(holdings, axis=0, prepend=np.zeros((1,) + holdings.shape[1:]))
+    value = np.where(traded != 0, np.abs(traded) * prices, 0.0)
+    return np.sum(value, axis=-1)
+
+
+def performance_summary(equity: np.ndarray, periods_per_year: int = 252, axis: int = 0):
+    """
+    Dictionary of the scores of each equity curve: "total_return",
+    "annualized_volatility", "sharpe_ratio", "sortino_ratio",
+    "max_drawdown", "max_drawdown_duration" and "hit_rate".
+    """
+    return {
+        "total_return": total_return(equity, axis=axis),
+        "annualized_volatility": annualized_volatility(
+            equity, periods_per_year, axis=axis
+        ),
+        "sharpe_ratio": sharpe_ratio(equity, periods_per_year, axis=axis),
+        "sortino_ratio": sortino_ratio(equity, periods_per_year, axis=axis),
+        "max_drawdown": max_drawdown(equity, axis=axis),
+        "max_drawdown_duration": max_drawdown_duration(equity, axis=axis),
+        "hit_rate": hit_rate(equity, axis=axis),
+    }
+
+
+def rolling_sharpe_ratio(
+    equity: np.ndarray, window: int, periods_per_year: int = 252, axis: int = 0
+):
+    return _rolling_returns(
+        equity, window, axis, _rolling_sharpe, periods_per_year=periods_per_year
+    )
+
+
+def rolling_sortino_ratio(
+    equity: np.ndarray, window: int, periods_per_year: int = 252, axis: int = 0
+):
+    return _rolling_returns(
+        equity, window, axis, _rolling_sortino, periods_per_year=periods_per_year
+    )
+
+
+def rolling_annualized_volatility(
+    equity: np.ndarray, window: int, periods_per_year: int = 252, axis: int = 0
+):
+    return _rolling_returns(
+        equity, window, axis, _rolling_volatility, periods_per_year=periods_per_year
+    )
+
+
+def rolling_hit_rate(equity: np.ndarray, window: int, axis: int = 0):
+    return _rolling_returns(equity, window, axis, _rolling_hit_rate)
+
+
+def rolling_max_drawdown(equity: np.ndarray, window: int, axis: int = 0):
+    """
+    Max drawdown over the last `window` + 1 equity values,
+    i.e. the `window` returns up to each period.
+    """
+    return _rolling_equity(equity, window, axis, _rolling_drawdown_scores)[0]
+
+
+def rolling_max_drawdown_duration(equity: np.ndarray, window: int, axis: int = 0):
+    return _rolling_equity(equity, window, axis, _rolling_drawdown_scores)[1]
+
+
+def rolling_turnover(
+    traded_value: np.ndarray, equity: np.ndarray, window: int, axis: int = 0
+):
+    """
+    Mean turnover over the last `window` periods.
+    """
+    traded_value = np.moveaxis(np.asarray(traded_value, dtype=np.float64), axis, 0)
+    equity = np.moveaxis(np.asarray(equity, dtype=np.float64), axis, 0)
+    ratio = traded_value / equity
+    rolled = np.full(ratio.shape, np.nan)
+    if len(ratio) >= window:
+        rolled[window - 1 :] = _rolling_mean(ratio, window)
+    return np.moveaxis(rolled, 0, axis)
+
+
+## Reductions over the returns along axis 0.
+
+
+def _sharpe(r, periods_per_year):
+    std = np.std(r, axis=0, ddof=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.sqrt(periods_per_year) * np.mean(r, axis=0) / std
+    return np.where(std > 0, sharpe, np.nan)
+
+
+def _sortino(r, periods_per_year):
+    downside = np.sqrt(np.mean(np.minimum(r, 0.0) ** 2, axis=0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sortino = np.sqrt(periods_per_year) * np.mean(r, axis=0) / downside
+    return np.where(downside > 0, sortino, np.nan)
+
+
+def _volatility(r, periods_per_year):
+    return np.sqrt(periods_per_year) * np.std(r, axis=0, ddof=1)
+
+
+def _hit_rate(r):
+    moved = np.sum(r != 0, axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = np.sum(r > 0, axis=0) / moved
+    return np.where(moved > 0, rate, np.nan)
+
+
+def _drawdowns(equity):
+    return 1.0 - equity / np.maximum.accumulate(equity, axis=0)
+
+
+def _periods_since_peak(equity):
+    periods = np.arange(len(equity)).reshape((-1,) + (1,) * (equity.ndim - 1))
+    at_peak = equity >= np.maximum.accumulate(equity, axis=0)
+    last_peak = np.maximum.accumulate(np.where(at_peak, periods, 0), axis=0)
+    return periods - last_peak
+
+
+def _along_time(equity, axis, reduction, **kwargs):
+    r = np.moveaxis(returns(equity, axis=axis), axis, 0)
+    return reduction(r, **kwargs)
+
+
+def _rolling_returns(equity, window, axis, reduction, **kwargs):
+    """
+    Applies a rolling reduction, returning one value per window of
+    returns along axis 0, aligned with the equity curve.
+    """
+    r = np.moveaxis(returns(equity, axis=axis), axis, 0)
+    rolled = np.full((len(r) + 1,) + r.shape[1:], np.nan)
+    if len(r) >= window:
+        rolled[window:] = reduction(r, window, **kwargs)
+    return np.moveaxis(rolled, 0, axis)
+
+
+def _rolling_equity(equity, window, axis, reduction):
+
+    equity = np.moveaxis(np.asarray(equity, dtype=np.float64), axis, 0)
+    rolled = [np.full(equity.shape, np.nan) for _ in range(2)]
+    if len(equity) > window:
+        for (scores, rolled_scores) in zip(reduction(equity, window), rolled):
+            rolled_scores[window:] = scores
+    return [np.moveaxis(scores, 0, axis) for scores in rolled]
+
+
+## Rolling reductions, one value per window of `window` values
+## along axis 0, i.e. len(x) - window + 1 of them.
+
+
+def _rolling_sum(x, window):
+    ## Differences of the cumulative sums, exact for integer counts.
+    sums = np.cumsum(x, axis=0)
+    sums = np.concatenate([np.zeros((1,) + sums.shape[1:], sums.dtype), sums])
+    return sums[window:] - sums[:-window]
+
+
+def _rolling_mean(x, window):
+    ## NaN for windows with a non finite value, as np.mean of them would
+    ## be, without letting them spoil the cumulative sums of later windows.
+    finite = np.isfinite(x)
+    mean = _rolling_sum(np.where(finite, x, 0.0), window) / window
+    return np.where(_rolling_sum(~finite, window) == 0, mean, np.nan)
+
+
+def _rolling_std(x, window):
+    ## Sample standard deviation, from the mean of the squares less the
+    ## squared mean. Centering on the mean of all values first keeps the
+    ## cumulative sums small, and windows with no change are exactly 0.
+    if window < 2:
+        return np.full((len(x) - window + 1,) + x.shape[1:], np.nan)
+    finite = np.isfinite(x)
+    center = np.sum(np.where(finite, x, 0.0), axis=0) / np.maximum(
+        np.sum(finite, axis=0), 1
+    )
+    centered = x - center
+    mean = _rolling_mean(centered, window)
+    variance = (_rolling_mean(centered**2, window) - mean**2) * (
+        window / (window - 1)
+    )
+    std = np.sqrt(np.maximum(variance, 0.0))
+    changes = _rolling_sum(np.diff(x, axis=0) != 0, window - 1)
+    return np.where(changes > 0, std, np.where(np.isnan(std), np.nan, 0.0))
+
+
+def _rolling_sharpe(r, window, periods_per_year):
+    std = _rolling_std(r, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.sqrt(periods_per_year) * _rolling_mean(r, window) / std
+    return np.where(std > 0, sharpe, np.nan)
+
+
+def _rolling_sortino(r, window, periods_per_year):
+    downside = np.sqrt(np.maximum(_rolling_mean(np.minimum(r, 0.0) ** 2, window), 0.0))
+    losses = _rolling_sum(r < 0, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sortino = np.sqrt(periods_per_year) * _rolling_mean(r, window) / downside
+    return np.where(losses > 0, sortino, np.nan)
+
+
+def _rolling_volatility(r, window, periods_per_year):
+    return np.sqrt(periods_per_year) * _rolling_std(r, window)
+
+
+def _rolling_hit_rate(r, window):
+    moved = _rolling_sum(r != 0, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = _rolling_sum(r > 0, window) / moved
+    return np.where(moved > 0, rate, np.nan)
+
+
+def _rolling_drawdown_scores(equity, window):
+    """
+    Max drawdown and its duration over every `window` + 1 equity
+    values, walking the windows in step, one offset at a time, so
+    only arrays of one value per window are held.
+    """
+    count = len(equity) - window
+    peak = equity[:count].copy()
+    peak_offset = np.zeros(peak.shape, dtype=np.int64)
+    max_drawdown = np.zeros(peak.shape)
+    max_duration = np.zeros(peak.shape, dtype=np.int64)
+    for offset in range(1, window + 1):
+        values = equity[offset : offset + count]
+        at_peak = values >= peak
+        peak = np.where(at_peak, values, peak)
+        peak_offset = np.where(at_peak, offset, peak_offset)
+        max_drawdown = np.maximum(max_drawdown, 1.0 - values / peak)
+        max_duration = np.maximum(max_duration, offset - peak_offset)
+    return (max_drawdown, max_duration)
@@ -1 +1,5 @@
 from .backtestsession import *
+from .batch_session import *
+from .sweep import *
+from .recorder import *
+from .multi_session import *
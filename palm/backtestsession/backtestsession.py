@@ -1,18 +1,34 @@
+from contextlib import nullcontext
 from datetime import datetime
 from functools import reduce
-from pandas.tseries.offsets import BDay
 
 from palm.data.equity_eod import EquityEOD
+from palm.data.equity_eod_window import EquityEODWindow
 
-from ..context import ContextEOD
-from ..data import pull_polygon_eod
+from ..context import ContextEOD, TimeInMarketDay
+from ..context.schedule import Schedule
 from ..trader import SimulatedTrader
+from .recorder import SessionRecorder
+from ..utils.generate_id import IdSequence
+from ..utils.profiler import Profiler
 
 
 class Strategy:
+    ## Ticks on_update is called on, see Schedule. None calls it on
+    ## every tick that trade_on_this_time_event accepts.
+    schedule: Schedule = None
+
     def on_update(self, historical_data, context, trader):
+        """
+        Called on each time event. `historical_data` is an
+        EquityEODWindow over the look back period, which is
+        moved forward in place between calls.
+        """
         pass
 
+    def trade_on_this_time_event(self, time_event):
+        return True
+
     def user_set_symbols_correctly(self):
         has_symbols = hasattr(self, "symbols")
         if not has_symbols:
@@ -71,7 +87,21 @@ class BacktestSubscribeSession:
         eod_data: EquityEOD,
         look_back_days: int = 30,
         initial_capital=10000.0,
+        use_position_book: bool = False,
+        id_seed: int = None,
+        record: str = None,
     ):
+        """
+        id_seed: int, if given the orders, positions and trades made
+            during the run take their ids from a sequence of the
+            session's own starting at it, so two runs give the same ids
+            and their orders and fills can be diffed.
+        record: str, ticks recorded in `results` during the run, "ticks",
+            "closes", "schedule" or "none", see SessionRecorder. By
+            default "closes", or "schedule" when the strategy has a
+            schedule, so the run still skips the ticks in between.
+            With a schedule, every recorded tick is visited.
+        """
         ## Check the strategy first.
         valid, failure_reason = self._validate_strategy(strategy)
         if not valid:
@@ -92,44 +122,146 @@ class BacktestSubscribeSession:
         else:
             raise ValueError(error_message)
 
-        self._look_back_period = BDay(look_back_days)
+        self._id_seed = id_seed
+        self._look_back_days = look_back_days
         self._context = ContextEOD(self._historical_data, start_index = look_back_days)
         self._start_date = self._context.current_date()
 
-        self._trader = SimulatedTrader(self._context, initial_capital)
+        self._trader = SimulatedTrader(
+            self._context, initial_capital, use_position_book=use_position_book
+        )
+
+        self._schedule_ticks = None
+        if strategy.schedule is not None:
+            self._schedule_ticks = strategy.schedule.compile(
+                self._historical_data["dates"], self._context.current_tick_index()
+            )
+        if record is None:
+            record = "closes" if self._schedule_ticks is None else "schedule"
+        self.results = SessionRecorder(
+            self._context,
+            self._trader.broker,
+            granularity=record,
+            schedule_ticks=self._schedule_ticks,
+        )
 
+        self.profile_report = None
         self._has_run = False
 
-    def run(self):
+    def portfolio_value(self):
+        """
+        Recorded portfolio values, see `results`.
+        """
+        return self.results.portfolio_value
 
+    def run(self, profile=False):
+        """
+        profile: bool or Profiler, if set the phases of the run are
+            timed, see `_instrument`, and the ProfileReport is returned
+            and kept in `profile_report`. Off by default, in which
+            case nothing is instrumented.
+        """
         if self._has_run:
             raise RuntimeError("Backtest already run, exiting.")
 
-        self.results = []
+        with _session_ids(self._id_seed):
+            self._run(profile)
+
+        self._has_run = True
+        return self.profile_report
+
+    def _run(self, profile):
+
+        windowed_historical_data = EquityEODWindow(
+            self._historical_data,
+            self._look_back_days,
+            stop=self._context.current_date_index(),
+        )
+
+        profiler = None
+        if profile:
+            profiler = profile if isinstance(profile, Profiler) else Profiler()
+            self._instrument(profiler, windowed_historical_data)
+            start_tick = self._context.current_tick_index()
+            profiler.start()
+
+        try:
+            if self._strategy.schedule is None:
+                for time_event in self._context:
+                    windowed_historical_data.advance_to(
+                        self._context.current_date_index()
+                    )
+                    if self._strategy.trade_on_this_time_event(time_event):
+                        self._strategy.on_update(
+                            windowed_historical_data, self._context, self._trader
+                        )
+                    self.results.record()
+            else:
+                self._run_schedule(windowed_historical_data)
+        finally:
+            if profiler is not None:
+                events = self._context.current_tick_index() - start_tick + 1
+                self.profile_report = profiler.stop(events=events)
+                profiler.detach()
+
+    def _instrument(self, profiler: Profiler, windowed_historical_data):
+        """
+        Phases timed when profiling a run:
 
-        for time_event in self.events():
-            windowed_historical_data = self._historical_data.slice(
-                self._start_date - self._look_back, self._context.current_date()
+        history: moving the look back window.
+        on_update: the strategy.
+        context_update: moving the context a tick, including dispatch.
+        observer_dispatch: notifying the context observers.
+        exit_rules: the trader checking exit rules.
+        broker: processing orders, including cash.
+        cash: cash account withdrawals and deposits.
+        recording: recording results.
+        """
+        broker = self._trader.broker
+        for (obj, method_name, phase) in [
+            (windowed_historical_data, "advance_to", "history"),
+            (self._strategy, "on_update", "on_update"),
+            (self._context, "update", "context_update"),
+            (self._context, "notify_observers", "observer_dispatch"),
+            (self._trader, "on_context_update", "exit_rules"),
+            (broker, "submit_order", "broker"),
+            (broker, "submit_orders", "broker"),
+            (broker.cash_account, "submit_withdrawal_request", "cash"),
+            (broker.cash_account, "submit_deposit_request", "cash"),
+            (self.results, "record", "recording"),
+        ]:
+            profiler.instrument(obj, method_name, phase)
+
+    def _run_schedule(self, windowed_historical_data: EquityEODWindow):
+        """
+        Jumps between the ticks of the strategy schedule. The context
+        still notifies its observers, e.g. the trader checking exit
+        rules, of the ticks in between, but skips them when there
+        are none.
+        """
+        for tick in self._schedule_ticks:
+            self._advance_to_tick(tick)
+            windowed_historical_data.advance_to(self._context.current_date_index())
+            self._strategy.on_update(
+                windowed_historical_data, self._context, self._trader
             )
-            if self._strategy.trade_on_this_time_event(time_event):
-                self._strategy.on_update(
-                    windowed_historical_data, self._context, self._trader
-                )
+            self.results.record()
 
-        self._has_run = True
+        ## Run out the clock so open trades can still exit.
+        self._advance_to_tick(2 * self._context._max_date_index + 1)
+        self.results.record()
+
+    def _advance_to_tick(self, tick):
+        ## Stop at the ticks to be recorded on the way.
+        for recorded_tick in self.results.pending_ticks_before(tick):
+            self._context.advance_to(*_tick_to_date_index_and_time(recorded_tick))
+            self.results.record()
+        self._context.advance_to(*_tick_to_date_index_and_time(tick))
 
     def _validate_strategy(self, strategy: Strategy):
         symbols_set_correctly, message = strategy.user_set_symbols_correctly()
         return symbols_set_correctly, message
 
-    def _events(self):
-        self._context.__iter__()
-        return
-
-    def _sliced_historical_data(self):
-        return self._historical_data.slice(
-            self._start_date - self._look_back, self._context.current_date()
-        )
     def _strategy_symbols_contained_in_historical_data(self, symbols, data):
 
         data_symbols = set(data.symbols)
@@ -137,4 +269,16 @@ class BacktestSubscribeSession:
         error_message = "" if all_contained else "Historical data doesn't contain all symbols needed for strategy."
         return (all_contained, error_message)
 
-        
+
+def _session_ids(id_seed):
+    ## The session's own id sequence while it runs, if it has a seed.
+    if id_seed is None:
+        return nullcontext()
+    return IdSequence(id_seed).activated()
+
+
+def _tick_to_date_index_and_time(tick):
+    date_index, is_closing = divmod(int(tick), 2)
+    if is_closing:
+        return date_index, TimeInMarketDay.Closing
+    return date_index, TimeInMarketDay.Opening
@@ -0,0 +1,131 @@
+import numpy as np
+
+from palm.data.equity_eod import EquityEOD
+from palm.data.equity_eod_window import EquityEODWindow
+
+
+class BacktestBatchSession:
+    """
+    Vectorized backtest for strategies that only produce target weights.
+
+    Instead of walking the context tick by tick and routing
+    MarketOrders through the broker, fills, cash, holdings and
+    portfolio value are computed with whole-array NumPy operations
+    over the open/close arrays of the EquityEOD.
+
+    Weights are given either as a TxN matrix aligned with the rows
+    and symbols of `eod_data`, or as a callable
+    `weights(historical_data, date_index)` returning one row of N
+    weights, where `historical_data` is the same EquityEODWindow a
+    Strategy receives. Rows before `look_back_days` are ignored, a row
+    of all NaN means "do not rebalance", and a NaN weight leaves that
+    symbol untouched.
+
+    On each rebalance row the target share counts are
+    round(weight * portfolio value / price) at the `trade_at` price,
+    exactly as SimulatedTrader.rebalance_to_weights computes them.
+    Portfolio value is marked at the close of every day.
+
+    Tolerance:
+    ----------
+    The portfolio value agrees with the event-driven path (a Strategy
+    calling `trader.rebalance_to_weights` on the same ticks) to within
+    1e-9 relative, i.e. floating point summation order, as long as every
+    buy in the event-driven path is funded. The batch engine does not
+    model cash declines: where the broker would refuse a withdrawal,
+    the batch engine lets cash go negative, and the two diverge.
+    """
+
+    def __init__(
+        self,
+        weights,
+        eod_data: EquityEOD,
+        look_back_days: int = 30,
+        initial_capital=10000.0,
+        trade_at: str = "close",
+    ):
+        if trade_at not in ["open", "close"]:
+            raise ValueError(
+                "Trades can only be made at the open or close, got: {}".format(trade_at)
+            )
+
+        T, N = eod_data.shape
+        if not callable(weights):
+            weights = np.asarray(weights, dtype=np.float64)
+            if weights.shape != (T, N):
+                raise ValueError(
+                    "Weights need to be of shape {}, got {}".format(
+                        (T, N), weights.shape
+                    )
+                )
+
+        self._weights = weights
+        self._historical_data = eod_data
+        self._look_back_days = look_back_days
+        self._initial_capital = initial_capital
+        self._trade_at = trade_at
+
+        self._has_run = False
+
+    def run(self):
+
+        if self._has_run:
+            raise RuntimeError("Backtest already run, exiting.")
+
+        start = self._look_back_days
+        weights = self._weight_matrix()[start:]
+        trade_prices = self._historical_data[self._trade_at][start:]
+        close_prices = self._historical_data["close"][start:]
+        T, N = weights.shape
+
+        rebalance_rows = np.flatnonzero(~np.all(np.isnan(weights), axis=1))
+
+        holdings_at_rebalance = np.zeros((len(rebalance_rows), N))
+        cash_at_rebalance = np.zeros(len(rebalance_rows))
+
+        holdings = np.zeros(N)
+        cash = float(self._initial_capital)
+        for (k, t) in enumerate(rebalance_rows):
+            prices = trade_prices[t]
+            held = holdings != 0
+            portfolio_value = cash + np.dot(holdings[held], prices[held])
+
+            target = np.round(weights[t] * portfolio_value / prices)
+            orders = np.where(np.isfinite(target), target - holdings, 0.0)
+            traded = orders != 0
+
+            cash -= np.dot(orders[traded], prices[traded])
+            holdings = holdings + orders
+
+            holdings_at_rebalance[k] = holdings
+            cash_at_rebalance[k] = cash
+
+        ## Forward fill the holdings and cash from the last rebalance.
+        last_rebalance = np.full(T, -1)
+        last_rebalance[rebalance_rows] = np.arange(len(rebalance_rows))
+        last_rebalance = np.maximum.accumulate(last_rebalance)
+        invested = last_rebalance >= 0
+
+        self.holdings = np.zeros((T, N))
+        self.holdings[invested] = holdings_at_rebalance[last_rebalance[invested]]
+        self.cash = np.full(T, float(self._initial_capital))
+        self.cash[invested] = cash_at_rebalance[last_rebalance[invested]]
+
+        marked_value = np.where(self.holdings != 0, self.holdings * close_prices, 0.0)
+        self.portfolio_value = self.cash + np.sum(marked_value, axis=1)
+        self.dates = self._historical_data["dates"][start:]
+
+        self._has_run = True
+
+    def _weight_matrix(self):
+
+        if not callable(self._weights):
+            return self._weights
+
+        T, N = self._historical_data.shape
+        weights = np.full((T, N), np.nan)
+        window = EquityEODWindow(self._historical_data, self._look_back_days)
+        for t in range(self._look_back_days, T):
+            window.advance_to(t)
+            weights[t] = self._weights(window, t)
+        return weights
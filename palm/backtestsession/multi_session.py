@@ -0,0 +1,191 @@
+import numpy as np
+
+from palm.data.equity_eod import EquityEOD
+from palm.data.equity_eod_window import EquityEODWindow
+
+from ..context import ContextEOD, EODEvent
+from ..trader import SimulatedTrader
+from .backtestsession import _session_ids, _tick_to_date_index_and_time
+from .recorder import SessionRecorder
+
+
+class MultiStrategySession:
+    """
+    Runs several strategies in one pass over the data.
+
+    One ContextEOD and one EquityEODWindow are moved forward per
+    tick and shared by every strategy, so price lookups, slicing of
+    the look back window and time events are done once per tick
+    instead of once per strategy. Each strategy trades through its
+    own SimulatedTrader, with its own broker, cash and recorded
+    results, so the strategies don't see each other's positions.
+
+    Each strategy is called on the ticks it would be called on in
+    its own BacktestSubscribeSession: the ticks of its schedule, or
+    every tick its `trade_on_this_time_event` accepts when it has
+    none. Strategies are called in the order given on a shared tick,
+    and must not move the context or the window themselves.
+
+    Example:
+    --------
+    session = MultiStrategySession([momentum, mean_reversion], eod_data)
+    session.run()
+    session.results[0].portfolio_value
+    """
+
+    def __init__(
+        self,
+        strategies,
+        eod_data: EquityEOD,
+        look_back_days: int = 30,
+        initial_capital=10000.0,
+        use_position_book: bool = False,
+        id_seed: int = None,
+        record: str = None,
+    ):
+        """
+        strategies: List[Strategy], run side by side.
+        initial_capital: float, or one per strategy.
+        id_seed: int, see BacktestSubscribeSession, one sequence
+            is shared by every strategy of the session.
+        record: str, ticks recorded in each of `results`, see
+            SessionRecorder. By default "closes", or "schedule", over
+            the ticks of every schedule, when all strategies have one.
+        """
+        if len(strategies) == 0:
+            raise ValueError("Need at least one strategy to run.")
+        for strategy in strategies:
+            valid, failure_reason = strategy.user_set_symbols_correctly()
+            if not valid:
+                raise ValueError(failure_reason)
+            missing = set(strategy.symbols) - set(eod_data.symbols)
+            if len(missing) > 0:
+                raise ValueError(
+                    "Historical data doesn't contain all symbols needed for strategy, missing: {}".format(
+                        sorted(missing)
+                    )
+                )
+
+        if np.ndim(initial_capital) == 0:
+            initial_capital = [initial_capital] * len(strategies)
+        if len(initial_capital) != len(strategies):
+            raise ValueError(
+                "Need one initial capital per strategy, got {} for {} strategies".format(
+                    len(initial_capital), len(strategies)
+                )
+            )
+
+        self._strategies = list(strategies)
+        self._id_seed = id_seed
+        self._historical_data = eod_data
+        self._look_back_days = look_back_days
+        self._context = ContextEOD(self._historical_data, start_index=look_back_days)
+        self._start_date = self._context.current_date()
+
+        ## Ticks each scheduled strategy is due on, None for the others.
+        dates = self._historical_data["dates"]
+        start_tick = self._context.current_tick_index()
+        self._scheduled_ticks = [
+            None if strategy.schedule is None
+            else strategy.schedule.compile(dates, start_tick)
+            for strategy in self._strategies
+        ]
+        self._all_scheduled = all(ticks is not None for ticks in self._scheduled_ticks)
+        schedule_ticks = None
+        if self._all_scheduled:
+            schedule_ticks = np.unique(np.concatenate(self._scheduled_ticks))
+        if record is None:
+            record = "schedule" if self._all_scheduled else "closes"
+
+        self.traders = [
+            SimulatedTrader(self._context, capital, use_position_book=use_position_book)
+            for capital in initial_capital
+        ]
+        self.results = [
+            SessionRecorder(
+                self._context,
+                trader.broker,
+                granularity=record,
+                schedule_ticks=schedule_ticks,
+            )
+            for trader in self.traders
+        ]
+
+        self._has_run = False
+
+    def portfolio_value(self):
+        """
+        Recorded portfolio values, one column per strategy.
+        """
+        return np.column_stack([results.portfolio_value for results in self.results])
+
+    def run(self):
+
+        if self._has_run:
+            raise RuntimeError("Backtest already run, exiting.")
+
+        with _session_ids(self._id_seed):
+            self._run()
+
+        self._has_run = True
+
+    def _run(self):
+
+        windowed_historical_data = EquityEODWindow(
+            self._historical_data,
+            self._look_back_days,
+            stop=self._context.current_date_index(),
+        )
+
+        dates = self._historical_data["dates"]
+        start_tick = self._context.current_tick_index()
+        last_tick = 2 * self._context._max_date_index + 1
+
+        scheduled_ticks = self._scheduled_ticks
+        if self._all_scheduled:
+            ticks = np.unique(np.concatenate(scheduled_ticks))
+        else:
+            ticks = np.arange(start_tick, last_tick + 1)
+        next_due = [0] * len(self._strategies)
+
+        for tick in ticks:
+            self._advance_to_tick(tick)
+            windowed_historical_data.advance_to(self._context.current_date_index())
+
+            time_event = None
+            for (k, strategy) in enumerate(self._strategies):
+                strategy_ticks = scheduled_ticks[k]
+                if strategy_ticks is None:
+                    if time_event is None:
+                        time_event = EODEvent(
+                            dates[self._context.current_date_index()],
+                            self._context._time_in_market_day,
+                            self._context.current_date_index(),
+                        )
+                    if not strategy.trade_on_this_time_event(time_event):
+                        continue
+                else:
+                    if next_due[k] == len(strategy_ticks):
+                        continue
+                    if strategy_ticks[next_due[k]] != tick:
+                        continue
+                    next_due[k] += 1
+                strategy.on_update(
+                    windowed_historical_data, self._context, self.traders[k]
+                )
+
+            for results in self.results:
+                results.record()
+
+        ## Run out the clock so open trades can still exit.
+        self._advance_to_tick(last_tick)
+        for results in self.results:
+            results.record()
+
+    def _advance_to_tick(self, tick):
+        ## Every recorder has the same ticks, stop at them on the way.
+        for recorded_tick in self.results[0].pending_ticks_before(tick):
+            self._context.advance_to(*_tick_to_date_index_and_time(recorded_tick))
+            for results in self.results:
+                results.record()
+        self._context.advance_to(*_tick_to_date_index_and_time(tick))
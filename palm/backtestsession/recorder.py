@@ -0,0 +1,172 @@
+import numpy as np
+import pandas as pd
+
+from ..context import ContextEOD, Schedule, TimeInMarketDay
+from ..broker.simulated_broker import SimulatedBroker
+
+record_granularities = ["ticks", "closes", "schedule", "none"]
+
+
+class SessionRecorder:
+    """
+    Equity curve and exposures of a session, recorded into arrays
+    preallocated for every tick to be recorded, so a run takes
+    predictable memory and each row is written in place.
+
+    Granularity:
+    ------------
+    ticks: every opening and closing tick.
+    closes: the closing tick of every day.
+    schedule: the given `schedule_ticks`, e.g. those a strategy is
+        updated on, and the last closing tick.
+    none: nothing is recorded.
+
+    For each recorded tick, after the strategy has traded on it:
+    cash, portfolio_value, the net (signed) and gross market value
+    of the positions, and the signed quantity held of each symbol.
+    """
+
+    def __init__(
+        self,
+        context: ContextEOD,
+        broker: SimulatedBroker,
+        granularity="closes",
+        schedule_ticks=None,
+    ):
+        if granularity not in record_granularities:
+            raise ValueError(
+                "Record granularity: {}, not recognized. Accepted values are: {}".format(
+                    granularity, record_granularities
+                )
+            )
+        self.granularity = granularity
+        self._context = context
+        self._broker = broker
+
+        dates = context._data_source["dates"]
+        if granularity == "ticks":
+            ticks = Schedule.every_tick().compile(dates, context.current_tick_index())
+        elif granularity == "closes":
+            ticks = Schedule.closes().compile(dates, context.current_tick_index())
+        elif granularity == "schedule":
+            if schedule_ticks is None:
+                raise ValueError("Recording a schedule needs its ticks.")
+            last_tick = 2 * (len(dates) - 1) + 1
+            ticks = np.union1d(np.asarray(schedule_ticks, dtype=np.int64), [last_tick])
+            ticks = ticks[ticks >= context.current_tick_index()]
+        else:
+            ticks = np.zeros(0, dtype=np.int64)
+
+        self._ticks = ticks
+        self._count = 0
+        self._cash = np.full(len(ticks), np.nan)
+        self._portfolio_value = np.full(len(ticks), np.nan)
+        self._gross_exposure = np.full(len(ticks), np.nan)
+        self._net_exposure = np.full(len(ticks), np.nan)
+        self._holdings = np.zeros((len(ticks), len(context.symbols)))
+        self._dates = dates[ticks // 2]
+        self._frame = None
+
+    def pending_ticks_before(self, tick: int):
+        """
+        Ticks still to be recorded that come before `tick`.
+        """
+        stop = np.searchsorted(self._ticks, tick, side="left")
+        return self._ticks[self._count : max(stop, self._count)]
+
+    def record(self):
+        """
+        Records the current tick if it is the next one due.
+        """
+        if self._count == len(self._ticks):
+            return
+        if self._ticks[self._count] != self._context.current_tick_index():
+            return
+
+        i = self._count
+        if self._broker.position_book is not None:
+            quantities = self._broker.position_book.quantities
+        else:
+            quantities = self._broker.position_quantities()
+        held = np.flatnonzero(quantities)
+        values = quantities[held] * self._context.current_market_prices()[held]
+        cash = self._broker.cash_account.balance
+
+        self._cash[i] = cash
+        self._net_exposure[i] = np.sum(values)
+        self._gross_exposure[i] = np.sum(np.abs(values))
+        self._portfolio_value[i] = cash + self._net_exposure[i]
+        self._holdings[i] = quantities
+        self._count += 1
+        self._frame = None
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def ticks(self):
+        return self._ticks[: self._count]
+
+    @property
+    def dates(self):
+        return self._dates[: self._count]
+
+    @property
+    def cash(self):
+        return self._cash[: self._count]
+
+    @property
+    def portfolio_value(self):
+        return self._portfolio_value[: self._count]
+
+    @property
+    def gross_exposure(self):
+        return self._gross_exposure[: self._count]
+
+    @property
+    def net_exposure(self):
+        return self._net_exposure[: self._count]
+
+    @property
+    def holdings(self):
+        """
+        Signed quantities held, one row per recorded tick
+        and one column per symbol of the context.
+        """
+        return self._holdings[: self._count]
+
+    @property
+    def frame(self):
+        """
+        The recorded series as a DataFrame indexed by date, with a
+        "time_in_market_day" column unless only closes are recorded, and
+        one "holdings_<symbol>" column per symbol. Built on first use.
+        """
+        if self._frame is None:
+            self._frame = self._build_frame()
+        return self._frame
+
+    def _build_frame(self):
+
+        frame = pd.DataFrame(
+            {
+                "cash": self.cash,
+                "portfolio_value": self.portfolio_value,
+                "gross_exposure": self.gross_exposure,
+                "net_exposure": self.net_exposure,
+            },
+            index=pd.DatetimeIndex(self.dates, name="date"),
+        )
+        if self.granularity in ["ticks", "schedule"]:
+            frame.insert(
+                0,
+                "time_in_market_day",
+                np.where(
+                    self.ticks % 2 == 1,
+                    TimeInMarketDay.Closing.name,
+                    TimeInMarketDay.Opening.name,
+                ),
+            )
+        for (column, symbol) in enumerate(self._context.symbols):
+            frame["holdings_" + symbol] = self.holdings[:, column]
+        return frame
@@ -0,0 +1,213 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from multiprocessing import shared_memory
+import sys
+
+import numpy as np
+import pandas as pd
+
+from palm.data.equity_eod import EquityEOD
+
+from ..analytics.performance import performance_summary
+
+from .backtestsession import BacktestSubscribeSession
+
+
+## Per worker process state, set once by the pool initializer.
+_worker_eod_data = None
+_worker_shared_memory = None
+
+
+def parameter_grid(grid: dict):
+    """
+    Expands a dictionary of parameter name to candidate values
+    into a list of dictionaries, one per combination.
+    """
+    names = list(grid.keys())
+    return [dict(zip(names, values)) for values in product(*grid.values())]
+
+
+def run_parameter_sweep(
+    strategy_factory,
+    param_grid,
+    eod_data: EquityEOD,
+    look_back_days: int = 30,
+    initial_capital=10000.0,
+    max_workers: int = None,
+):
+    """
+    Runs one BacktestSubscribeSession per parameter set in a process pool.
+
+    The price tensor of `eod_data` is copied once into shared memory
+    and every worker attaches to it, so it isn't pickled per task.
+    Memory-mapped data, see EquityEOD.from_mmap, is instead opened
+    again by each worker, so they all share one page cache.
+
+    Parameters:
+    -----------
+    strategy_factory: Callable[..., Strategy], called with each parameter
+        set as keyword arguments. It must be picklable, i.e. defined at
+        module level.
+    param_grid: dict or List[dict], either a dictionary of parameter
+        name to candidate values, expanded with `parameter_grid`, or an
+        explicit list of parameter sets.
+    eod_data: EquityEOD, data shared by every session.
+    max_workers: int, number of worker processes. With 1, the sweep runs
+        in this process, which is useful for debugging.
+
+    Returns:
+    --------
+    portfolio_values: DataFrame, tidy table with one row per parameter
+        set and closing date: the parameters, "date" and "portfolio_value".
+    summary: DataFrame, one row per parameter set with the parameters
+        and the scores of its daily closing portfolio values, see
+        palm.analytics.performance_summary.
+    """
+    if type(param_grid) is dict:
+        param_grid = parameter_grid(param_grid)
+
+    tasks = [
+        (strategy_factory, params, look_back_days, initial_capital)
+        for params in param_grid
+    ]
+
+    if max_workers == 1:
+        _attach_worker_data(eod_data)
+        try:
+            values = [_run_sweep_task(task) for task in tasks]
+        finally:
+            _attach_worker_data(None)
+    elif eod_data.mmap_path is not None:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_mmap_sweep_worker,
+            initargs=(eod_data.mmap_path,),
+        ) as pool:
+            values = list(pool.map(_run_sweep_task, tasks))
+    else:
+        ## Copied field by field, so memory-mapped data that can't be
+        ## reopened from a directory, e.g. a slice, isn't stacked first.
+        field_arrays = eod_data.field_arrays
+        shape = (len(field_arrays),) + eod_data.shape
+        dtype = eod_data.dtype
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+        shared = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+        try:
+            shared_tensor = np.ndarray(shape, dtype=dtype, buffer=shared.buf)
+            for (field_index, field_array) in enumerate(field_arrays):
+                shared_tensor[field_index] = field_array
+            layout = (
+                shared.name,
+                shape,
+                dtype.str,
+                eod_data["dates"].to_numpy(),
+                eod_data.symbols,
+            )
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_init_sweep_worker,
+                initargs=layout,
+            ) as pool:
+                values = list(pool.map(_run_sweep_task, tasks))
+            del shared_tensor
+        finally:
+            shared.close()
+            shared.unlink()
+
+    closing_dates = eod_data["dates"][look_back_days:]
+    return _tidy_results(param_grid, values, closing_dates)
+
+
+def _init_sweep_worker(name, shape, dtype, dates, symbols):
+    global _worker_shared_memory
+    _worker_shared_memory = _attach_shared_memory(name)
+    tensor = np.ndarray(shape, dtype=np.dtype(dtype), buffer=_worker_shared_memory.buf)
+    _attach_worker_data(EquityEOD.from_arrays(tensor, dates, symbols))
+
+
+def _attach_shared_memory(name):
+    """
+    Attaches to the parent's segment without registering it with the
+    resource tracker, which before Python 3.13 would warn about a leak
+    and unlink it when a worker with its own tracker exits. Unregistering
+    after attaching isn't enough: a forked worker shares the parent's
+    tracker, and would drop the parent's registration instead.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    ## Pool initializers run before any task, nothing else registers meanwhile.
+    tracker = shared_memory.resource_tracker
+    shared_memory.resource_tracker = _UntrackedResources
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        shared_memory.resource_tracker = tracker
+
+
+class _UntrackedResources:
+    ## Stands in for the resource tracker while attaching.
+    @staticmethod
+    def register(name, rtype):
+        return
+
+
+def _init_mmap_sweep_worker(path):
+    _attach_worker_data(EquityEOD.from_mmap(path))
+
+
+def _attach_worker_data(eod_data):
+    global _worker_eod_data
+    _worker_eod_data = eod_data
+
+
+def _run_sweep_task(task):
+
+    strategy_factory, params, look_back_days, initial_capital = task
+    strategy = strategy_factory(**params)
+    session = BacktestSubscribeSession(
+        strategy,
+        _worker_eod_data,
+        look_back_days=look_back_days,
+        initial_capital=initial_capital,
+        record="closes",
+    )
+    session.run()
+
+    return session.results.portfolio_value
+
+
+def _tidy_results(param_grid, values, dates):
+
+    frames = []
+    for (params, portfolio_value) in zip(param_grid, values):
+        frame = pd.DataFrame({"date": dates, "portfolio_value": portfolio_value})
+        for name in params.keys():
+            frame.insert(len(frame.columns) - 2, name, params[name])
+        frames.append(frame)
+    portfolio_values = pd.concat(frames, ignore_index=True)
+
+    if len(dates) < 2:
+        ## No returns to score, nothing was gained or lost.
+        scores = _short_curve_scores(len(values))
+    else:
+        ## Score every parameter set at once, one equity curve per row.
+        scores = performance_summary(np.stack(values), axis=1)
+    summary = pd.DataFrame(list(param_grid))
+    for (name, score) in scores.items():
+        summary[name] = score
+
+    return portfolio_values, summary
+
+
+def _short_curve_scores(count):
+
+    scores = {
+        "total_return": 0.0,
+        "annualized_volatility": np.nan,
+        "sharpe_ratio": np.nan,
+        "sortino_ratio": np.nan,
+        "max_drawdown": 0.0,
+        "max_drawdown_duration": 0,
+        "hit_rate": np.nan,
+    }
+    return dict((name, np.full(count, score)) for (name, score) in scores.items())
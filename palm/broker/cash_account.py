@@ -1,6 +1,11 @@
 from enum import Enum
 import pprint
 
+import numpy as np
+import pandas as pd
+
+from ..utils.growable_array import GrowableRecordArray
+
 
 class WithdrawalResult(Enum):
     APPROVED = 1
@@ -12,23 +17,44 @@ class DepositResult(Enum):
     DECLINED = 2
 
 
-class WithdrawalResponse:
+class _Response:
+    """
+    Result of a request and the reason it was declined, if it was.
+    Immutable, as the cash account hands out shared instances.
+    """
+
+    __slots__ = ("result", "reason")
+
+    def __init__(self, result, reason=None):
+        object.__setattr__(self, "result", result)
+        object.__setattr__(self, "reason", reason)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("{} is immutable.".format(type(self).__name__))
+
+    def __delattr__(self, name):
+        raise AttributeError("{} is immutable.".format(type(self).__name__))
+
+
+class WithdrawalResponse(_Response):
+    __slots__ = ()
+
     class DeclinedReason(Enum):
         INSUFFICIENT_FUNDS = 1
         NEGATIVE_AMOUNT_REQUESTED = 2
 
     def __init__(self, result: WithdrawalResult, reason: DeclinedReason = None):
-        self.result = result
-        self.reason = reason
+        super(WithdrawalResponse, self).__init__(result, reason)
 
 
-class DepositResponse:
+class DepositResponse(_Response):
+    __slots__ = ()
+
     class DeclinedReason(Enum):
         NEGATIVE_AMOUNT_DEPOSITED = 1
 
     def __init__(self, result: DepositResult, reason=None):
-        self.result = result
-        self.reason = reason
+        super(DepositResponse, self).__init__(result, reason)
 
 
 class Transaction(Enum):
@@ -56,23 +82,76 @@ class TransactionRecord:
         return pp.pformat(state)
 
 
+## Responses are immutable and carry no per request state, so one
+## shared instance of each is handed out instead of one per request.
+_approved_withdrawal = WithdrawalResponse(WithdrawalResult.APPROVED)
+_insufficient_funds_withdrawal = WithdrawalResponse(
+    WithdrawalResult.DECLINED,
+    WithdrawalResponse.DeclinedReason.INSUFFICIENT_FUNDS,
+)
+_negative_amount_withdrawal = WithdrawalResponse(
+    WithdrawalResult.DECLINED,
+    WithdrawalResponse.DeclinedReason.NEGATIVE_AMOUNT_REQUESTED,
+)
+_confirmed_deposit = DepositResponse(DepositResult.CONFIRMED)
+_negative_amount_deposit = DepositResponse(
+    DepositResult.DECLINED,
+    DepositResponse.DeclinedReason.NEGATIVE_AMOUNT_DEPOSITED,
+)
+
+## Ledger columns. "result" and "reason" hold the enum values of the
+## response, with a reason of 0 when there is none. "timestamp" is in
+## nanoseconds since the epoch, or the NaT value without a clock.
+transaction_ledger_dtype = np.dtype(
+    [
+        ("transaction_type", np.int8),
+        ("result", np.int8),
+        ("reason", np.int8),
+        ("previous_balance", np.float64),
+        ("new_balance", np.float64),
+        ("timestamp", np.int64),
+    ]
+)
+
+_no_timestamp = np.iinfo(np.int64).min
+
+
 class CashAccount:
-    def __init__(self, initial_deposit):
-
-        self._transaction_history = [
-            TransactionRecord(
-                Transaction.DEPOSIT,
-                DepositResponse(DepositResult.CONFIRMED),
-                0.0,
-                initial_deposit,
-            )
-        ]
+    """
+    Cash balance of the broker. The balance is kept as a running
+    float and every request is recorded in a compact ledger of
+    NumPy records rather than as Python objects.
+
+    Parameters:
+    -----------
+    initial_deposit: float, opening balance.
+    record_history: bool, whether to keep the per transaction ledger.
+        Without it only the running summary is kept.
+    clock: Callable, returns the current time of each transaction,
+        e.g. ContextEOD.current_time.
+    """
+
+    def __init__(self, initial_deposit, record_history: bool = True, clock=None):
+
+        self._balance = initial_deposit
+        self._record_history = record_history
+        self._clock = clock
+        self._ledger = GrowableRecordArray(transaction_ledger_dtype)
+        self._summary = {
+            "withdrawals_approved": 0,
+            "withdrawals_declined": 0,
+            "deposits_confirmed": 1,
+            "deposits_declined": 0,
+            "total_withdrawn": 0.0,
+            "total_deposited": initial_deposit,
+        }
+        self._record(Transaction.DEPOSIT, _confirmed_deposit, 0.0, initial_deposit)
 
     def submit_withdrawal_request(self, amount):
 
         if amount < 0:
             return self._handle_negative_withdrawal_request()
-        if amount > self.balance:
+        if amount > self._balance:
             return self._handle_insufficient_funds_withdrawal_request()
         else:
             return self._handle_approved_withdrawal(amount)
@@ -86,71 +165,121 @@ class CashAccount:
 
     @property
     def history(self):
-        return self._transaction_history
+        """
+        The ledger as a list of TransactionRecords, built on each call.
+        Prefer `ledger` for anything beyond a quick look.
+        """
+        history = []
+        for record in self._ledger.records:
+            transaction_type = Transaction(record["transaction_type"])
+            history.append(
+                TransactionRecord(
+                    transaction_type,
+                    self._response_from_record(transaction_type, record),
+                    float(record["previous_balance"]),
+                    float(record["new_balance"]),
+                )
+            )
+        return history
+
+    @property
+    def ledger(self):
+        """
+        Read-only structured array of transactions, see
+        `transaction_ledger_dtype`. Empty if history isn't recorded.
+        """
+        return self._ledger.records
+
+    @property
+    def summary(self):
+        """
+        Counts of approved and declined requests, and the
+        total amounts withdrawn and deposited.
+        """
+        return dict(self._summary)
 
     def _handle_negative_withdrawal_request(self):
-        response = WithdrawalResponse(
-            WithdrawalResult.DECLINED,
-            WithdrawalResponse.DeclinedReason.NEGATIVE_AMOUNT_REQUESTED,
+        self._summary["withdrawals_declined"] += 1
+        self._record(
+            Transaction.WITHDRAWAL,
+            _negative_amount_withdrawal,
+            self._balance,
+            self._balance,
         )
-        previous_balance = self.balance
-        new_balance = previous_balance
-        record = TransactionRecord(
-            Transaction.WITHDRAWAL, response, previous_balance, new_balance
-        )
-        self._transaction_history.append(record)
-
-        return response
+        return _negative_amount_withdrawal
 
     def _handle_insufficient_funds_withdrawal_request(self):
-        response = WithdrawalResponse(
-            WithdrawalResult.DECLINED,
-            WithdrawalResponse.DeclinedReason.INSUFFICIENT_FUNDS,
+        self._summary["withdrawals_declined"] += 1
+        self._record(
+            Transaction.WITHDRAWAL,
+            _insufficient_funds_withdrawal,
+            self._balance,
+            self._balance,
         )
-        previous_balance = self.balance
-        new_balance = previous_balance
-        record = TransactionRecord(
-            Transaction.WITHDRAWAL, response, previous_balance, new_balance
-        )
-        self._transaction_history.append(record)
-        return response
+        return _insufficient_funds_withdrawal
 
     def _handle_approved_withdrawal(self, amount):
-        response = WithdrawalResponse(WithdrawalResult.APPROVED)
-        previous_balance = self.balance
-        new_balance = previous_balance - amount
-        record = TransactionRecord(
-            Transaction.WITHDRAWAL, response, previous_balance, new_balance
+        previous_balance = self._balance
+        self._balance = previous_balance - amount
+        self._summary["withdrawals_approved"] += 1
+        self._summary["total_withdrawn"] += amount
+        self._record(
+            Transaction.WITHDRAWAL, _approved_withdrawal, previous_balance, self._balance
         )
-        self._transaction_history.append(record)
-        return response
+        return _approved_withdrawal
 
     def _handle_negative_deposit_request(self):
-        response = DepositResponse(
-            DepositResult.DECLINED,
-            DepositResponse.DeclinedReason.NEGATIVE_AMOUNT_DEPOSITED,
-        )
-        previous_balance = self.balance
-        new_balance = previous_balance
-        record = TransactionRecord(
-            Transaction.DEPOSIT, response, previous_balance, new_balance
+        self._summary["deposits_declined"] += 1
+        self._record(
+            Transaction.DEPOSIT, _negative_amount_deposit, self._balance, self._balance
         )
-        self._transaction_history.append(record)
-        return response
+        return _negative_amount_deposit
 
     def _handle_successful_deposit_request(self, amount):
-        response = DepositResponse(DepositResult.CONFIRMED)
-        previous_balance = self.balance
-        new_balance = previous_balance + amount
-        record = TransactionRecord(
-            Transaction.DEPOSIT, response, previous_balance, new_balance
+        previous_balance = self._balance
+        self._balance = previous_balance + amount
+        self._summary["deposits_confirmed"] += 1
+        self._summary["total_deposited"] += amount
+        self._record(
+            Transaction.DEPOSIT, _confirmed_deposit, previous_balance, self._balance
+        )
+        return _confirmed_deposit
+
+    def _record(self, transaction_type, response, previous_balance, new_balance):
+        if not self._record_history:
+            return
+
+        timestamp = _no_timestamp
+        if self._clock is not None:
+            timestamp = pd.Timestamp(self._clock()).value
+        reason = 0 if response.reason is None else response.reason.value
+        self._ledger.append(
+            (
+                transaction_type.value,
+                response.result.value,
+                reason,
+                previous_balance,
+                new_balance,
+                timestamp,
+            )
         )
-        self._transaction_history.append(record)
-        return response
+
+    @staticmethod
+    def _response_from_record(transaction_type, record):
+        if transaction_type == Transaction.WITHDRAWAL:
+            reason = None
+            if record["reason"] != 0:
+                reason = WithdrawalResponse.DeclinedReason(record["reason"])
+            return WithdrawalResponse(WithdrawalResult(record["result"]), reason)
+        else:
+            reason = None
+            if record["reason"] != 0:
+                reason = DepositResponse.DeclinedReason(record["reason"])
+            return DepositResponse(DepositResult(record["result"]), reason)
 
     @property
     def balance(self):
-        return self._transaction_history[-1].current_balance
+        return self._balance
 
     def __repr__(self) -> str:
         pp = pprint.PrettyPrinter(indent=4)
@@ -1,16 +1,58 @@
+import numpy as np
+import pandas as pd
+
 from ..utils.generate_id import generate_hex_id
-from ..positions import Position, LongPosition, ShortPosition
+from ..utils.growable_array import GrowableRecordArray
+from ..positions import Position, LongPosition, ShortPosition, PositionBook
 from .cash_account import CashAccount, DepositResult, WithdrawalResult
-from ..orders import MarketOrder, MarketOrderType
+from ..orders import MarketOrder, MarketOrderStatus, MarketOrderType
 from ..context import ContextEOD
 
 
+## One record per filled order, with signed quantities (buys positive)
+## and the symbol as its column index in the context symbols.
+fill_log_dtype = np.dtype(
+    [
+        ("timestamp", np.int64),
+        ("date_index", np.int64),
+        ("symbol_index", np.int64),
+        ("quantity", np.float64),
+        ("price", np.float64),
+    ]
+)
+
+
 class SimulatedBroker:
-    def __init__(self, context: ContextEOD, initial_deposit: float, margin=2.0):
+    """
+    Fills market orders at the current market price of the context.
+
+    With `use_position_book`, holdings are kept in a PositionBook,
+    a signed quantity vector aligned with the context symbols, instead
+    of one Position object per symbol. Portfolio value is then a single
+    dot product, and `get_position`/`all_positions` return snapshots.
+
+    Every fill, from `submit_order` or `submit_orders`, is recorded in
+    `fills`, a structured array with the `fill_log_dtype` layout.
+    """
+
+    def __init__(
+        self,
+        context: ContextEOD,
+        initial_deposit: float,
+        margin=2.0,
+        record_cash_history: bool = True,
+        use_position_book: bool = False,
+    ):
 
-        self._cash_account = CashAccount(initial_deposit)
+        self._cash_account = CashAccount(
+            initial_deposit,
+            record_history=record_cash_history,
+            clock=context.current_time,
+        )
         self._positions_map = dict()
+        self._position_book = PositionBook(context) if use_position_book else None
         self._orders = set()
+        self._fill_log = GrowableRecordArray(fill_log_dtype)
 
         self._context = context
 
@@ -20,8 +62,141 @@ class SimulatedBroker:
         self._orders.add(order)
         self._process_order_at_current_price(order)
 
+        if order.status == MarketOrderStatus.CLOSED:
+            signed_quantity = order.quantity
+            if order.type == MarketOrderType.SELL:
+                signed_quantity = -signed_quantity
+            self._fill_log.append(
+                (
+                    pd.Timestamp(order.time_closed).value,
+                    self._context.current_date_index(),
+                    self._context._data_source.symbol_to_column_index[order.symbol],
+                    signed_quantity,
+                    order.avg_price,
+                )
+            )
+
         return
 
+    def submit_orders(self, quantities, symbols=None):
+        """
+        Submits a batch of market orders, filled together at the
+        current market prices. No MarketOrder is submitted or kept in
+        `all_orders`; without a position book, opening a position still
+        creates the MarketOrder it is opened from.
+
+        Parameters:
+        -----------
+        quantities: array of signed share counts, buys positive and
+            sells negative.
+        symbols: list of symbols the quantities are for. If None,
+            quantities must be aligned with the context symbols.
+
+        Orders for the same symbol are netted, and the result is netted
+        against the current position, so an order can flip a position
+        from long to short in one step. Net quantities are whole shares,
+        truncated toward zero as MarketOrder quantities are, with or
+        without a position book. Sells fill first and their credit funds
+        the buys; buys then fill in order until the cash runs out, and
+        the remaining buys fail. Orders with a NaN quantity or price are
+        skipped. Cash is updated once for the whole batch, if it changes.
+
+        Returns:
+        --------
+        fills: structured array of the fills made, see `fill_log_dtype`.
+        """
+        symbol_to_index = self._context._data_source.symbol_to_column_index
+        number_of_symbols = len(symbol_to_index)
+
+        quantities = np.asarray(quantities, dtype=np.float64)
+        if symbols is None:
+            if len(quantities) != number_of_symbols:
+                raise ValueError(
+                    "Expected {} quantities, one per symbol, got {}".format(
+                        number_of_symbols, len(quantities)
+                    )
+                )
+            net_quantities = np.where(np.isnan(quantities), 0.0, quantities)
+        else:
+            indices = np.array([symbol_to_index[symbol] for symbol in symbols])
+            net_quantities = np.zeros(number_of_symbols)
+            np.add.at(net_quantities, indices, np.nan_to_num(quantities))
+
+        net_quantities = np.trunc(net_quantities)
+
+        prices = self._context.current_market_prices()
+        tradeable = (net_quantities != 0) & np.isfinite(prices)
+        sells = np.flatnonzero(tradeable & (net_quantities < 0))
+        buys = np.flatnonzero(tradeable & (net_quantities > 0))
+
+        credit = -np.dot(net_quantities[sells], prices[sells])
+        spent = np.cumsum(net_quantities[buys] * prices[buys])
+        funded = int(np.count_nonzero(spent <= self._cash_account.balance + credit))
+
+        ## The cash account checks the net amount on its own, which can
+        ## round the other way at the limit: drop the last buys until
+        ## it approves, so no shares are booked without being paid for.
+        while not self._settle_cash(credit - (spent[funded - 1] if funded else 0.0)):
+            funded -= 1
+        buys = buys[:funded]
+
+        filled = np.concatenate([sells, buys])
+        self._apply_fills(filled, net_quantities[filled])
+
+        fills = np.zeros(len(filled), dtype=fill_log_dtype)
+        fills["timestamp"] = pd.Timestamp(self._context.current_time()).value
+        fills["date_index"] = self._context.current_date_index()
+        fills["symbol_index"] = filled
+        fills["quantity"] = net_quantities[filled]
+        fills["price"] = prices[filled]
+        self._fill_log.extend(fills)
+
+        return fills
+
+    def _settle_cash(self, net_cash):
+        ## Deposits of a credit are always confirmed, only withdrawals decline.
+        if net_cash > 0:
+            self._cash_account.submit_deposit_request(net_cash)
+        elif net_cash < 0:
+            response = self._cash_account.submit_withdrawal_request(-net_cash)
+            return response.result == WithdrawalResult.APPROVED
+        return True
+
+    @property
+    def fills(self):
+        return self._fill_log.records
+
+    def _apply_fills(self, indices, signed_quantities):
+
+        if self._position_book is not None:
+            self._position_book.apply_fills(indices, signed_quantities)
+            return
+
+        symbols = self._context.symbols
+        for (index, signed_quantity) in zip(indices, signed_quantities):
+            symbol = symbols[index]
+            position = self._positions_map.get(symbol)
+            held = 0
+            if position is not None:
+                held = position.quantity
+                if position.side == Position.Side.SHORT:
+                    held = -held
+            new_quantity = held + int(signed_quantity)
+
+            if position is not None and new_quantity * held > 0:
+                position.quantity = abs(new_quantity)
+                continue
+
+            if position is not None:
+                position.set_to_closed()
+                del self._positions_map[symbol]
+            if new_quantity > 0:
+                opening = MarketOrder.Buy(symbol, new_quantity)
+                self._positions_map[symbol] = LongPosition(self._context, opening)
+            elif new_quantity < 0:
+                opening = MarketOrder.Sell(symbol, -new_quantity)
+                self._positions_map[symbol] = ShortPosition(self._context, opening)
+
     def liquidate_position(self, symbol):
 
         position = self.get_position(symbol)
@@ -37,8 +212,14 @@ class SimulatedBroker:
 
     @property
     def all_positions(self):
+        if self._position_book is not None:
+            return self._position_book.positions()
         return self._positions_map
 
+    @property
+    def position_book(self):
+        return self._position_book
+
     @property
     def all_orders(self):
         return self._orders
@@ -56,15 +237,37 @@ class SimulatedBroker:
         raise RuntimeError("Cannot modify context at runtime.")
 
     def get_position(self, symbol):
+        if self._position_book is not None:
+            return self._position_book.position(symbol)
         if symbol not in self._positions_map.keys():
             return None
         else:
             return self._positions_map[symbol]
 
+    def position_quantities(self):
+        """
+        Signed share quantities held, aligned with the
+        context symbols. Shorts are negative.
+        """
+        if self._position_book is not None:
+            return self._position_book.quantities.copy()
+
+        symbol_to_index = self._context._data_source.symbol_to_column_index
+        quantities = np.zeros(len(symbol_to_index))
+        for symbol in self._positions_map.keys():
+            position = self._positions_map[symbol]
+            if position.status == Position.Status.OPEN:
+                sign = 1.0 if position.side == Position.Side.LONG else -1.0
+                quantities[symbol_to_index[symbol]] = sign * position.quantity
+        return quantities
+
     def portfolio_value(self):
 
         cash_value = self._cash_account.balance
 
+        if self._position_book is not None:
+            return cash_value + self._position_book.market_value()
+
         positions_value = 0.0
         for symbol in self._positions_map.keys():
             position = self._positions_map[symbol]
@@ -75,12 +278,47 @@ class SimulatedBroker:
 
     def _process_order_at_current_price(self, order: MarketOrder):
 
+        if self._position_book is not None:
+            self._process_order_on_position_book(order)
+            return
+
         position = self.get_position(order.symbol)
         if position is None:
             self._open_position(order)
         else:
             self._modify_position(order, position)
 
+    def _process_order_on_position_book(self, order: MarketOrder):
+
+        held = self._position_book.quantity(order.symbol)
+        is_buy = order.type == MarketOrderType.BUY
+        signed_quantity = order.quantity if is_buy else -order.quantity
+
+        if held > 0 and not is_buy and order.quantity > held:
+            raise ValueError("Order to sell exceeds number of shares.")
+        if held < 0 and is_buy and order.quantity > -held:
+            raise ValueError(
+                """
+                Order to decrease short position is buying too many shares.
+                Liquidate the position and open a new long position.
+            """
+            )
+
+        current_price = self._context.current_market_price(order.symbol)
+        amount = current_price * order.quantity
+        if is_buy:
+            response = self._cash_account.submit_withdrawal_request(amount)
+            approved = response.result == WithdrawalResult.APPROVED
+        else:
+            response = self._cash_account.submit_deposit_request(amount)
+            approved = response.result == DepositResult.CONFIRMED
+
+        if approved:
+            self._position_book.apply_fill(order, signed_quantity)
+            order.set_as_fulfilled(self._context.current_time(), current_price)
+        else:
+            order.set_as_failed(response.reason)
+
     def _open_position(self, order: MarketOrder):
 
         position = None
@@ -88,7 +326,6 @@ class SimulatedBroker:
         if order.type == MarketOrderType.BUY:
             cost = current_price * order.quantity
             response = self._cash_account.submit_withdrawal_request(cost)
-            print(response.reason)
             if response.result == WithdrawalResult.APPROVED:
                 position = LongPosition(self._context, order)
             else:
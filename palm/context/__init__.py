@@ -1 +1,2 @@
 from .daily_bar_context import *
+from .schedule import *
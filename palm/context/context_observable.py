@@ -1,13 +1,106 @@
+import numpy as np
+
+
+class Subscription:
+    """
+    Filters deciding which events an observer is notified of.
+
+    event_kind: only notify on events of this kind, e.g. a
+        TimeInMarketDay. None means every kind.
+    every_n_days: only notify when the date index is a multiple of n.
+    column_indices: only notify when at least one of these columns has
+        a price, i.e. one of the symbols is trading.
+    """
+
+    def __init__(
+        self, observer_callable, event_kind=None, every_n_days=None, column_indices=None
+    ):
+        self.observer_callable = observer_callable
+        self.event_kind = event_kind
+        self.every_n_days = every_n_days
+        self.column_indices = column_indices
+
+    @property
+    def is_unconditional(self):
+        return self.every_n_days is None and self.column_indices is None
+
+    def is_active(self, date_index, prices):
+        if self.every_n_days is not None:
+            if date_index is None or date_index % self.every_n_days != 0:
+                return False
+        if self.column_indices is not None and prices is not None:
+            if np.all(np.isnan(prices[self.column_indices])):
+                return False
+        return True
+
+
 class ContextObservable:
+    """
+    Notifies registered observers of events. Observers can subscribe
+    to a kind of event only, and further filter on the date index or on
+    symbols trading, see Subscription.
+
+    Dispatch lists are precomputed per event kind when observers are
+    added or removed, so notifying only calls observers subscribed to
+    the event, and an event nobody subscribes to costs a dict lookup.
+    """
+
     def __init__(self):
         self.observers = dict()
+        self._subscriptions = dict()
+        self._dispatch = dict()
 
-    def add_observer(self, observer_id, observer_callable):
+    def add_observer(
+        self,
+        observer_id,
+        observer_callable,
+        event_kind=None,
+        every_n_days=None,
+        column_indices=None,
+    ):
         self.observers[observer_id] = observer_callable
+        self._subscriptions[observer_id] = Subscription(
+            observer_callable, event_kind, every_n_days, column_indices
+        )
+        self._dispatch = dict()
 
     def remove_observer(self, observer_id):
         del self.observers[observer_id]
+        del self._subscriptions[observer_id]
+        self._dispatch = dict()
+
+    def notify_observers(self, event_kind=None, date_index=None, prices=None):
+        """
+        Calls the observers subscribed to `event_kind`. With no event
+        kind, as before subscriptions existed, every observer is called.
+        """
+        dispatch = self._dispatch.get(event_kind)
+        if dispatch is None:
+            dispatch = self._build_dispatch(event_kind)
+
+        unconditional, conditional = dispatch
+        for observer_callable in unconditional:
+            observer_callable()
+        for subscription in conditional:
+            if subscription.is_active(date_index, prices):
+                subscription.observer_callable()
+
+    def _build_dispatch(self, event_kind):
+        unconditional = []
+        conditional = []
+        for subscription in self._subscriptions.values():
+            subscribed = (
+                event_kind is None
+                or subscription.event_kind is None
+                or subscription.event_kind == event_kind
+            )
+            if not subscribed:
+                continue
+            if subscription.is_unconditional or event_kind is None:
+                unconditional.append(subscription.observer_callable)
+            else:
+                conditional.append(subscription)
 
-    def notify_observers(self):
-        for key in self.observers.keys():
-            self.observers[key]()
+        dispatch = (tuple(unconditional), tuple(conditional))
+        self._dispatch[event_kind] = dispatch
+        return dispatch
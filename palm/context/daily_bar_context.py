@@ -12,6 +12,14 @@ class TimeInMarketDay(Enum):
     Closing = 2
 
 
+def tick_index(date_index, time_in_market_day):
+    """
+    Position of a tick in the sequence of opening and closing ticks,
+    2 * date_index for the opening and one more for the closing.
+    """
+    return 2 * date_index + (time_in_market_day == TimeInMarketDay.Closing)
+
+
 class EODEvent:
     """
     End of Day time events for simulation, provides the
@@ -19,6 +27,8 @@ class EODEvent:
     In backtesting "date_index_since_start" is provided for convenience.
     """
 
+    __slots__ = ("date", "time_in_market_day", "date_index_since_start")
+
     def __init__(self, date, time_in_market_day, date_index_since_start):
 
         self.date = date
@@ -91,12 +101,9 @@ class ContextEOD(ContextObservable):
         self._current_date_index = 0
         self._start_date_index = 0
 
-        ## TODO, this doesn't guard against the user choosing a
-        ## non-business day by accident
+        ## Raises a ValueError if start_date isn't a trading day.
         if start_date is not None:
-            self._current_date_index = np.where(self._dates.date == start_date.date())[
-                0
-            ][0]
+            self._current_date_index = data_source.calendar.index_of(start_date)
             self._start_date_index = self._current_date_index
         if start_index is not None:
             self._start_date_index = start_index
@@ -108,6 +115,32 @@ class ContextEOD(ContextObservable):
 
         self._iterator_needs_to_update = False
 
+    def add_observer(
+        self,
+        observer_id,
+        observer_callable,
+        time_in_market_day: TimeInMarketDay = None,
+        every_n_days: int = None,
+        symbols=None,
+    ):
+        """
+        Registers a callable notified after each update. By default
+        it is called on every tick; it can instead subscribe to only
+        the opening or closing ticks, only every n days since the start,
+        or only the ticks where one of `symbols` has a price.
+        """
+        column_indices = None
+        if symbols is not None:
+            symbol_to_index = self._data_source.symbol_to_column_index
+            column_indices = np.array([symbol_to_index[symbol] for symbol in symbols])
+        super(ContextEOD, self).add_observer(
+            observer_id,
+            observer_callable,
+            event_kind=time_in_market_day,
+            every_n_days=every_n_days,
+            column_indices=column_indices,
+        )
+
     def current_market_price(self, symbol):
         t = self._current_date_index
         i = self._data_source.symbol_to_column_index[symbol]
@@ -124,6 +157,30 @@ class ContextEOD(ContextObservable):
         elif self._time_in_market_day == TimeInMarketDay.Closing:
             return self._close[t, :]
 
+    @property
+    def symbols(self):
+        return self._data_source.symbols
+
+    def indicator(self, field: str, kind: str, window: int, symbol=None):
+        """
+        Value of an indicator (see IndicatorCache) as known at the current
+        tick, for all symbols or for `symbol`. At the opening only the
+        open of the day is known, so indicators of the other fields are
+        read from the day before, NaN on the first day.
+        """
+        indicator = self._data_source.indicators.get(field, kind, window)
+        t = self._current_date_index
+        if self._time_in_market_day == TimeInMarketDay.Opening and field != "open":
+            t = t - 1
+
+        if t < 0:
+            row = np.full(indicator.shape[1], np.nan)
+        else:
+            row = indicator[t, :]
+        if symbol is None:
+            return row
+        return row[self._data_source.symbol_to_column_index[symbol]]
+
     def time_in_market_day(self):
         return self._time_in_market_day
 
@@ -158,7 +215,40 @@ class ContextEOD(ContextObservable):
             self._time_in_market_day = TimeInMarketDay.Opening
             self._current_date_index = self._current_date_index + 1
 
-        self.notify_observers()
+        self.notify_observers(
+            self._time_in_market_day,
+            self.date_index_since_start(),
+            self.current_market_prices(),
+        )
+
+    def current_tick_index(self):
+        return tick_index(self._current_date_index, self._time_in_market_day)
+
+    def advance_to(self, date_index, time_in_market_day=TimeInMarketDay.Closing):
+        """
+        Moves forward to the given tick. Observers are notified of
+        every tick on the way, as if update was called for each, but
+        once no observers are left the context jumps straight there.
+        """
+        target = tick_index(date_index, time_in_market_day)
+        if target < self.current_tick_index():
+            raise ValueError("Context can only advance forward in time.")
+        if date_index > self._max_date_index:
+            raise ValueError(
+                "Date index {} is past the last date index {}.".format(
+                    date_index, self._max_date_index
+                )
+            )
+
+        while self.current_tick_index() < target:
+            if len(self.observers) == 0:
+                self._current_date_index = date_index
+                self._time_in_market_day = time_in_market_day
+                break
+            self.update()
+
+        ## Iterating from here continues after this tick.
+        self._iterator_needs_to_update = True
 
     def can_still_update(self):
         """
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+
+from ..data.trading_calendar import TradingCalendar, to_day_numbers
+from .daily_bar_context import TimeInMarketDay, tick_index
+
+
+class Schedule:
+    """
+    The ticks a strategy is updated on, declared up front and
+    compiled into a sorted array of tick indices (see tick_index)
+    so the session can jump straight from one to the next.
+
+    Build one with the static constructors, e.g. Schedule.month_end().
+    `time_in_market_day` picks the opening or closing tick of each
+    scheduled day, or both if None.
+
+    Example:
+    --------
+    class MonthlyRebalance(Strategy):
+        def __init__(self):
+            self.symbols = ["SPY", "TLT"]
+            self.schedule = Schedule.month_end()
+    """
+
+    @staticmethod
+    def every_tick():
+        return Schedule(time_in_market_day=None)
+
+    @staticmethod
+    def closes():
+        return Schedule(TimeInMarketDay.Closing)
+
+    @staticmethod
+    def opens():
+        return Schedule(TimeInMarketDay.Opening)
+
+    @staticmethod
+    def weekly(time_in_market_day=TimeInMarketDay.Closing):
+        return WeeklySchedule(time_in_market_day)
+
+    @staticmethod
+    def month_end(time_in_market_day=TimeInMarketDay.Closing):
+        return MonthEndSchedule(time_in_market_day)
+
+    @staticmethod
+    def every_n_days(n: int, time_in_market_day=TimeInMarketDay.Closing):
+        return EveryNDaysSchedule(n, time_in_market_day)
+
+    @staticmethod
+    def on_dates(dates, time_in_market_day=TimeInMarketDay.Closing):
+        return DateListSchedule(dates, time_in_market_day)
+
+    def __init__(self, time_in_market_day=TimeInMarketDay.Closing):
+        self.time_in_market_day = time_in_market_day
+
+    def date_indices(self, dates: pd.DatetimeIndex, start_index: int):
+        """
+        Indices into `dates` of the scheduled days, from `start_index`.
+        """
+        return np.arange(start_index, len(dates))
+
+    def compile(self, dates: pd.DatetimeIndex, start_tick: int = 0):
+        """
+        Sorted tick indices of the schedule over `dates`,
+        dropping any before `start_tick`.
+        """
+        start_index = start_tick // 2
+        days = np.asarray(self.date_indices(dates, start_index), dtype=np.int64)
+        days = days[days >= start_index]
+
+        if self.time_in_market_day is None:
+            ticks = np.stack([2 * days, 2 * days + 1], axis=1).ravel()
+        else:
+            ticks = tick_index(days, self.time_in_market_day)
+        return ticks[ticks >= start_tick]
+
+
+class WeeklySchedule(Schedule):
+    """
+    The last trading day of each week (Monday to Sunday).
+    """
+
+    def date_indices(self, dates, start_index):
+        ## The epoch was a Thursday, so shift days by 3 to start weeks on Mondays.
+        return _last_of_each_period((to_day_numbers(dates) + 3) // 7)
+
+
+class MonthEndSchedule(Schedule):
+    """
+    The last trading day of each month. For the last month in the
+    data, this is its last day even if the month isn't over.
+    """
+
+    def date_indices(self, dates, start_index):
+        return _last_of_each_period(np.asarray(dates.year * 12 + dates.month))
+
+
+class EveryNDaysSchedule(Schedule):
+    """
+    Every n trading days, starting from the first day run.
+    """
+
+    def __init__(self, n: int, time_in_market_day=TimeInMarketDay.Closing):
+        if n <= 0:
+            raise ValueError(
+                "Schedule needs a positive number of days, got {}".format(n)
+            )
+        super(EveryNDaysSchedule, self).__init__(time_in_market_day)
+        self.n = n
+
+    def date_indices(self, dates, start_index):
+        return np.arange(start_index, len(dates), self.n)
+
+
+class DateListSchedule(Schedule):
+    """
+    An explicit list of dates, each of which must be a trading day.
+    """
+
+    def __init__(self, dates, time_in_market_day=TimeInMarketDay.Closing):
+        super(DateListSchedule, self).__init__(time_in_market_day)
+        self.dates = pd.DatetimeIndex(dates)
+
+    def date_indices(self, dates, start_index):
+        ## Raises a ValueError if any date isn't a trading day.
+        return np.unique(TradingCalendar(dates).indices_of(self.dates))
+
+
+def _last_of_each_period(period_ids: np.ndarray):
+    """
+    Indices of the last element of each run of equal period ids.
+    """
+    if len(period_ids) == 0:
+        return np.zeros(0, dtype=np.int64)
+    return np.flatnonzero(np.diff(period_ids, append=period_ids[-1] + 1) != 0)
@@ -1,2 +1,8 @@
 from .data_utils import *
 from .equity_eod import *
+from .equity_eod_window import *
+from .eod_cache import *
+from .indicators import *
+from .synthetic import *
+from .trading_calendar import *
+from .ingest import *
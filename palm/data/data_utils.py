@@ -1,14 +1,31 @@
-from datetime import datetime, timedelta
-import json
-from tqdm import tqdm
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from functools import partial
 import os
+import threading
+import time
+import warnings
 
 import numpy as np
 import pandas as pd
 
-from polygon import RESTClient
+from ..utils.rate_limiter import RateLimiter
+from .equity_eod import EquityEOD, equity_eod_fields
+from .eod_cache import (
+    PolygonEODCache,
+    day_number,
+    day_number_to_string,
+    empty_polygon_columns,
+    merge_polygon_columns,
+    milliseconds_per_day,
+    polygon_field_columns,
+    polygon_results_to_columns,
+    select_days,
+    unique_keeping_last,
+)
 
-from .equity_eod import EquityEOD
+## polygon.RESTClient, only imported once data is pulled, see _rest_client_class.
+RESTClient = None
 
 
 def pull_polygon_eod(
@@ -17,6 +34,11 @@ def pull_polygon_eod(
     end_date: datetime,
     api_key=None,
     show_progress: bool = False,
+    cache_dir: str = None,
+    max_workers: int = 1,
+    max_requests_per_second: float = None,
+    max_retries: int = 3,
+    retry_backoff: float = 0.5,
 ):
     """
     Pulls EOD data from polygons API.
@@ -29,28 +51,40 @@ def pull_polygon_eod(
     api_key: str, Polygon io api key, if none looks for
         and environment variable named "POLYGON_IO_API_KEY",
         otherwise throws an error.
+    show_progress: bool, show a progress bar over the symbols.
+    cache_dir: str, directory of a local cache of daily bars. When given,
+        bars are read from the cache and only the date ranges missing
+        at either edge of what has been cached are requested, see
+        PolygonEODCache.
+    max_workers: int, number of symbols requested concurrently,
+        each from its own thread and client.
+    max_requests_per_second: float, rate limit shared by all the
+        threads, no limit if None.
+    max_retries: int, number of times a failed request is retried.
+    retry_backoff: float, seconds waited before the first retry,
+        doubling after each further attempt.
 
     Returns:
     --------
-    eod_data: dict[DataFrame], dictionary of dataframes returned
-        from polygon REST request.
-
-        The dictionary of dataframes is indexed by the symbols requested. The columns
-        of each dataframe follow the convention from the polygon
-        stock historical aggregates docs.
-        ('v', 'vw', 'o', 'c', 'h', 'l', 't', 'n')
-
-        The only difference from the REST response is the `t` field is transformed
-        from a Unix Msec timestamp to a datetime object.
+    eod_data: EquityEOD, the open, close, high, low and volume of the
+        symbols requested, aligned on the union of their trading days.
+        Dates come from the polygon `t` field, a Unix Msec timestamp,
+        converted in one vectorized step to naive UTC times, e.g.
+        05:00 for a bar starting at midnight in New York in winter.
 
         If the historical record of the company is shorter than requested,
-        the full available history is returned.
+        the full available history is returned, with NaN before it.
+        Symbols without any results are left out with a warning, a
+        RuntimeError is raised if none has any. A warning names any
+        range whose request failed and was left out of the cached bars.
     """
     if (type(symbols) is not list) and (type(symbols) is not str):
         raise RuntimeError("Symbols expected to be a list or string.")
 
     if type(symbols) is str:
         symbols = [symbols]
+    ## Each symbol is requested once, in the order first given.
+    symbols = list(dict.fromkeys(symbols))
 
     if api_key is None:
         environment_key = os.getenv("POLYGON_IO_API_KEY")
@@ -61,30 +95,241 @@ def pull_polygon_eod(
         else:
             api_key = environment_key
 
-    loader = tqdm(symbols) if show_progress else symbols
-    start_date = start_date.strftime("%Y-%m-%d")
-    end_date = end_date.strftime("%Y-%m-%d")
-    eod_data = {}
-    with RESTClient(api_key) as client:
-        for symbol in loader:
-            response = client.stocks_equities_aggregates(
-                symbol, 1, "day", start_date, end_date
+    if cache_dir is not None:
+        cache = PolygonEODCache(cache_dir)
+    else:
+        cache = None
+
+    rate_limiter = None
+    if max_requests_per_second is not None:
+        rate_limiter = RateLimiter(max_requests_per_second)
+
+    first_day = day_number(start_date)
+    last_day = day_number(end_date)
+
+    columns_by_symbol = {}
+    with _ThreadLocalRESTClients(api_key) as clients:
+
+        def load_symbol(symbol):
+            fetch = partial(
+                _fetch_polygon_columns_with_retries,
+                clients.get(),
+                symbol,
+                rate_limiter=rate_limiter,
+                max_retries=max_retries,
+                retry_backoff=retry_backoff,
             )
-            if response.status == "OK":
-                try:
-                    result = response.results
-                except AttributeError:
-                    print(f"No results found for {symbol}, continuing")
-                    break
-                eod_data[symbol] = pd.DataFrame(response.results)
-                ## Convert from unix millisecond time stamp to date and time.
-                eod_data[symbol]["datetime"] = eod_data[symbol]["t"].apply(
-                    lambda timestamp: datetime.fromtimestamp(timestamp / 1000.0)
-                    + timedelta(hours=8)
+            return _load_polygon_columns(fetch, symbol, first_day, last_day, cache)
+
+        if max_workers == 1:
+            loader = _progress(symbols) if show_progress else symbols
+            for symbol in loader:
+                columns_by_symbol[symbol] = load_symbol(symbol)
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                futures = dict(
+                    (pool.submit(load_symbol, symbol), symbol) for symbol in symbols
+                )
+                completed = as_completed(futures)
+                if show_progress:
+                    completed = _progress(completed, total=len(futures))
+                for future in completed:
+                    columns_by_symbol[futures[future]] = future.result()
+
+    for symbol in symbols:
+        columns = columns_by_symbol[symbol]
+        if columns is None or len(columns["t"]) == 0:
+            warnings.warn(f"No results found for {symbol}, continuing")
+            del columns_by_symbol[symbol]
+    if len(columns_by_symbol) == 0:
+        raise RuntimeError(
+            "No results found for any of the symbols: {}".format(symbols)
+        )
+
+    return equity_eod_from_polygon_columns(columns_by_symbol)
+
+
+class _ThreadLocalRESTClients:
+    """
+    One RESTClient per thread, all closed together on exit.
+    """
+
+    def __init__(self, api_key):
+        self._api_key = api_key
+        self._local = threading.local()
+        self._clients = []
+        self._lock = threading.Lock()
+
+    def get(self):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = _rest_client_class()(self._api_key).__enter__()
+            self._local.client = client
+            with self._lock:
+                self._clients.append(client)
+        return client
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        for client in self._clients:
+            client.__exit__(None, None, None)
+        self._clients = []
+
+
+def _rest_client_class():
+    ## Importing polygon is slow, so `import palm` doesn't do it.
+    global RESTClient
+    if RESTClient is None:
+        from polygon import RESTClient as client_class
+
+        RESTClient = client_class
+    return RESTClient
+
+
+def _progress(iterable, **kwargs):
+    from tqdm import tqdm
+
+    return tqdm(iterable, **kwargs)
+
+
+def _load_polygon_columns(fetch, symbol, first_day, last_day, cache):
+    """
+    Loads the columns for a symbol over the inclusive day range,
+    going through the cache when there is one.
+    """
+    if cache is None:
+        return fetch(first_day, last_day)
+
+    columns, covered = cache.load(symbol)
+    if columns is None:
+        columns = empty_polygon_columns()
+
+    missing_ranges = cache.missing_ranges(covered, first_day, last_day)
+    all_fetched = True
+    for (range_start, range_end) in missing_ranges:
+        fetched = fetch(range_start, range_end)
+        if fetched is None:
+            warnings.warn(
+                "Request for {} from {} to {} failed, returning the cached "
+                "bars without it.".format(
+                    symbol,
+                    day_number_to_string(range_start),
+                    day_number_to_string(range_end),
                 )
-                eod_data[symbol].index = pd.DatetimeIndex(eod_data[symbol]["datetime"])
+            )
+            all_fetched = False
+            continue
+        columns = merge_polygon_columns(columns, fetched)
+
+    if len(missing_ranges) > 0 and all_fetched:
+        covered = cache.extend_covered(
+            covered, first_day, last_day, _last_complete_day()
+        )
+        if covered is not None:
+            cache.save(symbol, columns, covered)
+
+    return select_days(columns, first_day, last_day)
+
+
+def _last_complete_day():
+    ## Yesterday in UTC, the last day every bar has been published for.
+    return day_number(datetime.now(timezone.utc)) - 1
+
+
+def _fetch_polygon_columns_with_retries(
+    client, symbol, first_day, last_day, rate_limiter, max_retries, retry_backoff
+):
+    """
+    Retries failed requests, both exceptions and non OK responses,
+    with exponential backoff. After `max_retries` retries, exceptions
+    are raised and a non OK response gives None.
+    """
+    for attempt in range(max_retries + 1):
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        try:
+            columns = _fetch_polygon_columns(client, symbol, first_day, last_day)
+        except Exception:
+            if attempt == max_retries:
+                raise
+            columns = None
+        if columns is not None:
+            return columns
+        if attempt < max_retries:
+            time.sleep(retry_backoff * 2**attempt)
+    return None
+
+
+def _fetch_polygon_columns(client, symbol, first_day: int, last_day: int):
+    """
+    Requests daily bars for the inclusive day range. Returns None
+    if the request failed, so the range isn't marked as cached.
+    """
+    response = client.stocks_equities_aggregates(
+        symbol,
+        1,
+        "day",
+        day_number_to_string(first_day),
+        day_number_to_string(last_day),
+    )
+    if response.status != "OK":
+        return None
+    results = getattr(response, "results", None)
+    if results is None:
+        return empty_polygon_columns()
+    return polygon_results_to_columns(results)
+
+
+def equity_eod_from_polygon_columns(
+    columns_by_symbol: dict, by_day: bool = False, dtype=np.float64
+):
+    """
+    Builds an EquityEOD straight from per symbol polygon columns,
+    aligning the symbols on the union of their timestamps, written
+    straight into the (fields, T, N) tensor. Dates a symbol has no
+    bar for are NaN, and where a symbol has several bars for one
+    date the last is kept, see unique_keeping_last.
+
+    Parameters:
+    -----------
+    columns_by_symbol: dict, the "t", "o", "c", "h", "l" and "v"
+        columns of each symbol, e.g. from PolygonEODCache or read_bars.
+    by_day: bool, if True bars are aligned on their day instead of
+        their timestamp, and dated at midnight of it.
+    dtype: np.dtype, of the fields.
+    """
+    symbols = sorted(columns_by_symbol.keys())
+    keys_by_symbol = {}
+    for symbol in symbols:
+        keys = np.asarray(columns_by_symbol[symbol]["t"], dtype=np.int64)
+        if by_day:
+            keys = keys // milliseconds_per_day
+        keys_by_symbol[symbol] = unique_keeping_last(keys)
+    all_keys = np.unique(
+        np.concatenate(
+            [np.zeros(0, dtype=np.int64)]
+            + [keys_by_symbol[symbol][0] for symbol in symbols]
+        )
+    )
+
+    tensor = np.full(
+        (len(equity_eod_fields), len(all_keys), len(symbols)), np.nan, dtype
+    )
+    for (column, symbol) in enumerate(symbols):
+        columns = columns_by_symbol[symbol]
+        (keys, last) = keys_by_symbol[symbol]
+        rows = np.searchsorted(all_keys, keys)
+        for (field_index, field) in enumerate(equity_eod_fields):
+            field_column = np.asarray(columns[polygon_field_columns[field]])
+            tensor[field_index, rows, column] = field_column[last]
 
-    return EquityEOD(polygon_symbol_indexed_to_OHCLV_indexed(eod_data))
+    if by_day:
+        dates = pd.to_datetime(all_keys.astype("datetime64[D]"))
+    else:
+        dates = pd.to_datetime(all_keys, unit="ms")
+    return EquityEOD.from_arrays(tensor, dates, symbols)
 
 
 def polygon_symbol_indexed_to_OHCLV_indexed(data: dict):
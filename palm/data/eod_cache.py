@@ -0,0 +1,170 @@
+import os
+from urllib.parse import quote
+
+import numpy as np
+
+from .trading_calendar import to_day_number
+
+polygon_aggregate_columns = ["t", "o", "c", "h", "l", "v", "vw", "n"]
+
+## Polygon aggregate column of each EquityEOD field.
+polygon_field_columns = {
+    "open": "o",
+    "close": "c",
+    "high": "h",
+    "low": "l",
+    "volume": "v",
+}
+
+milliseconds_per_day = 86_400_000
+
+
+def day_number(date):
+    """
+    Days since the unix epoch for a datetime or date.
+    """
+    return to_day_number(date)
+
+
+def day_number_to_string(day: int):
+    return str(np.datetime64(int(day), "D"))
+
+
+class PolygonEODCache:
+    """
+    On-disk cache of polygon aggregate bars, one `.npz` file
+    of columns per symbol and timespan.
+
+    Each file holds the polygon columns ('t', 'o', 'c', 'h', 'l', 'v',
+    'vw', 'n') sorted by timestamp, plus the first and last day
+    number (days since the epoch) of the range that has already been
+    requested, so that only the missing edges need to be fetched.
+    Days from today on are never marked as covered, as their bars may
+    not be published yet.
+    """
+
+    def __init__(self, cache_dir: str, multiplier: int = 1, timespan: str = "day"):
+        self._cache_dir = cache_dir
+        self._multiplier = multiplier
+        self._timespan = timespan
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path(self, symbol: str):
+        ## Percent-encoded, so symbols such as "BRK/A" stay in the cache
+        ## directory and distinct symbols never share a file.
+        return os.path.join(
+            self._cache_dir,
+            "{}-{}-{}.npz".format(
+                quote(symbol, safe=""), self._multiplier, self._timespan
+            ),
+        )
+
+    def load(self, symbol: str):
+        """
+        Returns the cached columns and covered (first_day, last_day),
+        or (None, None) if the symbol hasn't been cached.
+        """
+        path = self.path(symbol)
+        if not os.path.exists(path):
+            return None, None
+
+        with np.load(path) as cached:
+            columns = dict((name, cached[name]) for name in polygon_aggregate_columns)
+            covered = (int(cached["first_day"]), int(cached["last_day"]))
+        return columns, covered
+
+    def save(self, symbol: str, columns: dict, covered):
+        ## Write to a temporary file first so a crash never leaves a partial cache.
+        path = self.path(symbol)
+        temporary_path = path + ".tmp.npz"
+        np.savez(
+            temporary_path,
+            first_day=covered[0],
+            last_day=covered[1],
+            **columns,
+        )
+        os.replace(temporary_path, path)
+
+    @staticmethod
+    def missing_ranges(covered, first_day: int, last_day: int):
+        """
+        Day ranges, inclusive, that need to be fetched so the covered
+        range extends over [first_day, last_day]. Any gap between a
+        disjoint request and the covered range is fetched as well, so
+        the covered range stays contiguous.
+        """
+        if covered is None:
+            return [(first_day, last_day)]
+
+        ranges = []
+        if first_day < covered[0]:
+            ranges.append((first_day, covered[0] - 1))
+        if last_day > covered[1]:
+            ranges.append((covered[1] + 1, last_day))
+        return ranges
+
+    @staticmethod
+    def extend_covered(covered, first_day: int, last_day: int, last_complete_day: int):
+        """
+        Covered range once [first_day, last_day] has been fetched. Days
+        after `last_complete_day` may not have a published bar yet, so
+        they are left out and fetched again next time. None if nothing
+        is covered.
+        """
+        last_day = min(last_day, last_complete_day)
+        if covered is None:
+            return (first_day, last_day) if first_day <= last_day else None
+        return (min(covered[0], first_day), max(covered[1], last_day))
+
+
+def empty_polygon_columns():
+    columns = dict(
+        (name, np.array([], dtype=np.float64)) for name in polygon_aggregate_columns
+    )
+    columns["t"] = np.array([], dtype=np.int64)
+    return columns
+
+
+def polygon_results_to_columns(results):
+    """
+    Converts the list of bar dictionaries from a polygon
+    aggregates response into a dictionary of column arrays.
+    Missing fields are filled with NaN.
+    """
+    columns = {}
+    columns["t"] = np.array([bar["t"] for bar in results], dtype=np.int64)
+    for name in polygon_aggregate_columns[1:]:
+        columns[name] = np.array(
+            [bar.get(name, np.nan) for bar in results], dtype=np.float64
+        )
+    return columns
+
+
+def merge_polygon_columns(first: dict, second: dict):
+    """
+    Merges two sets of columns by timestamp. Where both
+    have a bar for the same timestamp, `second` wins.
+    """
+    merged = dict(
+        (name, np.concatenate([first[name], second[name]]))
+        for name in polygon_aggregate_columns
+    )
+    _, keep = unique_keeping_last(merged["t"])
+    return dict((name, merged[name][keep]) for name in polygon_aggregate_columns)
+
+
+def unique_keeping_last(keys: np.ndarray):
+    """
+    Sorted distinct keys, e.g. bar timestamps or days, and the index
+    of the last occurrence of each: where several bars share a key,
+    the last one wins.
+    """
+    ## np.unique keeps the first occurrence, so search the reversed keys.
+    unique_keys, reversed_index = np.unique(keys[::-1], return_index=True)
+    return unique_keys, len(keys) - 1 - reversed_index
+
+
+def select_days(columns: dict, first_day: int, last_day: int):
+    days = columns["t"] // milliseconds_per_day
+    in_range = (days >= first_day) & (days <= last_day)
+    return dict((name, columns[name][in_range]) for name in polygon_aggregate_columns)
@@ -1,7 +1,12 @@
 from datetime import datetime
+import os
+
 import numpy as np
 import pandas as pd
 
+from .indicators import IndicatorCache
+from .trading_calendar import TradingCalendar
+
 equity_eod_fields = ["open", "close", "high", "low", "volume"]
 
 
@@ -9,9 +14,18 @@ class EquityEOD:
     """
     EOD data is given as a collection of TxN matrices, one for each field:
     "Open", "Close", "High", "Low", "Volume".
+
+    Internally the fields are stored as a single contiguous
+    read-only tensor of shape (fields, T, N), with the columns
+    ordered by the sorted symbols. Field access returns views
+    into it; data frames are only built when asked for.
+
+    A data set written with `to_mmap` can be opened with `from_mmap`,
+    in which case each field is a memory-mapped TxN array read from
+    disk on demand.
     """
 
-    def __init__(self, data):
+    def __init__(self, data, dtype=np.float64):
         self._allowed_fields = equity_eod_fields
         self._allowed_return_types = ["numpy", "dataframe"]
         self._return_type = "numpy"
@@ -24,23 +38,130 @@ class EquityEOD:
             )
 
         ## Add a validate dataset here.
-        self._data = data
-        self.symbols = sorted(set(self._data["open"].columns))
-        self._dates = pd.to_datetime(self._data["open"].index)
-
-        self._index_to_symbol = {}
-        self._symbol_to_index = {}
-        for (index, symbol) in enumerate(self.symbols):
-            self._index_to_symbol[index] = symbol
-            self._symbol_to_index[symbol] = index
+        symbols = sorted(set(data["open"].columns))
+        index = data["open"].index
 
-        self.start_date = self._dates[0]
-        self.end_date = self._dates[-1]
+        tensor = np.empty(
+            (len(self._allowed_fields), len(index), len(symbols)), dtype=dtype
+        )
+        for (field_index, field) in enumerate(self._allowed_fields):
+            tensor[field_index] = (
+                data[field].reindex(index=index, columns=symbols).to_numpy(dtype=dtype)
+            )
 
-        self.shape = (len(self._dates), len(self.symbols))
+        self._set_storage(list(tensor), pd.to_datetime(index), symbols, tensor)
 
         return
 
+    @classmethod
+    def from_arrays(cls, tensor: np.ndarray, dates, symbols):
+        """
+        Builds an EquityEOD directly from a (fields, T, N) tensor,
+        without going through data frames. The tensor is not copied:
+        the data set holds a read-only view of it, so the caller's
+        array stays writeable and writes to it show in the data set.
+        Its columns must follow `symbols`, which must already be sorted.
+        """
+        if tensor.ndim != 3 or tensor.shape[0] != len(equity_eod_fields):
+            raise ValueError(
+                "Expected a tensor of shape ({}, T, N), got {}".format(
+                    len(equity_eod_fields), tensor.shape
+                )
+            )
+        if tensor.shape[1] != len(dates) or tensor.shape[2] != len(symbols):
+            raise ValueError(
+                "Tensor of shape {} does not match {} dates and {} symbols".format(
+                    tensor.shape, len(dates), len(symbols)
+                )
+            )
+        if list(symbols) != sorted(symbols):
+            raise ValueError("Symbols must be sorted.")
+
+        tensor = _read_only(tensor)
+        return cls._from_field_arrays(list(tensor), dates, symbols, tensor)
+
+    @classmethod
+    def from_mmap(cls, path: str):
+        """
+        Opens a data set written by `to_mmap` without reading it
+        into memory. Each field is a read-only np.memmap, so pages are
+        only read when they are accessed, and processes opening the
+        same files share the operating system's page cache.
+        """
+        field_arrays = [
+            np.load(os.path.join(path, field + ".npy"), mmap_mode="r")
+            for field in equity_eod_fields
+        ]
+        dates = np.load(os.path.join(path, "dates.npy")).astype("datetime64[ns]")
+        symbols = [str(symbol) for symbol in np.load(os.path.join(path, "symbols.npy"))]
+
+        eod_data = cls._from_field_arrays(field_arrays, dates, symbols)
+        eod_data._mmap_path = path
+
+        return eod_data
+
+    def to_mmap(self, path: str):
+        """
+        Writes the data set to a directory of fixed layout `.npy` files:
+        one TxN array per field ("open.npy", "close.npy", ...), the dates
+        as int64 nanoseconds since the epoch in "dates.npy" and the symbols
+        in "symbols.npy". Open it again with `EquityEOD.from_mmap`.
+        """
+        os.makedirs(path, exist_ok=True)
+        for (field, field_array) in zip(self._allowed_fields, self._field_arrays):
+            np.save(os.path.join(path, field + ".npy"), field_array)
+        ## Dates may be held at another resolution than nanoseconds.
+        nanoseconds = self._dates.to_numpy().astype("datetime64[ns]").astype(np.int64)
+        np.save(os.path.join(path, "dates.npy"), nanoseconds)
+        np.save(os.path.join(path, "symbols.npy"), np.array(self.symbols, dtype=str))
+
+    @classmethod
+    def _from_field_arrays(
+        cls, field_arrays, dates, symbols, tensor=None, symbol_maps=None
+    ):
+
+        eod_data = cls.__new__(cls)
+        eod_data._allowed_fields = equity_eod_fields
+        eod_data._allowed_return_types = ["numpy", "dataframe"]
+        eod_data._return_type = "numpy"
+        eod_data._set_storage(
+            field_arrays, pd.to_datetime(dates), symbols, tensor, symbol_maps
+        )
+
+        return eod_data
+
+    def _set_storage(self, field_arrays, dates, symbols, tensor=None, symbol_maps=None):
+
+        ## Read-only views leave the flags of the given arrays alone.
+        self._tensor = None if tensor is None else _read_only(tensor)
+        self._field_arrays = [_read_only(field_array) for field_array in field_arrays]
+        self._mmap_path = None
+        self._field_index = dict(
+            (field, index) for (index, field) in enumerate(self._allowed_fields)
+        )
+        self._data_frames = {}
+        self._indicators = None
+        self._calendar = None
+
+        self._dates = dates
+
+        ## Slices share the symbols and their column maps with the
+        ## data set they are taken from, as the columns don't change.
+        if symbol_maps is None:
+            self.symbols = list(symbols)
+            self._index_to_symbol = dict(enumerate(self.symbols))
+            self._symbol_to_index = dict(
+                (symbol, index) for (index, symbol) in self._index_to_symbol.items()
+            )
+        else:
+            self.symbols = symbols
+            (self._index_to_symbol, self._symbol_to_index) = symbol_maps
+
+        self.start_date = self._dates[0] if len(self._dates) > 0 else None
+        self.end_date = self._dates[-1] if len(self._dates) > 0 else None
+
+        self.shape = (len(self._dates), len(self.symbols))
+
     def __getitem__(self, key: str):
         if type(key) != str:
             raise ValueError("Data needs a string key")
@@ -56,12 +177,78 @@ class EquityEOD:
             )
 
         if self.return_type == "numpy":
-            return self._data[key].to_numpy()
+            return self._field_arrays[self._field_index[key]].view()
         elif self.return_type == "dataframe":
-            return self._data[key]
+            return self._data_frame(key)
         else:
             return
 
+    def _data_frame(self, field):
+        if field not in self._data_frames:
+            self._data_frames[field] = pd.DataFrame(
+                self._field_arrays[self._field_index[field]],
+                index=self._dates,
+                columns=self.symbols,
+            )
+        return self._data_frames[field]
+
+    @property
+    def field_tensor(self):
+        """
+        Read-only (fields, T, N) tensor backing the data set,
+        with the fields ordered as in `equity_eod_fields`.
+
+        Memory-mapped data has no single tensor, one is not built
+        in memory behind the caller's back: a ValueError is raised,
+        read its fields with `field_arrays` instead.
+        """
+        if self._tensor is None:
+            raise ValueError(
+                "Memory-mapped data has no field tensor, use field_arrays."
+            )
+        return self._tensor
+
+    @property
+    def field_arrays(self):
+        """
+        Read-only TxN array of each field, ordered as in
+        `equity_eod_fields`: views into the field tensor, or
+        memory-mapped arrays.
+        """
+        return list(self._field_arrays)
+
+    @property
+    def indicators(self):
+        """
+        IndicatorCache of rolling indicators over the full data set,
+        computed on first use and kept for the life of the data set.
+        """
+        if self._indicators is None:
+            self._indicators = IndicatorCache(self)
+        return self._indicators
+
+    @property
+    def calendar(self):
+        """
+        TradingCalendar of the dates, which every date based
+        lookup goes through. Built on first use.
+        """
+        if self._calendar is None:
+            self._calendar = TradingCalendar(self._dates)
+        return self._calendar
+
+    @property
+    def mmap_path(self):
+        """
+        Directory the data set was opened from with
+        `from_mmap`, None if it is held in memory.
+        """
+        return self._mmap_path
+
+    @property
+    def dtype(self):
+        return self._field_arrays[0].dtype
+
     @property
     def return_type(self):
         return self._return_type
@@ -70,8 +257,8 @@ class EquityEOD:
     def return_type(self, new_value):
         if new_value not in self._allowed_return_types:
             raise ValueError(
-                f""" 
-                Return type must be one of {self._allowed_return_types}, 
+                f"""
+                Return type must be one of {self._allowed_return_types},
                 received {new_value}.
             """
             )
@@ -81,16 +268,32 @@ class EquityEOD:
     def slice(self, from_date: datetime, to_date: datetime):
         """
         Slices the data set from a start date up to,
-        but not including, and end date.
+        but not including, and end date. Dates are
+        compared by day, see TradingCalendar: the day
+        of `to_date` is left out whatever its time.
         """
 
-        sliced_data = {}
-        for field in self._allowed_fields:
-            data_at_field = self._data[field]
-            sliced_data[field] = data_at_field[data_at_field.index >= from_date]
-            sliced_data[field] = sliced_data[field][sliced_data[field].index < to_date]
+        start = self.calendar.index_on_or_after(from_date)
+        stop = self.calendar.index_on_or_after(to_date)
+
+        return self._slice_rows(start, max(stop, start))
+
+    def _slice_rows(self, start: int, stop: int):
+
+        sliced_tensor = None
+        if self._tensor is not None:
+            sliced_tensor = self._tensor[:, start:stop, :]
+        sliced_fields = [field_array[start:stop] for field_array in self._field_arrays]
 
-        return EquityEOD(sliced_data)
+        sliced = EquityEOD._from_field_arrays(
+            sliced_fields,
+            self._dates[start:stop],
+            self.symbols,
+            sliced_tensor,
+            (self._index_to_symbol, self._symbol_to_index),
+        )
+        sliced._calendar = self.calendar.rows(start, stop)
+        return sliced
 
     @property
     def column_index_to_symbol(self):
@@ -99,3 +302,14 @@ class EquityEOD:
     @property
     def symbol_to_column_index(self):
         return self._symbol_to_index
+
+
+def _read_only(array: np.ndarray):
+    """
+    Read-only view of an array, or the array itself if already read-only.
+    """
+    if not array.flags.writeable:
+        return array
+    view = array.view()
+    view.flags.writeable = False
+    return view
@@ -0,0 +1,101 @@
+from .equity_eod import EquityEOD, equity_eod_fields
+
+
+class EquityEODWindow:
+    """
+    Rolling look-back window over an EquityEOD data set.
+
+    The window reads from the field arrays backing the EquityEOD,
+    in memory or memory-mapped, and only keeps start/stop row
+    offsets into them, so moving the window forward is O(1) and
+    field access hands out NumPy views rather than copies.
+
+    The window covers the rows [start, stop), that is up to,
+    but not including, the stop row. This mirrors EquityEOD.slice.
+    """
+
+    def __init__(self, data_source: EquityEOD, look_back: int, stop: int = None):
+
+        if look_back < 0:
+            raise ValueError("Look back must be non-negative, got {}".format(look_back))
+
+        self._data_source = data_source
+        self._look_back = int(look_back)
+
+        self._field_arrays = data_source._field_arrays
+        self._field_index = dict(
+            (field, index) for (index, field) in enumerate(equity_eod_fields)
+        )
+        self._dates = data_source["dates"]
+
+        self.symbols = data_source.symbols
+
+        self._start = 0
+        self._stop = 0
+        self.advance_to(self._look_back if stop is None else stop)
+
+    def advance_to(self, stop: int):
+        """
+        Moves the window so it ends just before the row `stop`.
+        """
+        T = len(self._dates)
+        if stop < 0 or stop > T:
+            raise ValueError(
+                "Window stop {} is out of bounds for data of length {}".format(stop, T)
+            )
+        self._stop = int(stop)
+        self._start = max(0, self._stop - self._look_back)
+
+    def __getitem__(self, key: str):
+        if type(key) != str:
+            raise ValueError("Data needs a string key")
+
+        if key == "dates":
+            return self._dates[self._start : self._stop]
+
+        if key not in self._field_index:
+            raise ValueError(
+                "Key: {},  not recognized. Accepted values are: {}".format(
+                    key, equity_eod_fields
+                )
+            )
+
+        return self._field_arrays[self._field_index[key]][self._start : self._stop]
+
+    @property
+    def start_index(self):
+        return self._start
+
+    @property
+    def stop_index(self):
+        return self._stop
+
+    @property
+    def shape(self):
+        return (self._stop - self._start, len(self.symbols))
+
+    @property
+    def start_date(self):
+        return self._dates[self._start]
+
+    @property
+    def end_date(self):
+        return self._dates[self._stop - 1]
+
+    @property
+    def column_index_to_symbol(self):
+        return self._data_source.column_index_to_symbol
+
+    @property
+    def symbol_to_column_index(self):
+        return self._data_source.symbol_to_column_index
+
+    def to_equity_eod(self):
+        """
+        Materializes the window as a standalone EquityEOD over the
+        same rows, sharing the data. It still builds a new EquityEOD,
+        so avoid it on the hot path.
+        """
+        if self._stop == self._start:
+            raise ValueError("Cannot materialize an empty window.")
+        return self._data_source._slice_rows(self._start, self._stop)
@@ -0,0 +1,110 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+indicator_kinds = ["mean", "std", "zscore", "returns", "ewma"]
+
+
+class IndicatorCache:
+    """
+    Indicators over the fields of an EquityEOD, each computed once
+    over the whole TxN array and memoized by (field, kind, window).
+
+    Kinds:
+    ------
+    mean: rolling mean over the last `window` rows.
+    std: rolling sample standard deviation over the last `window` rows.
+    zscore: (value - mean) / std, from the cached mean and std.
+    returns: value / value `window` rows earlier - 1.
+    ewma: exponentially weighted mean with a span of `window` rows.
+
+    Row t of an indicator only uses rows up to and including t,
+    with NaN until a full window is available, so it is known once
+    row t is. ContextEOD.indicator reads it point-in-time.
+
+    Arrays are read-only and shared by everyone using the same
+    EquityEOD, e.g. all strategies of a sweep in a worker.
+    """
+
+    def __init__(self, data_source):
+        self._data_source = data_source
+        self._indicators = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._indicators)
+
+    def __contains__(self, key):
+        return key in self._indicators
+
+    def get(self, field: str, kind: str, window: int):
+        """
+        The TxN indicator array, computed on first use.
+        """
+        if field not in self._data_source._field_index:
+            raise ValueError(
+                "Field: {}, not recognized. Accepted values are: {}".format(
+                    field, list(self._data_source._field_index.keys())
+                )
+            )
+        if kind not in indicator_kinds:
+            raise ValueError(
+                "Indicator: {}, not recognized. Accepted values are: {}".format(
+                    kind, indicator_kinds
+                )
+            )
+        if window <= 0:
+            raise ValueError("Indicator window must be positive, got {}".format(window))
+
+        key = (field, kind, int(window))
+        indicator = self._indicators.get(key)
+        if indicator is None:
+            indicator = self._compute(field, kind, int(window))
+            indicator.flags.writeable = False
+            with self._lock:
+                indicator = self._indicators.setdefault(key, indicator)
+        return indicator
+
+    def rolling_mean(self, field: str, window: int):
+        return self.get(field, "mean", window)
+
+    def rolling_std(self, field: str, window: int):
+        return self.get(field, "std", window)
+
+    def zscore(self, field: str, window: int):
+        return self.get(field, "zscore", window)
+
+    def returns(self, field: str, window: int = 1):
+        return self.get(field, "returns", window)
+
+    def ewma(self, field: str, window: int):
+        return self.get(field, "ewma", window)
+
+    def clear(self):
+        with self._lock:
+            self._indicators = {}
+
+    def _compute(self, field, kind, window):
+
+        values = self._data_source._field_arrays[self._data_source._field_index[field]]
+
+        if kind == "zscore":
+            mean = self.get(field, "mean", window)
+            std = self.get(field, "std", window)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return (values - mean) / std
+
+        if kind == "returns":
+            returns = np.full(values.shape, np.nan)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                returns[window:] = values[window:] / values[:-window] - 1.0
+            return returns
+
+        frame = pd.DataFrame(values)
+        if kind == "mean":
+            return frame.rolling(window, min_periods=window).mean().to_numpy()
+        if kind == "std":
+            return frame.rolling(window, min_periods=window).std().to_numpy()
+        ## ewma
+        return frame.ewm(span=window, adjust=False).mean().to_numpy()
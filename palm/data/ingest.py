@@ -0,0 +1,120 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import glob
+import importlib.util
+import os
+
+import numpy as np
+import pandas as pd
+
+from .data_utils import equity_eod_from_polygon_columns
+from .eod_cache import polygon_field_columns
+
+ingest_file_formats = ["csv", "parquet"]
+
+
+def load_equity_eod(
+    source,
+    pattern: str = None,
+    symbol_of=None,
+    max_workers: int = 1,
+    use_processes: bool = False,
+    dtype=np.float64,
+):
+    """
+    Loads per symbol files of polygon style bars, as in sample_data,
+    into one EquityEOD.
+
+    Each file holds one symbol's bars with the polygon aggregate
+    columns: "t" the timestamp in milliseconds since the epoch, and
+    "o", "c", "h", "l", "v". Other columns are not read. Files are
+    read as CSV or, for a ".parquet" suffix, as Parquet, which needs
+    pyarrow. CSV files are parsed with pyarrow too when it is installed.
+
+    The bars are aligned on the union of the symbols' trading days,
+    by their integer day numbers, with equity_eod_from_polygon_columns
+    as pulled bars are, without joining data frames. Dates are the
+    days at midnight. Days a symbol has no bar for are NaN, and where
+    a file has several bars on one day the last is kept.
+
+    Parameters:
+    -----------
+    source: str or List[str], a directory, or the list of files.
+    pattern: str, glob of the files to load in a directory, by
+        default every ".csv" and ".parquet" file.
+    symbol_of: Callable[[str], str], symbol of a file path, by default
+        the file name up to the first "-" or ".", e.g. "AAPL" for
+        "AAPL-Sample-Data.csv".
+    max_workers: int, files read at once.
+    use_processes: bool, if True the files are read in a process pool
+        instead of a thread pool, for when parsing is the bottleneck.
+    dtype: np.dtype, of the fields.
+    """
+    if isinstance(source, str):
+        paths = _files_in_directory(source, pattern)
+    else:
+        paths = list(source)
+    if len(paths) == 0:
+        raise ValueError("No files to load from {}".format(source))
+
+    symbol_of = _symbol_of_path if symbol_of is None else symbol_of
+    symbols = [symbol_of(path) for path in paths]
+    if len(set(symbols)) != len(symbols):
+        duplicated = sorted(set(s for s in symbols if symbols.count(s) > 1))
+        raise ValueError("Several files for the symbols: {}".format(duplicated))
+
+    if max_workers == 1:
+        bars = [read_bars(path) for path in paths]
+    else:
+        pool_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        with pool_class(max_workers=max_workers) as pool:
+            bars = list(pool.map(read_bars, paths))
+
+    return equity_eod_from_polygon_columns(
+        dict(zip(symbols, bars)), by_day=True, dtype=dtype
+    )
+
+
+def read_bars(path: str):
+    """
+    Reads one file of polygon style bars into a dictionary of its
+    "t", "o", "c", "h", "l" and "v" columns, in the order of the file:
+    "t" as int64 milliseconds and the others as float64.
+    """
+    file_format = "parquet" if path.endswith(".parquet") else "csv"
+    columns = ["t"] + list(polygon_field_columns.values())
+    try:
+        if file_format == "parquet":
+            frame = pd.read_parquet(path, columns=columns)
+        else:
+            frame = pd.read_csv(path, usecols=columns, engine=_csv_engine())
+    except ValueError as error:
+        raise ValueError(
+            "Could not read the bars of {}: {}".format(path, error)
+        ) from error
+
+    bars = {"t": frame["t"].to_numpy(dtype=np.int64)}
+    for column in polygon_field_columns.values():
+        bars[column] = frame[column].to_numpy(dtype=np.float64)
+    return bars
+
+
+def _files_in_directory(directory: str, pattern: str = None):
+    if not os.path.isdir(directory):
+        raise ValueError("{} is not a directory".format(directory))
+    if pattern is not None:
+        return sorted(glob.glob(os.path.join(directory, pattern)))
+    return sorted(
+        path
+        for file_format in ingest_file_formats
+        for path in glob.glob(os.path.join(directory, "*." + file_format))
+    )
+
+
+def _csv_engine():
+    ## pyarrow parses CSV several times faster, but is optional.
+    return "pyarrow" if importlib.util.find_spec("pyarrow") is not None else "c"
+
+
+def _symbol_of_path(path: str):
+    name = os.path.basename(path)
+    return name.split("-")[0].split(".")[0]
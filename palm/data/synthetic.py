@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+
+from .equity_eod import EquityEOD, equity_eod_fields
+
+
+def synthetic_equity_eod(
+    n_days: int = 252,
+    n_symbols: int = 10,
+    start_date="2000-01-03",
+    seed: int = 0,
+    ragged: bool = False,
+    nan_fraction: float = 0.0,
+    annual_drift: float = 0.05,
+    annual_volatility: float = 0.2,
+    dtype=np.float64,
+):
+    """
+    Random EquityEOD for tests and benchmarks, built straight from
+    arrays without any data frames.
+
+    Closes follow a geometric Brownian motion from 100, each open
+    gaps from the previous close, the high and low extend beyond the
+    open and close, and volumes are log-normal.
+
+    Parameters:
+    -----------
+    n_days: int, number of business days T, from `start_date`.
+    n_symbols: int, number of symbols N, named "S0000", "S0001", ...
+    seed: int, seed of the random generator, the same seed gives
+        the same data.
+    ragged: bool, if True every symbol but the first starts trading
+        and may stop trading at a random day, with NaN outside of
+        its history, as for listings and delistings.
+    nan_fraction: float, fraction of the bars, at random, with all
+        fields missing, as for halts or bad data.
+    dtype: np.dtype, of the fields, e.g. np.float32 to halve memory.
+    """
+    if n_days <= 0 or n_symbols <= 0:
+        raise ValueError(
+            "Need at least one day and symbol, got {} days and {} symbols".format(
+                n_days, n_symbols
+            )
+        )
+    if not 0.0 <= nan_fraction < 1.0:
+        raise ValueError("NaN fraction must be in [0, 1), got {}".format(nan_fraction))
+
+    generator = np.random.default_rng(seed)
+    shape = (n_days, n_symbols)
+    daily_drift = annual_drift / 252
+    daily_volatility = annual_volatility / np.sqrt(252)
+
+    tensor = np.empty((len(equity_eod_fields),) + shape, dtype=dtype)
+    field = dict((name, index) for (index, name) in enumerate(equity_eod_fields))
+
+    log_returns = generator.normal(
+        daily_drift - 0.5 * daily_volatility**2, daily_volatility, size=shape
+    )
+    close = 100.0 * np.exp(np.cumsum(log_returns, axis=0))
+    tensor[field["close"]] = close
+    del log_returns
+
+    gaps = generator.normal(0.0, 0.25 * daily_volatility, size=shape)
+    previous_close = np.vstack([np.full((1, n_symbols), 100.0), close[:-1]])
+    tensor[field["open"]] = previous_close * np.exp(gaps)
+    del gaps, previous_close
+
+    open_ = tensor[field["open"]]
+    spread = np.abs(generator.normal(0.0, 0.5 * daily_volatility, size=shape))
+    tensor[field["high"]] = np.maximum(open_, close) * (1.0 + spread)
+    spread = np.abs(generator.normal(0.0, 0.5 * daily_volatility, size=shape))
+    tensor[field["low"]] = np.minimum(open_, close) * (1.0 - spread)
+    del spread, close
+
+    tensor[field["volume"]] = np.round(
+        generator.lognormal(np.log(1e6), 0.5, size=shape)
+    )
+
+    missing = np.zeros(shape, dtype=bool)
+    if ragged:
+        rows = np.arange(n_days)[:, None]
+        first_day = generator.integers(0, max(n_days // 2, 1), size=n_symbols)
+        last_day = np.where(
+            generator.random(n_symbols) < 0.2,
+            generator.integers(n_days // 2, n_days, size=n_symbols),
+            n_days - 1,
+        )
+        first_day[0], last_day[0] = 0, n_days - 1
+        missing |= (rows < first_day) | (rows > last_day)
+    if nan_fraction > 0:
+        missing |= generator.random(shape) < nan_fraction
+    if np.any(missing):
+        tensor[:, missing] = np.nan
+
+    dates = pd.bdate_range(start=start_date, periods=n_days)
+    width = max(4, len(str(n_symbols - 1)))
+    symbols = ["S{:0{}d}".format(i, width) for i in range(n_symbols)]
+
+    return EquityEOD.from_arrays(tensor, dates, symbols)
@@ -0,0 +1,100 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+
+def to_day_number(date):
+    """
+    Days since the unix epoch of the calendar day of `date`, a
+    datetime, date, Timestamp, np.datetime64 or ISO string. The time
+    of day, and the time zone of aware datetimes, are ignored.
+    """
+    if isinstance(date, datetime):
+        date = date.date()
+    return int(np.datetime64(date, "D").astype(np.int64))
+
+
+def to_day_numbers(dates):
+    """
+    Day numbers of each of `dates`, as an int64 array.
+    """
+    dates = pd.DatetimeIndex(dates)
+    if dates.tz is not None:
+        dates = dates.tz_localize(None)
+    return dates.values.astype("datetime64[D]").astype(np.int64)
+
+
+class TradingCalendar:
+    """
+    The trading days of an EquityEOD as sorted int64 day numbers,
+    resolving dates to row indices with np.searchsorted, in O(log T)
+    per date instead of comparing every date.
+
+    Dates resolve by calendar day: a date matches the row on the same
+    day whatever the time of either.
+
+    Example:
+    --------
+    calendar = eod_data.calendar
+    start = calendar.index_on_or_after(datetime(2020, 3, 1))
+    close = eod_data["close"][start:]
+    """
+
+    def __init__(self, dates):
+        days = to_day_numbers(dates)
+        if np.any(np.diff(days) < 0):
+            raise ValueError("Trading days need to be sorted.")
+        days.flags.writeable = False
+        self.days = days
+
+    def rows(self, start: int, stop: int):
+        """
+        Calendar of the rows from start up to stop, sharing the arrays.
+        """
+        calendar = TradingCalendar.__new__(TradingCalendar)
+        calendar.days = self.days[start:stop]
+        return calendar
+
+    def __len__(self):
+        return len(self.days)
+
+    def __contains__(self, date):
+        day = to_day_number(date)
+        row = np.searchsorted(self.days, day)
+        return bool(row < len(self.days) and self.days[row] == day)
+
+    def index_of(self, date):
+        """
+        Row of the trading day `date`, raises a ValueError if it
+        isn't one.
+        """
+        day = to_day_number(date)
+        row = int(np.searchsorted(self.days, day))
+        if row == len(self.days) or self.days[row] != day:
+            raise ValueError("{} is not a trading day.".format(date))
+        return row
+
+    def indices_of(self, dates):
+        """
+        Rows of each of `dates`, raises a ValueError if any isn't a
+        trading day.
+        """
+        days = to_day_numbers(dates)
+        rows = np.searchsorted(self.days, days)
+        found = rows < len(self.days)
+        found[found] = self.days[rows[found]] == days[found]
+        if not np.all(found):
+            raise ValueError(
+                "Dates are not trading days: {}".format(
+                    list(pd.DatetimeIndex(dates)[~found].date)
+                )
+            )
+        return rows
+
+    def index_on_or_after(self, date):
+        """
+        Row of the first trading day on or after `date`,
+        len(self) if there is none.
+        """
+        return int(np.searchsorted(self.days, to_day_number(date), side="left"))
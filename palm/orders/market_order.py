@@ -1,7 +1,7 @@
 from enum import Enum
 import pprint
 
-from palm.utils.generate_id import generate_hex_id
+from palm.utils.generate_id import next_sequence_id
 
 
 class MarketOrderType(Enum):
@@ -17,6 +17,20 @@ class MarketOrderStatus(Enum):
 
 
 class MarketOrder:
+    __slots__ = (
+        "id",
+        "_id_sequence",
+        "_type",
+        "_symbol",
+        "_quantity",
+        "status",
+        "time_submitted",
+        "fulfilled",
+        "time_closed",
+        "failure_reason",
+        "avg_price",
+    )
+
     @staticmethod
     def Buy(symbol, quantity):
         return MarketOrder(MarketOrderType.BUY, symbol, quantity)
@@ -25,9 +39,12 @@ class MarketOrder:
     def Sell(symbol, quantity):
         return MarketOrder(MarketOrderType.SELL, symbol, quantity)
 
-    def __init__(self, type: MarketOrderType, symbol, quantity):
+    def __init__(self, type: MarketOrderType, symbol, quantity, order_id: tuple = None):
 
-        self.id = generate_hex_id()
+        ## order_id is a (sequence, id) pair, see next_sequence_id.
+        (self._id_sequence, self.id) = (
+            next_sequence_id() if order_id is None else order_id
+        )
 
         if quantity <= 0:
             raise ValueError("Market Order Quantity must be postive.")
@@ -71,7 +88,7 @@ class MarketOrder:
         return self._quantity
 
     def __eq__(self, other) -> bool:
-        return self.id == other.id
+        return self.id == other.id and self._id_sequence is other._id_sequence
 
     def __hash__(self) -> int:
         return hash(self.id)
@@ -1,3 +1,4 @@
 from .position import *
 from .long_position import *
 from .short_position import *
+from .position_book import *
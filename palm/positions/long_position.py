@@ -10,10 +10,12 @@ class LongPosition(Position):
     to the context to update its current market value
     """
 
-    def __init__(self, context: ContextEOD, order: MarketOrder):
+    __slots__ = ("order", "symbol", "quantity", "side")
+
+    def __init__(self, context: ContextEOD, order: MarketOrder, position_id=None):
         super(LongPosition, self).__init__(
-            context
-        )  ## assigns context and opening time.
+            context, position_id
+        )  ## assigns context, opening time and id.
 
         if order.type != MarketOrderType.BUY:
             raise ValueError("Long position requires a buy order.")
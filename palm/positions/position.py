@@ -3,7 +3,7 @@ from enum import Enum
 import pprint
 
 from ..context.daily_bar_context import ContextEOD
-from ..utils.generate_id import generate_hex_id
+from ..utils.generate_id import next_sequence_id
 
 
 class Position:
@@ -13,6 +13,16 @@ class Position:
     and the current market value is given by the context.
     """
 
+    __slots__ = (
+        "_context",
+        "time_opened",
+        "id",
+        "_id_sequence",
+        "status",
+        "time_closed",
+        "have_already_been_closed",
+    )
+
     class Status(Enum):
         OPEN = 1
         CLOSED = 2
@@ -21,12 +31,16 @@ class Position:
         LONG = 1
         SHORT = 2
 
-    def __init__(self, context: ContextEOD):
+    def __init__(self, context: ContextEOD, position_id: tuple = None):
 
         self._context = context
         self.time_opened = context.current_time()
 
-        self.id = generate_hex_id()
+        ## A given (sequence, id) pair, e.g. of a snapshot, doesn't draw
+        ## from the sequence, see next_sequence_id.
+        (self._id_sequence, self.id) = (
+            next_sequence_id() if position_id is None else position_id
+        )
         self.status = Position.Status.OPEN
         self.time_closed = None
         self.have_already_been_closed: bool = False
@@ -41,10 +55,10 @@ class Position:
         return
 
     def __eq__(self, other):
-        return self.id == other.id
+        return self.id == other.id and self._id_sequence is other._id_sequence
 
     def __hash__(self) -> int:
-        return hash(str(self.id))
+        return hash(self.id)
 
     @abstractmethod
     def increase(self, amount):
@@ -0,0 +1,128 @@
+import numpy as np
+
+from ..context.daily_bar_context import ContextEOD
+from ..orders.market_order import MarketOrder, MarketOrderType
+from ..utils.generate_id import next_sequence_id
+from .long_position import LongPosition
+from .short_position import ShortPosition
+
+
+class PositionBook:
+    """
+    Holdings kept as one signed quantity vector aligned with
+    the context symbols, longs positive and shorts negative.
+
+    The value of the whole book is a single dot product with the
+    current market prices. LongPosition/ShortPosition objects are only
+    built on request, as snapshots: changing them does not change the
+    book, and they don't follow later fills.
+
+    Ids are drawn when a position is opened, never by a snapshot, so
+    how often positions are read doesn't change the ids of the orders,
+    positions and trades made after.
+    """
+
+    def __init__(self, context: ContextEOD):
+        self._context = context
+        self._symbol_to_index = context._data_source.symbol_to_column_index
+        self._symbols = context.symbols
+        self._quantities = np.zeros(len(self._symbols))
+        ## Opening order (None if it had none), time, position id and the
+        ## id of the opening order made up for snapshots of each position.
+        self._openings = {}
+
+    @property
+    def quantities(self):
+        """
+        Read-only view of the signed quantities.
+        """
+        view = self._quantities.view()
+        view.flags.writeable = False
+        return view
+
+    def quantity(self, symbol):
+        return self._quantities[self._symbol_to_index[symbol]]
+
+    def apply_fill(self, order: MarketOrder, signed_quantity):
+        """
+        Adds a signed quantity to the holdings of the order's symbol.
+        """
+        symbol = order.symbol
+        index = self._symbol_to_index[symbol]
+        previous_quantity = self._quantities[index]
+        new_quantity = previous_quantity + signed_quantity
+        self._quantities[index] = new_quantity
+
+        if new_quantity == 0:
+            self._openings.pop(symbol, None)
+        elif previous_quantity == 0 or previous_quantity * new_quantity < 0:
+            self._openings[symbol] = (
+                order,
+                self._context.current_time(),
+                next_sequence_id(),
+                None,
+            )
+
+    def apply_fills(self, indices: np.ndarray, signed_quantities: np.ndarray):
+        """
+        Adds signed quantities to the holdings at the given column
+        indices in one step. Positions opened here have no opening
+        order; their snapshots get one made up from the quantity, with
+        an id drawn here.
+        """
+        previous_quantities = self._quantities[indices]
+        new_quantities = previous_quantities + signed_quantities
+        self._quantities[indices] = new_quantities
+
+        closed = new_quantities == 0
+        opened = ~closed & (previous_quantities * new_quantities <= 0)
+        time_opened = self._context.current_time()
+        for index in indices[closed]:
+            self._openings.pop(self._symbols[index], None)
+        for index in indices[opened]:
+            self._openings[self._symbols[index]] = (
+                None,
+                time_opened,
+                next_sequence_id(),
+                next_sequence_id(),
+            )
+
+    def market_value(self, prices: np.ndarray = None):
+        """
+        Signed market value of all holdings, at the current
+        market prices of the context unless prices are given.
+        """
+        if prices is None:
+            prices = self._context.current_market_prices()
+        held = np.flatnonzero(self._quantities)
+        return np.dot(self._quantities[held], prices[held])
+
+    def position(self, symbol):
+        """
+        Snapshot of the position in a symbol, or None if flat.
+        """
+        quantity = self.quantity(symbol)
+        if quantity == 0:
+            return None
+
+        order, time_opened, position_id, order_id = self._openings[symbol]
+        if order is None:
+            order_type = MarketOrderType.BUY if quantity > 0 else MarketOrderType.SELL
+            order = MarketOrder(order_type, symbol, abs(quantity), order_id=order_id)
+
+        if quantity > 0:
+            position = LongPosition(self._context, order, position_id)
+        else:
+            position = ShortPosition(self._context, order, position_id)
+        position.quantity = int(abs(quantity))
+        position.time_opened = time_opened
+        return position
+
+    def positions(self):
+        """
+        Snapshots of all open positions, keyed by symbol.
+        """
+        return dict(
+            (self._symbols[index], self.position(self._symbols[index]))
+            for index in np.flatnonzero(self._quantities)
+        )
@@ -30,3 +30,80 @@ def autocovariance(x: np.ndarray, k=0):
     else:
         A_k = 1 / (T - 1) * np.dot(x_tilde.transpose(), x_tilde)
     return A_k
+
+
+def autocovariance_fft(x: np.ndarray, max_lag: int, block_size: int = 64):
+    """
+    Autocovariance matrices of a TxN series for every lag up to
+    `max_lag`, computed with FFTs along time rather than one
+    dense product per lag.
+
+    Parameters:
+    -----------
+    x: np.ndarray, TxN series.
+    max_lag: int, largest lag K returned, below T - 1.
+    block_size: int, number of columns whose cross spectra are
+        transformed back together, bounding the memory used to
+        about block_size * N * 2T complex numbers.
+
+    Returns:
+    --------
+    A: np.ndarray, (K + 1)xNxN, where A[k] equals autocovariance(x, k),
+        that is A[k][i, j] is the covariance of column i with
+        column j k rows earlier, normalized by 1 / (T - k - 1).
+        NaN values count as the column mean.
+    """
+    spectrum, T, n_fft = _centered_spectrum(x, max_lag)
+    N = spectrum.shape[1]
+
+    A = np.empty((max_lag + 1, N, N))
+    for start in range(0, N, block_size):
+        stop = min(start + block_size, N)
+        cross_spectrum = spectrum[:, start:stop, None] * np.conj(spectrum[:, None, :])
+        A[:, start:stop, :] = np.fft.irfft(cross_spectrum, n=n_fft, axis=0)[
+            : max_lag + 1
+        ]
+
+    return A / _lag_normalization(T, max_lag)[:, None, None]
+
+
+def autocovariance_diagonal_fft(x: np.ndarray, max_lag: int):
+    """
+    Autocovariance of each column of a TxN series with itself for
+    every lag up to `max_lag`, i.e. the diagonals of
+    autocovariance_fft, in O(N T log T).
+
+    Returns:
+    --------
+    a: np.ndarray, (K + 1)xN, where a[k, i] = autocovariance(x, k)[i, i].
+        Divide by a[0] for the autocorrelations. For a one
+        dimensional series, a has shape (K + 1,).
+    """
+    spectrum, T, n_fft = _centered_spectrum(x, max_lag)
+    power = spectrum.real**2 + spectrum.imag**2
+    a = np.fft.irfft(power, n=n_fft, axis=0)[: max_lag + 1]
+    a = a / _lag_normalization(T, max_lag)[:, None]
+
+    if x.ndim == 1:
+        return a[:, 0]
+    return a
+
+
+def _centered_spectrum(x, max_lag):
+
+    if x.ndim == 1:
+        x = x[:, None]
+    T = x.shape[0]
+    if max_lag < 0 or max_lag >= T - 1:
+        raise ValueError(
+            "Max lag must be in [0, T - 1), got {} for T = {}".format(max_lag, T)
+        )
+
+    x_tilde = np.nan_to_num(x - np.nanmean(x, axis=0), nan=0.0)
+    ## Pad so that lags up to max_lag don't wrap around.
+    n_fft = 1 << int(np.ceil(np.log2(T + max_lag)))
+    return np.fft.rfft(x_tilde, n=n_fft, axis=0), T, n_fft
+
+
+def _lag_normalization(T, max_lag):
+    return T - np.arange(max_lag + 1) - 1.0
@@ -0,0 +1,285 @@
+import numpy as np
+
+
+class RunningMeanVariance:
+    """
+    Mean and variance of each column of a stream of rows, using
+    Welford's algorithm: O(N) per row and no stored history.
+    NaN entries are skipped, so each column keeps its own count.
+
+    Example:
+    --------
+    class MeanReversion(Strategy):
+        def __init__(self):
+            self.symbols = ["AAPL", "MSFT"]
+            self.schedule = Schedule.closes()
+            self.stats = RunningMeanVariance(2)
+
+        def on_update(self, historical_data, context, trader):
+            prices = context.current_market_prices()
+            self.stats.update(prices)
+            zscore = (prices - self.stats.mean) / self.stats.std
+    """
+
+    def __init__(self, n_columns: int):
+        self._count = np.zeros(n_columns)
+        self._mean = np.zeros(n_columns)
+        self._sum_of_squares = np.zeros(n_columns)
+
+    def update(self, x: np.ndarray):
+        x = np.asarray(x, dtype=np.float64)
+        present = ~np.isnan(x)
+        self._count[present] += 1
+        delta = np.where(present, x - self._mean, 0.0)
+        self._mean[present] += delta[present] / self._count[present]
+        self._sum_of_squares += np.where(present, delta * (x - self._mean), 0.0)
+
+    @property
+    def count(self):
+        return self._count.copy()
+
+    @property
+    def mean(self):
+        return np.where(self._count > 0, self._mean, np.nan)
+
+    @property
+    def variance(self):
+        """
+        Sample variance, NaN for columns with fewer than two values.
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(
+                self._count > 1, self._sum_of_squares / (self._count - 1), np.nan
+            )
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+
+class _RollingRows:
+    """
+    The last `window` rows of a stream, in a ring buffer.
+    """
+
+    def __init__(self, window: int, n_columns: int):
+        if window <= 0:
+            raise ValueError("Window must be positive, got {}".format(window))
+        self.window = window
+        self.rows = np.zeros((window, n_columns))
+        self.count = 0
+
+    def push(self, x: np.ndarray):
+        """
+        Adds a row, returning the row it evicts, or None.
+        """
+        slot = self.count % self.window
+        evicted = self.rows[slot].copy() if self.count >= self.window else None
+        self.rows[slot] = x
+        self.count += 1
+        return evicted
+
+    def row(self, age: int):
+        """
+        The row pushed `age` rows ago, 0 being the latest.
+        """
+        return self.rows[(self.count - 1 - age) % self.window]
+
+    def ordered(self):
+        """
+        The rows held, oldest first.
+        """
+        n = min(self.count, self.window)
+        if self.count <= self.window:
+            return self.rows[:n]
+        return np.roll(self.rows, -(self.count % self.window), axis=0)
+
+    @property
+    def wrapped(self):
+        ## True every `window` rows, when the oldest row is back in slot 0.
+        return self.count % self.window == 0
+
+
+class RollingCovariance:
+    """
+    Sample covariance matrix of the last `window` rows of a stream.
+
+    Keeps the column sums and the sum of outer products of the rows
+    in the window, adding the new row and removing the evicted one
+    in O(N^2) per row, instead of O(window * N^2) from a fresh slice.
+    Once every `window` rows the sums are recomputed from the rows
+    held, so rounding errors don't build up, and NaN rows stop
+    affecting the result once they leave the window.
+    """
+
+    def __init__(self, window: int, n_columns: int):
+        self._rows = _RollingRows(window, n_columns)
+        self._sum = np.zeros(n_columns)
+        self._sum_of_products = np.zeros((n_columns, n_columns))
+
+    def update(self, x: np.ndarray):
+        x = np.asarray(x, dtype=np.float64)
+        evicted = self._rows.push(x)
+
+        if self._rows.wrapped:
+            rows = self._rows.ordered()
+            self._sum = rows.sum(axis=0)
+            self._sum_of_products = rows.T @ rows
+            return
+
+        self._sum += x
+        self._sum_of_products += np.outer(x, x)
+        if evicted is not None:
+            self._sum -= evicted
+            self._sum_of_products -= np.outer(evicted, evicted)
+
+    @property
+    def count(self):
+        return min(self._rows.count, self._rows.window)
+
+    @property
+    def is_ready(self):
+        return self._rows.count >= self._rows.window
+
+    @property
+    def mean(self):
+        return self._sum / self.count
+
+    @property
+    def covariance(self):
+        n = self.count
+        if n < 2:
+            return np.full(self._sum_of_products.shape, np.nan)
+        return (self._sum_of_products - np.outer(self._sum, self._sum) / n) / (n - 1)
+
+
+class EWMACovariance:
+    """
+    Exponentially weighted mean and covariance matrix of a stream,
+    updated in O(N^2) per row with weight `alpha` on the new row.
+    Give either `alpha` or a `halflife` in rows.
+
+    Starts from the first row as the mean and a zero covariance.
+    """
+
+    def __init__(self, n_columns: int, alpha: float = None, halflife: float = None):
+        if (alpha is None) == (halflife is None):
+            raise ValueError("Give exactly one of alpha or halflife.")
+        if halflife is not None:
+            alpha = 1.0 - 0.5 ** (1.0 / halflife)
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError("Alpha must be in (0, 1], got {}".format(alpha))
+
+        self.alpha = alpha
+        self._count = 0
+        self._mean = np.zeros(n_columns)
+        self._covariance = np.zeros((n_columns, n_columns))
+
+    def update(self, x: np.ndarray):
+        x = np.asarray(x, dtype=np.float64)
+        if self._count == 0:
+            self._mean = x.copy()
+            self._count = 1
+            return
+
+        delta = x - self._mean
+        self._mean += self.alpha * delta
+        self._covariance = (1.0 - self.alpha) * (
+            self._covariance + self.alpha * np.outer(delta, delta)
+        )
+        self._count += 1
+
+    @property
+    def count(self):
+        return self._count
+
+    @property
+    def mean(self):
+        return self._mean.copy()
+
+    @property
+    def covariance(self):
+        return self._covariance.copy()
+
+
+class RollingAutocovariance:
+    """
+    Autocovariance matrix at lag k of the last `window` rows of a
+    stream, the same as research_utils.autocovariance(rows, k) on
+    those rows, with entry (i, j) the covariance of column i with
+    column j k rows earlier.
+
+    Keeps the sum of the lagged outer products x_t x_{t-k}^T over the
+    window and updates it in O(N^2) per row; the centering terms are
+    recovered from the column sums. As with RollingCovariance, the
+    sums are recomputed from the rows held once every `window` rows.
+    """
+
+    def __init__(self, window: int, n_columns: int, lag: int = 1):
+        if lag < 0 or lag >= window - 1:
+            raise ValueError(
+                "Lag must be in [0, window - 1), got {} for a window of {}".format(
+                    lag, window
+                )
+            )
+        self.lag = lag
+        self._rows = _RollingRows(window, n_columns)
+        self._sum = np.zeros(n_columns)
+        self._sum_of_lagged_products = np.zeros((n_columns, n_columns))
+
+    def update(self, x: np.ndarray):
+        x = np.asarray(x, dtype=np.float64)
+        k = self.lag
+        ## The pair leaving the window is the oldest row with the one k after it.
+        leaving_pair = None
+        if self._rows.count >= self._rows.window:
+            leaving_pair = (
+                self._rows.row(self._rows.window - 1 - k).copy(),
+                self._rows.row(self._rows.window - 1).copy(),
+            )
+        evicted = self._rows.push(x)
+
+        if self._rows.wrapped:
+            self._recompute()
+            return
+
+        self._sum += x
+        if self._rows.count > k:
+            self._sum_of_lagged_products += np.outer(x, self._rows.row(k))
+        if evicted is not None:
+            self._sum -= evicted
+            later, earlier = leaving_pair
+            self._sum_of_lagged_products -= np.outer(later, earlier)
+
+    def _recompute(self):
+        rows = self._rows.ordered()
+        k = self.lag
+        self._sum = rows.sum(axis=0)
+        self._sum_of_lagged_products = rows[k:].T @ rows[: len(rows) - k]
+
+    @property
+    def count(self):
+        return min(self._rows.count, self._rows.window)
+
+    @property
+    def is_ready(self):
+        return self._rows.count >= self._rows.window
+
+    @property
+    def autocovariance(self):
+        n = self.count
+        k = self.lag
+        if n - k - 1 <= 0:
+            return np.full(self._sum_of_lagged_products.shape, np.nan)
+
+        mean = self._sum / n
+        ## Sums of the rows paired as the later and as the earlier of each pair.
+        later_sum = self._sum - sum(self._rows.row(n - 1 - age) for age in range(k))
+        earlier_sum = self._sum - sum(self._rows.row(age) for age in range(k))
+        centered = (
+            self._sum_of_lagged_products
+            - np.outer(later_sum, mean)
+            - np.outer(mean, earlier_sum)
+            + (n - k) * np.outer(mean, mean)
+        )
+        return centered / (n - k - 1)
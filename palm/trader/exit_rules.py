@@ -0,0 +1,165 @@
+import numpy as np
+
+from ..trades.trade import Trade
+from ..utils.growable_array import GrowableRecordArray
+
+exit_rule_dtype = np.dtype(
+    [
+        ("entry_value", np.float64),
+        ("gross_value", np.float64),
+        ("stop_loss", np.float64),
+        ("take_profit", np.float64),
+        ("trailing_stop", np.float64),
+        ("peak_return", np.float64),
+        ("entry_index", np.float64),
+        ("max_holding_period", np.float64),
+        ("live", np.bool_),
+    ]
+)
+
+exit_rule_leg_dtype = np.dtype(
+    [
+        ("trade", np.int64),
+        ("symbol", np.int64),
+        ("quantity", np.float64),
+    ]
+)
+
+
+class ExitRuleBook:
+    """
+    Declarative exit rules of all open trades, kept as arrays so
+    they are checked in one vectorized pass per tick.
+
+    Each trade is stored as its legs (symbol column and signed share
+    quantity) plus its entry value, gross entry value and thresholds.
+    The return of a trade is its profit and loss over its gross entry
+    value, sum(|quantity| * entry price). A trade is triggered when:
+
+    stop_loss: return <= -stop_loss
+    take_profit: return >= take_profit
+    trailing_stop: highest return since entry - return >= trailing_stop
+    max_holding_period: date index - entry date index >= max_holding_period
+
+    Thresholds that aren't set are NaN, and never trigger.
+
+    Trades and legs are appended to GrowableRecordArrays, so adding a
+    trade is amortized O(legs). Exited trades are only marked as no
+    longer live, and the arrays are compacted once there are more of
+    them than live trades, so removing is amortized O(1) per trade.
+    """
+
+    def __init__(self, symbol_to_index: dict):
+        self._symbol_to_index = symbol_to_index
+        ## Trade in each slot of the records, None once it has exited.
+        self._trades = []
+        self._slot_of = {}
+
+        self._rules = GrowableRecordArray(exit_rule_dtype, initial_capacity=64)
+        self._legs = GrowableRecordArray(exit_rule_leg_dtype, initial_capacity=128)
+
+    def __len__(self):
+        return len(self._slot_of)
+
+    def __contains__(self, trade):
+        return id(trade) in self._slot_of
+
+    def add(self, trade: Trade, prices: np.ndarray, date_index: int):
+        """
+        Adds an entered trade, using the current prices as entry prices.
+        """
+        slot = len(self._trades)
+        symbols = list(trade.shares.keys())
+
+        legs = np.zeros(len(symbols), dtype=exit_rule_leg_dtype)
+        legs["trade"] = slot
+        legs["symbol"] = [self._symbol_to_index[s] for s in symbols]
+        legs["quantity"] = [trade.shares[s] for s in symbols]
+        entry_prices = prices[legs["symbol"]]
+
+        self._trades.append(trade)
+        self._slot_of[id(trade)] = slot
+        self._legs.extend(legs)
+        self._rules.append(
+            (
+                np.dot(legs["quantity"], entry_prices),
+                np.dot(np.abs(legs["quantity"]), entry_prices),
+                _threshold(trade.stop_loss),
+                _threshold(trade.take_profit),
+                _threshold(trade.trailing_stop),
+                0.0,
+                date_index,
+                _threshold(trade.max_holding_period),
+                True,
+            )
+        )
+
+    def triggered(self, prices: np.ndarray, date_index: int):
+        """
+        Checks every trade against the prices and date index, removes
+        the triggered ones from the book and returns them.
+        """
+        if len(self) == 0:
+            return []
+
+        rules = self._rules.writeable_records
+        legs = self._legs.records
+        values = np.bincount(
+            legs["trade"],
+            weights=legs["quantity"] * prices[legs["symbol"]],
+            minlength=len(rules),
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = (values - rules["entry_value"]) / rules["gross_value"]
+        rules["peak_return"] = np.fmax(rules["peak_return"], returns)
+
+        with np.errstate(invalid="ignore"):
+            triggered = rules["live"] & (
+                (returns <= -rules["stop_loss"])
+                | (returns >= rules["take_profit"])
+                | (rules["peak_return"] - returns >= rules["trailing_stop"])
+                | (date_index - rules["entry_index"] >= rules["max_holding_period"])
+            )
+        if not np.any(triggered):
+            return []
+
+        slots = np.flatnonzero(triggered)
+        triggered_trades = [self._trades[slot] for slot in slots]
+        for slot in slots:
+            self._retire(slot)
+        self._compact_if_sparse()
+        return triggered_trades
+
+    def remove(self, trade: Trade):
+        slot = self._slot_of.get(id(trade))
+        if slot is None:
+            return
+        self._retire(slot)
+        self._compact_if_sparse()
+
+    def _retire(self, slot: int):
+        del self._slot_of[id(self._trades[slot])]
+        self._trades[slot] = None
+        self._rules.writeable_records["live"][slot] = False
+
+    def _compact_if_sparse(self):
+        ## Drop the exited trades once they outnumber the live ones.
+        exited = len(self._trades) - len(self._slot_of)
+        if exited <= max(len(self._slot_of), 32):
+            return
+
+        live = self._rules.records["live"].copy()
+        renumbered = np.cumsum(live) - 1
+        self._legs.keep(live[self._legs.records["trade"]])
+        legs = self._legs.writeable_records
+        legs["trade"] = renumbered[legs["trade"]]
+        self._rules.keep(live)
+
+        self._trades = [trade for trade in self._trades if trade is not None]
+        self._slot_of = dict(
+            (id(trade), slot) for (slot, trade) in enumerate(self._trades)
+        )
+
+
+def _threshold(value):
+    return np.nan if value is None else float(value)
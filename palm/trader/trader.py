@@ -5,14 +5,15 @@ from ..context.context_observable import ContextObservable
 from ..broker.simulated_broker import SimulatedBroker
 from ..utils.generate_id import generate_hex_id
 from ..trades.trade import Trade
+from .exit_rules import ExitRuleBook
 
 
 def weights_as_a_percentage_of_total_portfolio_value(broker: SimulatedBroker):
     positions = broker.all_positions
-    portfolio_value = broker.portfolio_value
+    portfolio_value = broker.portfolio_value()
 
     weights = {}
-    for position_symbol, position in positions:
+    for position_symbol, position in positions.items():
         weights[position_symbol] = position.current_dollar_value / portfolio_value
 
     return weights
@@ -24,15 +25,27 @@ class SimulatedTrader:
     "trades" which are a single unit intended to be 
     """
 
-    def __init__(self, context: ContextObservable, initial_deposit):
+    def __init__(
+        self,
+        context: ContextObservable,
+        initial_deposit,
+        use_position_book: bool = False,
+    ):
 
         self.open_trades = []
         self.closed_trades = []
         self._context = context
-        self.broker = SimulatedBroker(context, initial_deposit)
+        self.broker = SimulatedBroker(
+            context, initial_deposit, use_position_book=use_position_book
+        )
         self._id = generate_hex_id()
 
-        self._context.add_observer(self._id, self.on_context_update)
+        ## Declarative exits are checked together, callables one by one.
+        self._exit_rule_book = ExitRuleBook(
+            context._data_source.symbol_to_column_index
+        )
+        self._trades_with_exit_rule = []
+        self._observing_context = False
 
         return
 
@@ -43,23 +56,38 @@ class SimulatedTrader:
         trade.submit_entry_order(self.broker)
         self.open_trades.append(trade)
 
+        if trade.has_declarative_exit:
+            self._exit_rule_book.add(
+                trade,
+                self._context.current_market_prices(),
+                self._context.current_date_index(),
+            )
+        if trade.has_exit_rule:
+            self._trades_with_exit_rule.append(trade)
+        self._observe_context_while_exits_pending()
+
         return
 
     def rebalance_to_weights(self, target_weights):
-
-        symbol_list = self._context._data.symbols 
-        broker_weights = weights_as_a_percentage_of_total_portfolio_value(self.broker)
-        current_weights = np.zeros(len(symbol_list))
-
-        for i, symbol in enumerate(symbol_list):
-            if symbol in broker_weights.keys():
-                current_weights[i] = broker_weights[symbol]
-        
-        diff = target_weights - current_weights 
-        order_sizes = np.round(diff * self.broker.current_portfolio_value / self._context.current_market_prices)
-        trade_dict = dict([(key, value) for key, value in zip(symbol_list, order_sizes)])
-
-        self.submit_trade(trade_dict)
+        """
+        Trades towards the target weights, given as fractions of
+        the current portfolio value and aligned with the context
+        symbols. Share counts are rounded to the nearest integer
+        and NaN weights leave the symbol untouched.
+
+        The orders go to the broker as one batch, see
+        SimulatedBroker.submit_orders: sells fill before buys so their
+        credit funds the buys, and an order can flip a position from
+        long to short, or back, in one step.
+        """
+
+        target_quantities = np.round(
+            target_weights
+            * self.broker.portfolio_value()
+            / self._context.current_market_prices()
+        )
+        order_sizes = target_quantities - self.broker.position_quantities()
+        self.broker.submit_orders(order_sizes)
 
         return
 
@@ -69,16 +97,45 @@ class SimulatedTrader:
 
     def liquidate_all_positions(self):
 
-        for trade in self.open_trades:
+        for trade in list(self.open_trades):
             if trade.status == Trade.Status.ACTIVE:
-                trade.submit_exit_order(self.broker)
-                self.closed_trades.append(trade)
-                self.open_trades.remove(trade)
+                self._exit_trade(trade)
 
     def on_context_update(self):
 
-        for trade in self.open_trades:
+        if len(self._exit_rule_book) > 0:
+            triggered = self._exit_rule_book.triggered(
+                self._context.current_market_prices(),
+                self._context.current_date_index(),
+            )
+            for trade in triggered:
+                self._exit_trade(trade)
+
+        ## Slow path, arbitrary callables.
+        for trade in list(self._trades_with_exit_rule):
             if (trade.status == Trade.Status.ACTIVE) and (trade.exit_rule_triggered()):
-                trade.submit_exit_order(self.broker)
-                self.closed_trades.append(trade)
-                self.open_trades.remove(trade)
+                self._exit_trade(trade)
+
+    def _exit_trade(self, trade: Trade):
+
+        trade.submit_exit_order(self.broker)
+        self.closed_trades.append(trade)
+        self.open_trades.remove(trade)
+        if trade.has_declarative_exit:
+            self._exit_rule_book.remove(trade)
+        if trade.has_exit_rule:
+            self._trades_with_exit_rule.remove(trade)
+        self._observe_context_while_exits_pending()
+
+    def _observe_context_while_exits_pending(self):
+        ## Only observe the context while there are exits to check, so
+        ## it can skip ticks nothing needs, see ContextEOD.advance_to.
+        exits_pending = (
+            len(self._exit_rule_book) > 0 or len(self._trades_with_exit_rule) > 0
+        )
+        if exits_pending and not self._observing_context:
+            self._context.add_observer(self._id, self.on_context_update)
+            self._observing_context = True
+        elif not exits_pending and self._observing_context:
+            self._context.remove_observer(self._id)
+            self._observing_context = False
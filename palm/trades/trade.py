@@ -2,21 +2,69 @@ from enum import Enum
 import pprint
 from typing import Callable, Dict
 
-from palm.utils.generate_id import generate_hex_id
+from palm.utils.generate_id import next_sequence_id
 
-from ..orders.market_order import MarketOrder
+from ..orders.market_order import MarketOrder, MarketOrderType
 
 class Trade:
+    __slots__ = (
+        "id",
+        "_id_sequence",
+        "_shares",
+        "_exit_rule",
+        "stop_loss",
+        "take_profit",
+        "trailing_stop",
+        "max_holding_period",
+        "_entry_orders",
+        "_exit_orders",
+        "status",
+        "_context",
+        "_trade_complete",
+        "_initial_value",
+        "_exit_value",
+    )
+
     class Status(Enum):
         INACTIVE = 1
         ACTIVE = 2
         COMPLETE = 3
 
-    def __init__(self, number_of_shares: Dict[str, int], exit_rule: Callable = None):
-
-        self.id = generate_hex_id()
+    def __init__(
+        self,
+        number_of_shares: Dict[str, int],
+        exit_rule: Callable = None,
+        stop_loss: float = None,
+        take_profit: float = None,
+        trailing_stop: float = None,
+        max_holding_period: int = None,
+    ):
+        """
+        Parameters:
+        -----------
+        number_of_shares: Dict[str, int], signed shares per symbol.
+        exit_rule: Callable, returns True when the trade should exit.
+            Checked one trade at a time on every tick, so prefer the
+            declarative rules below where they fit.
+        stop_loss: float, exit once the loss reaches this fraction of
+            the gross entry value.
+        take_profit: float, exit once the profit reaches this fraction
+            of the gross entry value.
+        trailing_stop: float, exit once the return falls this far
+            below the highest return since entry.
+        max_holding_period: int, exit after this many days.
+
+        The declarative rules are checked for all open trades at once
+        by the SimulatedTrader, see ExitRuleBook.
+        """
+
+        (self._id_sequence, self.id) = next_sequence_id()
         self._shares = number_of_shares
         self._exit_rule = exit_rule
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.trailing_stop = trailing_stop
+        self.max_holding_period = max_holding_period
         self._entry_orders = []
         self._exit_orders = []
 
@@ -43,7 +91,7 @@ class Trade:
             self._entry_orders.append(order)
 
         ## By default, want to do all the selling before the buying.
-        sorted(self._entry_orders, key=lambda order: order.quantity)
+        self._entry_orders.sort(key=lambda order: order.type == MarketOrderType.BUY)
         for order in self._entry_orders:
             broker.submit_order(order)
 
@@ -66,7 +114,7 @@ class Trade:
 
             self._exit_orders.append(order)
 
-        sorted(self._exit_orders, key=lambda order: order.quantity)
+        self._exit_orders.sort(key=lambda order: order.type == MarketOrderType.BUY)
         for order in self._exit_orders:
             broker.submit_order(order)
 
@@ -76,6 +124,23 @@ class Trade:
         self._trade_complete = True
         return
 
+    @property
+    def shares(self):
+        return self._shares
+
+    @property
+    def has_exit_rule(self):
+        return self._exit_rule is not None
+
+    @property
+    def has_declarative_exit(self):
+        return (
+            self.stop_loss is not None
+            or self.take_profit is not None
+            or self.trailing_stop is not None
+            or self.max_holding_period is not None
+        )
+
     def exit_rule_triggered(self):
         if self._exit_rule is None:
             return False
@@ -108,7 +173,10 @@ class Trade:
             raise RuntimeError("Trade Status not recognized.")
 
     def __eq__(self, other):
-        return self.id == other.id
+        return self.id == other.id and self._id_sequence is other._id_sequence
+
+    def __hash__(self) -> int:
+        return hash(self.id)
 
     def __repr__(self) -> str:
         pp = pprint.PrettyPrinter(indent=4)
@@ -1,7 +1,88 @@
+from contextlib import contextmanager
+import itertools
 import random
+import threading
 
 
 def generate_hex_id(length=32):
     rand_int = random.randrange(10**80)
     hex_id = hex(rand_int)[:length]
     return hex_id
+
+
+class IdSequence:
+    """
+    Monotonic sequence of integer ids starting from `seed`.
+
+    Orders, positions and trades draw their ids with next_id from the
+    sequence active in the current thread, see `activated`, or from a
+    process wide one when none is. A session with an id seed activates
+    its own sequence for the length of its run, so its ids don't
+    depend on what else ran in the process before or in between.
+
+    Ids are unique within a sequence only. Objects compare by the
+    (sequence, id) pair from next_sequence_id, so an object made
+    outside a session never equals one made inside it.
+
+    Example:
+    --------
+    with IdSequence(0).activated():
+        order = MarketOrder.Buy("SPY", 1)  ## order.id == 0
+    """
+
+    def __init__(self, seed: int = 0):
+        self._counter = itertools.count(seed)
+
+    def next(self):
+        return next(self._counter)
+
+    @contextmanager
+    def activated(self):
+        previous = getattr(_active, "sequence", None)
+        _active.sequence = self
+        try:
+            yield self
+        finally:
+            _active.sequence = previous
+
+
+## Process wide id sequence, used when no sequence is active.
+_process_sequence = IdSequence()
+_active = threading.local()
+
+
+def active_sequence():
+    """
+    IdSequence active in the current thread, or the process wide one.
+    """
+    sequence = getattr(_active, "sequence", None)
+    if sequence is None:
+        sequence = _process_sequence
+    return sequence
+
+
+def next_id():
+    """
+    Next id of the active IdSequence. Much cheaper than generate_hex_id.
+    """
+    return active_sequence().next()
+
+
+def next_sequence_id():
+    """
+    (sequence, id) pair of the next id of the active IdSequence.
+    Orders, positions and trades keep both and compare by the pair,
+    as the same id can be drawn from two sequences.
+    """
+    sequence = active_sequence()
+    return (sequence, sequence.next())
+
+
+def reset_ids(seed: int = 0):
+    """
+    Restarts the process wide id sequence so its next id is `seed`.
+    Ids are unique within a sequence only, objects made before a reset
+    can share ids with objects made after it but never compare equal.
+    """
+    global _process_sequence
+    _process_sequence = IdSequence(seed)
@@ -0,0 +1,64 @@
+import numpy as np
+
+
+class GrowableRecordArray:
+    """
+    Preallocated NumPy structured array that doubles its
+    capacity when full, so appending is amortized O(1) and
+    no Python object is kept per record.
+    """
+
+    def __init__(self, dtype, initial_capacity: int = 1024):
+        self._records = np.zeros(max(int(initial_capacity), 1), dtype=dtype)
+        self._size = 0
+
+    def append(self, record: tuple):
+        if self._size == len(self._records):
+            self._grow(2 * len(self._records))
+        self._records[self._size] = record
+        self._size += 1
+
+    def extend(self, records: np.ndarray):
+        """
+        Appends a structured array of records with the same dtype.
+        """
+        required = self._size + len(records)
+        if required > len(self._records):
+            self._grow(max(required, 2 * len(self._records)))
+        self._records[self._size : required] = records
+        self._size = required
+
+    def _grow(self, capacity):
+        grown = np.zeros(capacity, dtype=self._records.dtype)
+        grown[: self._size] = self._records[: self._size]
+        self._records = grown
+
+    def keep(self, mask: np.ndarray):
+        """
+        Keeps, in order, only the records where `mask` is True.
+        """
+        kept = self._records[: self._size][mask]
+        self._records[: len(kept)] = kept
+        self._size = len(kept)
+
+    @property
+    def writeable_records(self):
+        """
+        View of the records appended so far, for updating in place.
+        """
+        return self._records[: self._size]
+
+    @property
+    def records(self):
+        """
+        Read-only view of the records appended so far.
+        """
+        view = self._records[: self._size]
+        view.flags.writeable = False
+        return view
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        return self.records[index]
@@ -0,0 +1,170 @@
+import time
+import tracemalloc
+
+
+class PhaseStats:
+    """
+    Calls to a phase and the time spent in them, in seconds.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.total_time = 0.0
+
+    @property
+    def mean_time(self):
+        return self.total_time / self.calls if self.calls > 0 else 0.0
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "total_time": self.total_time,
+            "mean_time": self.mean_time,
+        }
+
+    def __repr__(self) -> str:
+        return "PhaseStats(calls={}, total_time={:.6f})".format(
+            self.calls, self.total_time
+        )
+
+
+class ProfileReport:
+    """
+    Result of a profiled run.
+
+    wall_time: float, seconds from start to stop.
+    events: int, ticks simulated.
+    events_per_second: float, events over the wall time.
+    phases: Dict[str, PhaseStats], per phase. Phases nest, e.g. the
+        broker phase includes the cash phase of the withdrawals it
+        makes, so their times don't add up to the wall time.
+    peak_memory: int, peak bytes allocated while profiling, as traced
+        by tracemalloc, None if memory wasn't traced.
+    """
+
+    def __init__(self, wall_time, events, phases, peak_memory=None):
+        self.wall_time = wall_time
+        self.events = events
+        self.events_per_second = events / wall_time if wall_time > 0 else 0.0
+        self.phases = phases
+        self.peak_memory = peak_memory
+
+    def to_dict(self):
+        return {
+            "wall_time": self.wall_time,
+            "events": self.events,
+            "events_per_second": self.events_per_second,
+            "peak_memory": self.peak_memory,
+            "phases": dict(
+                (name, stats.to_dict()) for (name, stats) in self.phases.items()
+            ),
+        }
+
+    def __repr__(self) -> str:
+        lines = [
+            "Wall time: {:.4f}s, {} events, {:.0f} events/s".format(
+                self.wall_time, self.events, self.events_per_second
+            )
+        ]
+        if self.peak_memory is not None:
+            lines.append("Peak memory: {:.1f} MiB".format(self.peak_memory / 2**20))
+        for (name, stats) in sorted(
+            self.phases.items(), key=lambda item: -item[1].total_time
+        ):
+            lines.append(
+                "  {:<20} {:>10} calls {:>10.4f}s".format(
+                    name, stats.calls, stats.total_time
+                )
+            )
+        return "\n".join(lines)
+
+
+class Profiler:
+    """
+    Opt-in timing of named phases of a run.
+
+    Methods are instrumented per instance: `instrument` shadows a
+    bound method with a timing wrapper on that one object and
+    `detach` removes it again. Classes are never changed, so objects
+    that aren't instrumented, and every run without a profiler, pay
+    nothing.
+
+    Example:
+    --------
+    profiler = Profiler()
+    profiler.instrument(broker, "submit_order", "broker")
+    profiler.start()
+    ...
+    report = profiler.stop(events=n_ticks)
+    """
+
+    def __init__(self, trace_memory: bool = True):
+        self.trace_memory = trace_memory
+        self._phases = {}
+        self._depths = {}
+        self._instrumented = []
+        self._start_time = None
+        self._started_tracing = False
+
+    def instrument(self, obj, method_name: str, phase: str):
+        """
+        Times every call to `obj.method_name` under `phase`. Calls
+        made from within a call already timed under the same phase
+        aren't counted again.
+        """
+        method = getattr(obj, method_name)
+        stats = self._phases.setdefault(phase, PhaseStats())
+        self._depths.setdefault(phase, 0)
+        depths = self._depths
+        perf_counter = time.perf_counter
+
+        def timed(*args, **kwargs):
+            if depths[phase] > 0:
+                return method(*args, **kwargs)
+            depths[phase] += 1
+            started = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                stats.total_time += perf_counter() - started
+                stats.calls += 1
+                depths[phase] -= 1
+
+        shadowed = obj.__dict__.get(method_name)
+        setattr(obj, method_name, timed)
+        self._instrumented.append((obj, method_name, shadowed))
+
+    def detach(self):
+        """
+        Restores every instrumented method.
+        """
+        for (obj, method_name, shadowed) in reversed(self._instrumented):
+            if shadowed is None:
+                delattr(obj, method_name)
+            else:
+                setattr(obj, method_name, shadowed)
+        self._instrumented = []
+
+    def start(self):
+        if self.trace_memory:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                self._started_tracing = True
+        self._start_time = time.perf_counter()
+
+    def stop(self, events: int = 0):
+        """
+        Stops timing and returns the ProfileReport.
+        """
+        wall_time = time.perf_counter() - self._start_time
+
+        peak_memory = None
+        if self.trace_memory:
+            _, peak_memory = tracemalloc.get_traced_memory()
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+        return ProfileReport(wall_time, events, dict(self._phases), peak_memory)
@@ -0,0 +1,25 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Spaces out calls to `acquire` so no more than `rate`
+    happen per second, across all threads sharing it.
+    """
+
+    def __init__(self, rate: float):
+        if rate <= 0:
+            raise ValueError("Rate must be positive, got {}".format(rate))
+        self._interval = 1.0 / rate
+        self._next_allowed = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            scheduled = max(now, self._next_allowed)
+            self._next_allowed = scheduled + self._interval
+        wait = scheduled - now
+        if wait > 0:
+            time.sleep(wait)
@@ -19,4 +19,7 @@ setup(
         "tqdm==4.62.3",
         "polygon-api-client",
     ),
+    extras_require={
+        "parquet": ("pyarrow",),
+    },
 )
@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from palm import analytics
+from palm.backtestsession import BacktestBatchSession, BacktestSubscribeSession
+from palm.backtestsession.backtestsession import Strategy
+from palm.context import TimeInMarketDay
+from palm.data import EquityEOD, polygon_symbol_indexed_to_OHCLV_indexed
+
+
+@pytest.fixture
+def eod_data():
+
+    data = {}
+    data["AAPL"] = pd.read_csv("sample_data/AAPL-Sample-Data.csv", index_col=0)
+    data["MSFT"] = pd.read_csv("sample_data/MSFT-Sample-Data.csv", index_col=0)
+
+    return EquityEOD(polygon_symbol_indexed_to_OHCLV_indexed(data))
+
+
+@pytest.fixture
+def equity():
+    generator = np.random.default_rng(0)
+    returns = generator.normal(0.0005, 0.01, size=(250, 6))
+    return 100.0 * np.cumprod(1.0 + returns, axis=0)
+
+
+def test_SharpeAndSortino_MatchPerCurveFormulas(equity):
+
+    sharpe = analytics.sharpe_ratio(equity)
+    sortino = analytics.sortino_ratio(equity)
+
+    for column in range(equity.shape[1]):
+        r = equity[1:, column] / equity[:-1, column] - 1.0
+        downside = np.sqrt(np.mean(np.minimum(r, 0.0) ** 2))
+        assert np.isclose(sharpe[column], np.sqrt(252) * r.mean() / r.std(ddof=1))
+        assert np.isclose(sortino[column], np.sqrt(252) * r.mean() / downside)
+
+
+def test_SweepByTimeMatrix_SameScoresAsTimeBySweep(equity):
+
+    by_time = analytics.performance_summary(equity)
+    by_sweep = analytics.performance_summary(equity.T, axis=1)
+
+    for name in by_time.keys():
+        assert np.allclose(by_time[name], by_sweep[name], equal_nan=True)
+
+
+def test_MaxDrawdownAndDuration_KnownCurve():
+
+    equity = np.array([100.0, 110.0, 99.0, 104.5, 121.0, 115.0])
+
+    assert np.allclose(
+        analytics.drawdowns(equity), [0.0, 0.0, 0.1, 0.05, 0.0, 6.0 / 121.0]
+    )
+    assert np.isclose(analytics.max_drawdown(equity), 0.1)
+    assert analytics.max_drawdown_duration(equity) == 2
+
+
+def test_FlatCurve_UndefinedRatiosAreNaN():
+
+    equity = np.full((10, 2), 100.0)
+    summary = analytics.performance_summary(equity)
+
+    assert np.all(summary["total_return"] == 0.0)
+    assert np.all(np.isnan(summary["sharpe_ratio"]))
+    assert np.all(np.isnan(summary["sortino_ratio"]))
+    assert np.all(np.isnan(summary["hit_rate"]))
+    assert np.all(summary["max_drawdown"] == 0.0)
+
+
+def test_HitRate_GainsOverPeriodsThatMoved():
+
+    equity = np.array([100.0, 101.0, 101.0, 100.0, 102.0, 103.0])
+
+    assert np.isclose(analytics.hit_rate(equity), 3.0 / 4.0)
+
+
+def test_RollingScores_MatchScoresOfEachWindow(equity):
+
+    window = 20
+    rolling = {
+        "sharpe_ratio": analytics.rolling_sharpe_ratio(equity, window),
+        "sortino_ratio": analytics.rolling_sortino_ratio(equity, window),
+        "hit_rate": analytics.rolling_hit_rate(equity, window),
+        "max_drawdown": analytics.rolling_max_drawdown(equity, window),
+        "max_drawdown_duration": analytics.rolling_max_drawdown_duration(
+            equity, window
+        ),
+    }
+
+    for scores in rolling.values():
+        assert scores.shape == equity.shape
+        assert np.all(np.isnan(scores[:window]))
+    for t in [window, 100, len(equity) - 1]:
+        expected = analytics.performance_summary(equity[t - window : t + 1])
+        for (name, scores) in rolling.items():
+            assert np.allclose(scores[t], expected[name])
+
+
+def test_RollingSharpeAlongAxisOne_TransposeOfAxisZero(equity):
+
+    assert np.allclose(
+        analytics.rolling_sharpe_ratio(equity.T, 30, axis=1),
+        analytics.rolling_sharpe_ratio(equity, 30).T,
+        equal_nan=True,
+    )
+
+
+def test_TurnoverFromFills_MatchesHoldingsOfBatchSession(eod_data):
+
+    weights = np.full(eod_data.shape, np.nan)
+    weights[30::10] = [0.5, 0.3]
+    weights[35::10] = [0.2, 0.6]
+
+    class WeightsStrategy(Strategy):
+        def __init__(self):
+            self.symbols = ["AAPL", "MSFT"]
+
+        def on_update(self, historical_data, context, trader):
+            t = context.current_date_index()
+            is_closing = context.time_in_market_day() == TimeInMarketDay.Closing
+            if is_closing and not np.all(np.isnan(weights[t])):
+                trader.rebalance_to_weights(weights[t])
+
+    session = BacktestSubscribeSession(WeightsStrategy(), eod_data)
+    session.run()
+    results = session.results
+    from_fills = analytics.traded_value_from_fills(
+        session._trader.broker.fills, results.ticks // 2
+    )
+
+    batch = BacktestBatchSession(weights, eod_data)
+    batch.run()
+    from_holdings = analytics.traded_value_from_holdings(
+        batch.holdings, eod_data["close"][30:]
+    )
+
+    assert np.allclose(from_fills, from_holdings)
+    assert np.isclose(
+        analytics.turnover(from_fills, results.portfolio_value),
+        analytics.turnover(from_holdings, batch.portfolio_value),
+    )
+    rolling = analytics.rolling_turnover(from_fills, results.portfolio_value, 10)
+    assert np.isclose(
+        rolling[-1], np.mean(from_fills[-10:] / results.portfolio_value[-10:])
+    )
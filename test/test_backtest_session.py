@@ -1,11 +1,14 @@
 from palm.backtestsession import BacktestSubscribeSession
 from palm.backtestsession.backtestsession import Strategy
 from palm.data.equity_eod import EquityEOD
+import numpy as np
 import pytest
 
 import pandas as pd
 
 from palm.data import polygon_symbol_indexed_to_OHCLV_indexed
+from palm.trades import Trade
+from palm.context import Schedule, TimeInMarketDay
 
 @pytest.fixture
 def eod_data():
@@ -99,3 +102,240 @@ def test_StrategyWithValidSymbolList_BacktestSubscribeSessionConstructionSucceed
         error_caught = True
 
     assert not error_caught
+
+
+def test_SessionRun_StrategyReceivesRollingWindowOnEveryEvent(eod_data):
+
+    class TestStrategy(Strategy):
+        def __init__(self):
+            self.symbols = ["AAPL", "MSFT"]
+            self.window_stops = []
+
+        def on_update(self, historical_data, context, trader):
+            assert historical_data.shape == (30, 2)
+            self.window_stops.append(historical_data.stop_index)
+            assert historical_data.stop_index == context.current_date_index()
+
+    test_strategy = TestStrategy()
+    session = BacktestSubscribeSession(test_strategy, eod_data, look_back_days=30)
+    session.run()
+
+    T, _ = eod_data.shape
+    assert len(test_strategy.window_stops) == 2 * (T - 30)
+    assert test_strategy.window_stops[0] == 30
+    assert test_strategy.window_stops[-1] == T - 1
+
+    with pytest.raises(RuntimeError):
+        session.run()
+
+
+def test_SameIdSeed_SameOrderIds(eod_data):
+
+    class TradeOnceStrategy(Strategy):
+        def __init__(self):
+            self.symbols = ["AAPL", "MSFT"]
+
+        def on_update(self, historical_data, context, trader):
+            if len(trader.open_trades) == 0:
+                trade = Trade({"AAPL": 1, "MSFT": -1}, max_holding_period=5)
+                trader.submit_trade(trade)
+
+    def order_ids(session):
+        session.run()
+        return [order.id for order in session._trader.broker.all_orders]
+
+    ## Both built before either runs, with other ids drawn in between.
+    first = BacktestSubscribeSession(TradeOnceStrategy(), eod_data, id_seed=7)
+    second = BacktestSubscribeSession(TradeOnceStrategy(), eod_data, id_seed=7)
+    first_ids = order_ids(first)
+    Trade({"AAPL": 1})
+    assert len(first_ids) > 0
+    assert order_ids(second) == first_ids
+
+    first_trade_ids = [trade.id for trade in first._trader.closed_trades]
+    second_trade_ids = [trade.id for trade in second._trader.closed_trades]
+    assert first_trade_ids[0] == 7
+    assert first_trade_ids == second_trade_ids
+
+
+def test_PositionsReadMidRun_SameIdsAsWithoutReading(eod_data):
+
+    class TradeAndLookStrategy(Strategy):
+        def __init__(self, look):
+            self.symbols = ["AAPL", "MSFT"]
+            self.look = look
+
+        def on_update(self, historical_data, context, trader):
+            if self.look:
+                trader.broker.all_positions
+                trader.broker.get_position("AAPL")
+            if context.current_date_index() % 10 == 0:
+                trader.rebalance_to_weights(np.array([0.3, -0.2]))
+            if len(trader.open_trades) == 0:
+                trader.submit_trade(Trade({"AAPL": 1}, max_holding_period=3))
+
+    def ids(look):
+        session = BacktestSubscribeSession(
+            TradeAndLookStrategy(look), eod_data, id_seed=0, use_position_book=True
+        )
+        session.run()
+        trader = session._trader
+        positions = trader.broker.all_positions
+        return (
+            sorted(order.id for order in trader.broker.all_orders),
+            [trade.id for trade in trader.closed_trades],
+            sorted((symbol, position.id) for (symbol, position) in positions.items()),
+        )
+
+    assert ids(look=True) == ids(look=False)
+
+
+def test_MonthEndSchedule_StrategyOnlyUpdatedOnMonthEnds(eod_data):
+
+    class MonthlyStrategy(Strategy):
+        def __init__(self):
+            self.symbols = ["AAPL", "MSFT"]
+            self.schedule = Schedule.month_end()
+            self.updates = []
+            self.open_trade_counts = []
+
+        def on_update(self, historical_data, context, trader):
+            assert context.time_in_market_day() == TimeInMarketDay.Closing
+            assert historical_data.stop_index == context.current_date_index()
+            self.updates.append(context.current_date())
+            self.open_trade_counts.append(len(trader.open_trades))
+            trader.submit_trade(Trade({"AAPL": 1}, max_holding_period=3))
+
+    strategy = MonthlyStrategy()
+    session = BacktestSubscribeSession(strategy, eod_data, look_back_days=30)
+    session.run()
+
+    dates = eod_data["dates"]
+    month_ends = dates[~dates.to_period("M").duplicated(keep="last")]
+    assert strategy.updates == list(month_ends[month_ends >= dates[30]])
+    ## Trades are held for 3 days, so closed between month ends, except
+    ## the last month of data which ends the day after September does.
+    assert strategy.open_trade_counts[:-1] == [0] * (len(strategy.updates) - 1)
+    assert strategy.open_trade_counts[-1] == 1
+
+
+class BuyAndHoldStrategy(Strategy):
+    def __init__(self, schedule=None):
+        self.symbols = ["AAPL", "MSFT"]
+        self.schedule = schedule
+
+    def on_update(self, historical_data, context, trader):
+        if len(trader.open_trades) == 0:
+            trader.submit_trade(Trade({"AAPL": 10, "MSFT": -5}))
+
+
+def test_RecordCloses_OneRowPerClosePreallocated(eod_data):
+
+    session = BacktestSubscribeSession(BuyAndHoldStrategy(), eod_data)
+    assert len(session.results) == 0
+    session.run()
+
+    results = session.results
+    T, _ = eod_data.shape
+    assert len(results) == T - 30
+    assert list(results.dates) == list(eod_data["dates"][30:])
+    assert np.all(results.holdings == [10, -5])
+
+    close = eod_data["close"][30:]
+    assert np.allclose(results.net_exposure, close @ np.array([10, -5]))
+    assert np.allclose(results.gross_exposure, close @ np.array([10, 5]))
+    assert np.allclose(results.portfolio_value, results.cash + results.net_exposure)
+    assert np.isclose(
+        session.portfolio_value()[-1], session._trader.broker.portfolio_value()
+    )
+
+
+def test_RecordTicksWithSchedule_EveryTickStillRecorded(eod_data):
+
+    strategy = BuyAndHoldStrategy(Schedule.month_end())
+    session = BacktestSubscribeSession(strategy, eod_data, record="ticks")
+    session.run()
+
+    results = session.results
+    T, _ = eod_data.shape
+    assert len(results) == 2 * (T - 30)
+    assert np.array_equal(results.ticks, np.arange(60, 2 * T))
+
+    frame = results.frame
+    assert list(frame.columns) == [
+        "time_in_market_day",
+        "cash",
+        "portfolio_value",
+        "gross_exposure",
+        "net_exposure",
+        "holdings_AAPL",
+        "holdings_MSFT",
+    ]
+    assert frame is results.frame
+    ## Flat until the first month end close.
+    first_trade = np.flatnonzero(results.holdings[:, 0])[0]
+    assert np.all(results.cash[:first_trade] == 10000.0)
+    assert frame.index[first_trade] == pd.Timestamp("2020-03-31 05:00:00")
+
+
+def test_ScheduleByDefault_OnlyScheduledTicksAndLastCloseRecorded(eod_data):
+
+    strategy = BuyAndHoldStrategy(Schedule.month_end())
+    session = BacktestSubscribeSession(strategy, eod_data, use_position_book=True)
+    session.run()
+
+    results = session.results
+    T, _ = eod_data.shape
+    month_ends = Schedule.month_end().compile(eod_data["dates"], 60)
+    assert results.granularity == "schedule"
+    assert list(results.ticks) == list(np.union1d(month_ends, [2 * T - 1]))
+    assert np.all(results.holdings == [10, -5])
+    assert np.isclose(
+        session.portfolio_value()[-1], session._trader.broker.portfolio_value()
+    )
+
+
+def test_RecordNone_NothingRecorded(eod_data):
+
+    session = BacktestSubscribeSession(BuyAndHoldStrategy(), eod_data, record="none")
+    session.run()
+
+    assert len(session.results) == 0
+    assert len(session.results.frame) == 0
+
+
+def test_UnknownRecordGranularity_ValueErrorRaised(eod_data):
+    with pytest.raises(ValueError):
+        BacktestSubscribeSession(BuyAndHoldStrategy(), eod_data, record="weekly")
+
+
+def test_RunProfiled_ReportOfEachPhase(eod_data):
+
+    strategy = BuyAndHoldStrategy()
+    session = BacktestSubscribeSession(strategy, eod_data)
+    report = session.run(profile=True)
+
+    T, _ = eod_data.shape
+    assert report is session.profile_report
+    assert report.events == 2 * (T - 30)
+    assert report.events_per_second > 0
+    assert report.peak_memory > 0
+    assert report.phases["on_update"].calls == 2 * (T - 30)
+    assert report.phases["history"].calls == 2 * (T - 30)
+    assert report.phases["context_update"].calls == 2 * (T - 30) - 1
+    assert report.phases["broker"].calls == 2
+    assert report.phases["cash"].calls == 2
+    assert report.phases["recording"].calls == 2 * (T - 30)
+    assert set(report.to_dict()["phases"].keys()) == set(report.phases.keys())
+
+    ## Instrumentation is removed once the run is over.
+    assert "on_update" not in strategy.__dict__
+    assert "update" not in session._context.__dict__
+
+
+def test_RunNotProfiled_NoReport(eod_data):
+
+    session = BacktestSubscribeSession(BuyAndHoldStrategy(), eod_data)
+
+    assert session.run() is None
+    assert session.profile_report is None
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+import pandas as pd
+
+from palm.backtestsession import BacktestBatchSession, BacktestSubscribeSession
+from palm.backtestsession.backtestsession import Strategy
+from palm.context import TimeInMarketDay
+from palm.data import EquityEOD, polygon_symbol_indexed_to_OHCLV_indexed
+
+
+@pytest.fixture
+def eod_data():
+
+    data = {}
+    data["AAPL"] = pd.read_csv("sample_data/AAPL-Sample-Data.csv", index_col=0)
+    data["MSFT"] = pd.read_csv("sample_data/MSFT-Sample-Data.csv", index_col=0)
+
+    return EquityEOD(polygon_symbol_indexed_to_OHCLV_indexed(data))
+
+
+@pytest.fixture
+def weights(eod_data):
+    T, N = eod_data.shape
+    random_weights = np.random.default_rng(7).uniform(-0.45, 0.45, size=(T, N))
+    ## Only rebalance every fifth day.
+    random_weights[np.arange(T) % 5 != 0] = np.nan
+    return random_weights
+
+
+class WeightStrategy(Strategy):
+    def __init__(self, weights):
+        self.symbols = ["AAPL", "MSFT"]
+        self.weights = weights
+        self.portfolio_values = []
+
+    def on_update(self, historical_data, context, trader):
+        if context.time_in_market_day() != TimeInMarketDay.Closing:
+            return
+        t = context.current_date_index()
+        if not np.all(np.isnan(self.weights[t])):
+            trader.rebalance_to_weights(self.weights[t])
+        self.portfolio_values.append(trader.broker.portfolio_value())
+
+
+def test_WeightMatrix_MatchesEventDrivenRebalance(eod_data, weights):
+
+    strategy = WeightStrategy(weights)
+    session = BacktestSubscribeSession(strategy, eod_data, look_back_days=30)
+    session.run()
+
+    batch = BacktestBatchSession(weights, eod_data, look_back_days=30)
+    batch.run()
+
+    assert batch.portfolio_value.shape == (eod_data.shape[0] - 30,)
+    assert np.allclose(batch.portfolio_value, strategy.portfolio_values, rtol=1.0e-9)
+    assert np.allclose(
+        batch.holdings[-1], session._trader.broker.position_quantities()
+    )
+    assert abs(batch.cash[-1] - session._trader.cash_balance) < 1.0e-6
+
+
+def test_WeightCallable_MatchesWeightMatrix(eod_data, weights):
+
+    calls = []
+
+    def weight_row(historical_data, date_index):
+        calls.append(historical_data.stop_index)
+        return weights[date_index]
+
+    from_callable = BacktestBatchSession(weight_row, eod_data, look_back_days=30)
+    from_callable.run()
+    from_matrix = BacktestBatchSession(weights, eod_data, look_back_days=30)
+    from_matrix.run()
+
+    assert calls == list(range(30, eod_data.shape[0]))
+    assert np.array_equal(from_callable.portfolio_value, from_matrix.portfolio_value)
+
+
+def test_NoRebalance_PortfolioValueIsInitialCapital(eod_data):
+
+    T, N = eod_data.shape
+    batch = BacktestBatchSession(np.full((T, N), np.nan), eod_data, initial_capital=500.0)
+    batch.run()
+    assert np.all(batch.portfolio_value == 500.0)
+    assert np.all(batch.holdings == 0)
+
+
+def test_WrongWeightShape_ValueErrorRaised(eod_data):
+
+    with pytest.raises(ValueError):
+        BacktestBatchSession(np.zeros((3, 2)), eod_data)
@@ -1,3 +1,4 @@
+import numpy as np
 from palm.broker.simulated_broker import SimulatedBroker
 from palm.data.equity_eod import EquityEOD
 from palm.orders.market_order import MarketOrder, MarketOrderStatus
@@ -166,3 +167,120 @@ def test_BuyOrderAfterSellOrderSameQuantity_ShortPositionClosed(broker, sell_ord
     assert pos is None
     assert broker.all_positions == {}
     assert broker.portfolio_value() == broker.cash_account.balance
+
+
+@pytest.fixture(params=[False, True])
+def any_broker(request, context, initial_deposit):
+    return SimulatedBroker(context, initial_deposit, use_position_book=request.param)
+
+
+def test_BatchOfOrders_NettedPerSymbolAndFilledAtCurrentPrices(any_broker):
+
+    fills = any_broker.submit_orders([10, 5, -3], symbols=["AAPL", "AAPL", "MSFT"])
+
+    assert list(any_broker.position_quantities()) == [15, -3]
+    assert list(fills["quantity"]) == [-3, 15]
+    prices = any_broker.context.current_market_prices()
+    assert list(fills["price"]) == [prices[1], prices[0]]
+    assert len(any_broker.fills) == 2
+    assert abs(
+        any_broker.cash_account.balance - (10000 - 15 * prices[0] + 3 * prices[1])
+    ) < 1.0e-6
+
+
+def test_BatchCrossingZero_PositionFlipped(any_broker):
+
+    any_broker.submit_orders([10, 0])
+    any_broker.submit_orders([-25, 0])
+
+    position = any_broker.get_position("AAPL")
+    assert position.side == Position.Side.SHORT
+    assert position.quantity == 15
+
+
+def test_BatchBuysBeyondCash_FundedBySellsFirstThenFail(any_broker):
+
+    prices = any_broker.context.current_market_prices()
+    affordable_aapl = int(10000 // prices[0])
+    any_broker.submit_orders([affordable_aapl, 0])
+
+    ## Selling all the AAPL funds the MSFT buy, the extra AAPL can't be funded.
+    msft_quantity = int(affordable_aapl * prices[0] // prices[1])
+    fills = any_broker.submit_orders(
+        [-affordable_aapl, msft_quantity], symbols=["AAPL", "MSFT"]
+    )
+    assert len(fills) == 2
+    assert list(any_broker.position_quantities()) == [0, msft_quantity]
+
+    fills = any_broker.submit_orders([affordable_aapl, 0])
+    assert len(fills) == 0
+    assert list(any_broker.position_quantities()) == [0, msft_quantity]
+
+
+@pytest.mark.parametrize("use_position_book", [False, True])
+def test_BatchBuyCostingExactlyTheCash_FilledAndBalanceEmptied(
+    context, use_position_book
+):
+
+    prices = context.current_market_prices()
+    broker = SimulatedBroker(
+        context, 52 * prices[0], use_position_book=use_position_book
+    )
+    fills = broker.submit_orders([52, 0])
+
+    assert list(fills["quantity"]) == [52]
+    assert list(broker.position_quantities()) == [52, 0]
+    assert broker.cash_account.balance == 0.0
+
+
+@pytest.mark.parametrize("use_position_book", [False, True])
+def test_BatchAtCashLimitRoundingTheOtherWay_UnpaidBuyDropped(
+    context, use_position_book
+):
+
+    prices = context.current_market_prices()
+    credit = 1 * prices[1]
+    cost = 52 * prices[0]
+    deposit = np.nextafter(cost - credit, 0.0)
+    ## Funded against cash plus credit, but declined as a net withdrawal.
+    assert cost <= deposit + credit
+    assert cost - credit > deposit
+
+    broker = SimulatedBroker(context, deposit, use_position_book=use_position_book)
+    fills = broker.submit_orders([52, -1])
+
+    assert list(fills["quantity"]) == [-1]
+    assert list(broker.position_quantities()) == [0, -1]
+    assert broker.cash_account.balance == deposit + credit
+
+
+def test_BatchOfFractionalQuantities_WholeSharesTradedInBothModes(any_broker):
+
+    fills = any_broker.submit_orders([10.7, -3.9])
+
+    assert list(any_broker.position_quantities()) == [10, -3]
+    assert list(fills["quantity"]) == [-3, 10]
+    prices = any_broker.context.current_market_prices()
+    assert abs(
+        any_broker.cash_account.balance - (10000 - 10 * prices[0] + 3 * prices[1])
+    ) < 1.0e-6
+
+
+def test_BatchWithNothingToTrade_NoCashTransactionRecorded(any_broker):
+
+    transactions = len(any_broker.cash_account.ledger)
+    fills = any_broker.submit_orders([0.4, np.nan])
+
+    assert len(fills) == 0
+    assert len(any_broker.cash_account.ledger) == transactions
+
+
+def test_SingleOrderFilled_RecordedInFillLog(broker, buy_order, sell_order):
+
+    broker.submit_order(buy_order)
+    broker.submit_order(MarketOrder.Sell("MSFT", 2))
+
+    fills = broker.fills
+    assert list(fills["symbol_index"]) == [0, 1]
+    assert list(fills["quantity"]) == [10, -2]
+    assert fills["price"][0] == buy_order.avg_price
@@ -67,3 +67,62 @@ def test_NegativeDeposit_DepositDeclined(account, initial_deposit):
     response = account.submit_deposit_request(-1.0)
     assert response.result == DepositResult.DECLINED
     assert response.reason == DepositResponse.DeclinedReason.NEGATIVE_AMOUNT_DEPOSITED
+
+
+def test_Transactions_RecordedInLedger(account, initial_deposit):
+
+    account.submit_withdrawal_request(10.0)
+    account.submit_withdrawal_request(-1.0)
+    account.submit_deposit_request(5.0)
+
+    ledger = account.ledger
+    assert len(ledger) == 4
+    assert list(ledger["new_balance"]) == [
+        initial_deposit,
+        initial_deposit - 10.0,
+        initial_deposit - 10.0,
+        initial_deposit - 5.0,
+    ]
+    assert ledger["result"][2] == WithdrawalResult.DECLINED.value
+
+    history = account.history
+    assert len(history) == 4
+    assert history[2].transaction_response.reason == (
+        WithdrawalResponse.DeclinedReason.NEGATIVE_AMOUNT_REQUESTED
+    )
+    assert history[3].current_balance == initial_deposit - 5.0
+
+
+def test_HistoryNotRecorded_BalanceAndSummaryStillKept(initial_deposit):
+
+    account = CashAccount(initial_deposit, record_history=False)
+    account.submit_withdrawal_request(10.0)
+    account.submit_withdrawal_request(initial_deposit * 2)
+    account.submit_deposit_request(3.0)
+
+    assert len(account.ledger) == 0
+    assert abs(account.balance - (initial_deposit - 7.0)) < 1.0e-5
+
+    summary = account.summary
+    assert summary["withdrawals_approved"] == 1
+    assert summary["withdrawals_declined"] == 1
+    assert summary["deposits_confirmed"] == 2
+    assert summary["total_withdrawn"] == 10.0
+
+
+def test_ManyTransactions_LedgerGrowsPastInitialCapacity(account):
+
+    for _ in range(3000):
+        account.submit_deposit_request(1.0)
+    assert len(account.ledger) == 3001
+    assert account.ledger["new_balance"][-1] == account.balance
+
+
+def test_SharedResponses_CannotBeChanged(account):
+    response = account.submit_withdrawal_request(10.0)
+    with pytest.raises(AttributeError):
+        response.result = WithdrawalResult.DECLINED
+    with pytest.raises(AttributeError):
+        response.extra = 1
+
+    assert account.submit_withdrawal_request(10.0).result == WithdrawalResult.APPROVED
@@ -1,4 +1,5 @@
 from sqlite3 import Time
+import numpy as np
 from palm import data
 from palm.context.daily_bar_context import ContextEOD, TimeInMarketDay
 import pytest
@@ -153,3 +154,117 @@ def test_FirstTenSteps_GiveCorrectMarketPricesForEach(eod_data):
                 )
             assert event.date_index_since_start == context.current_date_index()
             assert event.time_in_market_day == context.time_in_market_day()
+
+
+def test_ObserverSubscribedToClosing_OnlyCalledOnCloses(eod_data):
+
+    context = ContextEOD(eod_data)
+    calls = {"closing": 0, "all": 0}
+
+    def on_close():
+        assert context.time_in_market_day() == TimeInMarketDay.Closing
+        calls["closing"] += 1
+
+    def on_every_tick():
+        calls["all"] += 1
+
+    context.add_observer("closing", on_close, time_in_market_day=TimeInMarketDay.Closing)
+    context.add_observer("all", on_every_tick)
+    for _ in range(10):
+        context.update()
+
+    assert calls == {"closing": 5, "all": 10}
+
+
+def test_ObserverSubscribedEveryNDays_CalledOnMultiplesOfN(eod_data):
+
+    context = ContextEOD(eod_data)
+    date_indices = []
+    context.add_observer(
+        "weekly",
+        lambda: date_indices.append(context.date_index_since_start()),
+        time_in_market_day=TimeInMarketDay.Opening,
+        every_n_days=5,
+    )
+    for _ in range(40):
+        context.update()
+
+    assert date_indices == [5, 10, 15, 20]
+
+
+def test_ObserverSubscribedToSymbols_SkippedWhenSymbolsNotTrading(eod_data):
+
+    tensor = np.array(eod_data.field_tensor)
+    tensor[:, 1:3, 0] = np.nan
+    ragged = EquityEOD.from_arrays(tensor, eod_data["dates"], eod_data.symbols)
+
+    context = ContextEOD(ragged)
+    aapl_ticks = []
+    context.add_observer(
+        "aapl", lambda: aapl_ticks.append(context.current_date_index()), symbols=["AAPL"]
+    )
+    for _ in range(7):
+        context.update()
+
+    assert aapl_ticks == [0, 3, 3]
+
+
+def test_ObserverRemoved_NoLongerCalled(eod_data):
+
+    context = ContextEOD(eod_data)
+    calls = []
+    context.add_observer("observer", lambda: calls.append(1))
+    context.update()
+    context.remove_observer("observer")
+    context.update()
+
+    assert calls == [1]
+    assert context.observers == {}
+
+
+def test_AdvanceToWithoutObservers_JumpsToTick(eod_data):
+
+    context = ContextEOD(eod_data)
+    context.advance_to(10, TimeInMarketDay.Opening)
+
+    assert context.current_date_index() == 10
+    assert context.time_in_market_day() == TimeInMarketDay.Opening
+    assert context.current_tick_index() == 20
+
+
+def test_AdvanceToWithObserver_EveryTickNotified(eod_data):
+
+    context = ContextEOD(eod_data)
+    ticks = []
+    context.add_observer("observer", lambda: ticks.append(context.current_tick_index()))
+
+    context.advance_to(3)
+
+    assert ticks == [1, 2, 3, 4, 5, 6, 7]
+
+
+def test_AdvanceToObserverRemoved_JumpsRestOfTheWay(eod_data):
+
+    context = ContextEOD(eod_data)
+    ticks = []
+
+    def observe_once():
+        ticks.append(context.current_tick_index())
+        context.remove_observer("observer")
+
+    context.add_observer("observer", observe_once)
+    context.advance_to(50)
+
+    assert ticks == [1]
+    assert context.current_tick_index() == 101
+
+
+def test_AdvanceToPastTick_ValueErrorRaised(eod_data):
+
+    context = ContextEOD(eod_data)
+    context.advance_to(3)
+
+    with pytest.raises(ValueError):
+        context.advance_to(2)
+    with pytest.raises(ValueError):
+        context.advance_to(context._max_date_index + 1)
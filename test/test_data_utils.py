@@ -0,0 +1,273 @@
+from datetime import datetime
+import os
+import time
+
+import numpy as np
+import pytest
+
+import pandas as pd
+
+import palm.data.data_utils as data_utils
+from palm.data import PolygonEODCache, pull_polygon_eod
+from palm.utils.rate_limiter import RateLimiter
+
+
+class StubResponse:
+    def __init__(self, results):
+        self.status = "OK"
+        if results:
+            self.results = results
+
+
+class StubRESTClient:
+    """
+    Serves the sample csv files as polygon aggregate responses
+    and records every request made.
+    """
+
+    requests = []
+    bars = {}
+
+    def __init__(self, api_key):
+        self.api_key = api_key
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return
+
+    def stocks_equities_aggregates(self, symbol, multiplier, timespan, from_, to):
+        StubRESTClient.requests.append((symbol, from_, to))
+        bars = StubRESTClient.bars[symbol]
+        days = pd.to_datetime(bars["t"], unit="ms").dt.strftime("%Y-%m-%d")
+        in_range = bars[(days >= from_) & (days <= to)]
+        return StubResponse(in_range.to_dict("records"))
+
+
+@pytest.fixture
+def stub_client(monkeypatch):
+    StubRESTClient.requests = []
+    StubRESTClient.bars = {}
+    for symbol in ["AAPL", "MSFT"]:
+        bars = pd.read_csv("sample_data/{}-Sample-Data.csv".format(symbol))
+        StubRESTClient.bars[symbol] = bars[["v", "vw", "o", "c", "h", "l", "t", "n"]]
+    monkeypatch.setattr(data_utils, "RESTClient", StubRESTClient)
+    return StubRESTClient
+
+
+def test_CachedPull_MatchesSampleData(stub_client, tmp_path):
+
+    eod_data = pull_polygon_eod(
+        ["MSFT", "AAPL"],
+        datetime(2020, 1, 1),
+        datetime(2020, 12, 31),
+        api_key="test",
+        cache_dir=str(tmp_path),
+    )
+
+    assert eod_data.shape == (178, 2)
+    assert eod_data.symbols == ["AAPL", "MSFT"]
+    aapl = stub_client.bars["AAPL"]
+    assert np.array_equal(eod_data["open"][:, 0], aapl["o"].to_numpy())
+    assert np.array_equal(eod_data["volume"][:, 0], aapl["v"].to_numpy())
+    assert eod_data["dates"][0] == pd.Timestamp("2020-01-21 05:00:00")
+
+
+def test_SecondPullOfSameRange_ServedFromCache(stub_client, tmp_path):
+
+    arguments = (["AAPL"], datetime(2020, 1, 1), datetime(2020, 6, 30))
+    first = pull_polygon_eod(*arguments, api_key="test", cache_dir=str(tmp_path))
+    assert len(stub_client.requests) == 1
+
+    second = pull_polygon_eod(*arguments, api_key="test", cache_dir=str(tmp_path))
+    assert len(stub_client.requests) == 1
+    assert np.array_equal(first["close"], second["close"])
+
+
+def test_WiderPull_OnlyFetchesMissingEdges(stub_client, tmp_path):
+
+    pull_polygon_eod(
+        ["AAPL"],
+        datetime(2020, 3, 1),
+        datetime(2020, 5, 31),
+        api_key="test",
+        cache_dir=str(tmp_path),
+    )
+    wider = pull_polygon_eod(
+        ["AAPL"],
+        datetime(2020, 1, 1),
+        datetime(2020, 12, 31),
+        api_key="test",
+        cache_dir=str(tmp_path),
+    )
+
+    assert stub_client.requests[1:] == [
+        ("AAPL", "2020-01-01", "2020-02-29"),
+        ("AAPL", "2020-06-01", "2020-12-31"),
+    ]
+    assert wider.shape == (178, 1)
+    assert np.array_equal(
+        wider["close"][:, 0], stub_client.bars["AAPL"]["c"].to_numpy()
+    )
+
+
+def test_MissingRanges_CoverGapsToKeepCacheContiguous():
+
+    assert PolygonEODCache.missing_ranges(None, 10, 20) == [(10, 20)]
+    assert PolygonEODCache.missing_ranges((10, 20), 12, 18) == []
+    assert PolygonEODCache.missing_ranges((10, 20), 5, 25) == [(5, 9), (21, 25)]
+    assert PolygonEODCache.missing_ranges((10, 20), 30, 40) == [(21, 40)]
+
+
+def test_ConcurrentPull_MatchesSerialPull(stub_client):
+
+    arguments = (["MSFT", "AAPL"], datetime(2020, 1, 1), datetime(2020, 12, 31))
+    serial = pull_polygon_eod(*arguments, api_key="test")
+    concurrent = pull_polygon_eod(*arguments, api_key="test", max_workers=4)
+
+    assert concurrent.symbols == serial.symbols
+    assert np.array_equal(concurrent.field_tensor, serial.field_tensor)
+    assert (concurrent["dates"] == serial["dates"]).all()
+
+
+def test_DuplicateSymbols_EachRequestedOnce(stub_client):
+
+    eod_data = pull_polygon_eod(
+        ["AAPL", "MSFT", "AAPL"],
+        datetime(2020, 1, 1),
+        datetime(2020, 12, 31),
+        api_key="test",
+    )
+
+    assert eod_data.symbols == ["AAPL", "MSFT"]
+    assert [request[0] for request in stub_client.requests] == ["AAPL", "MSFT"]
+
+
+def test_NoResultsForAnySymbol_RuntimeError(stub_client):
+
+    with pytest.raises(RuntimeError), pytest.warns(UserWarning):
+        pull_polygon_eod(
+            ["AAPL", "MSFT"],
+            datetime(2019, 1, 1),
+            datetime(2019, 12, 31),
+            api_key="test",
+        )
+
+
+def test_OneSymbolWithoutResults_LeftOutWithAWarning(stub_client):
+
+    stub_client.bars["SPY"] = stub_client.bars["AAPL"].iloc[:0]
+    with pytest.warns(UserWarning, match="SPY"):
+        eod_data = pull_polygon_eod(
+            ["AAPL", "SPY"],
+            datetime(2020, 1, 1),
+            datetime(2020, 12, 31),
+            api_key="test",
+        )
+
+    assert eod_data.symbols == ["AAPL"]
+
+
+def test_FailedRequestForAMissingEdge_WarnsWithTheRange(
+    stub_client, tmp_path, monkeypatch
+):
+
+    pull_polygon_eod(
+        ["AAPL"],
+        datetime(2020, 3, 1),
+        datetime(2020, 12, 31),
+        api_key="test",
+        cache_dir=str(tmp_path),
+    )
+
+    failed_response = StubResponse(None)
+    failed_response.status = "ERROR"
+    monkeypatch.setattr(
+        StubRESTClient, "stocks_equities_aggregates", lambda *args: failed_response
+    )
+    with pytest.warns(UserWarning, match="AAPL from 2020-01-01 to 2020-02-29"):
+        eod_data = pull_polygon_eod(
+            ["AAPL"],
+            datetime(2020, 1, 1),
+            datetime(2020, 12, 31),
+            api_key="test",
+            cache_dir=str(tmp_path),
+            max_retries=0,
+        )
+
+    assert eod_data.start_date >= pd.Timestamp(2020, 3, 1)
+
+
+def test_SymbolWithASlash_CachedInsideTheCacheDirectory(tmp_path):
+
+    cache = PolygonEODCache(str(tmp_path))
+
+    assert os.path.dirname(cache.path("BRK/A")) == str(tmp_path)
+    assert cache.path("BRK/A") != cache.path("BRK_A")
+
+
+def test_FailingRequests_RetriedUntilTheySucceed(stub_client, monkeypatch):
+
+    failures = {"AAPL": 2}
+    stub_request = StubRESTClient.stocks_equities_aggregates
+
+    def flaky_request(self, symbol, *args):
+        if failures.get(symbol, 0) > 0:
+            failures[symbol] -= 1
+            raise ConnectionError("Connection reset by peer")
+        return stub_request(self, symbol, *args)
+
+    monkeypatch.setattr(StubRESTClient, "stocks_equities_aggregates", flaky_request)
+    eod_data = pull_polygon_eod(
+        ["AAPL"],
+        datetime(2020, 1, 1),
+        datetime(2020, 12, 31),
+        api_key="test",
+        max_retries=2,
+        retry_backoff=0.0,
+    )
+    assert eod_data.shape == (178, 1)
+
+    failures["AAPL"] = 3
+    with pytest.raises(ConnectionError):
+        pull_polygon_eod(
+            ["AAPL"],
+            datetime(2020, 1, 1),
+            datetime(2020, 12, 31),
+            api_key="test",
+            max_retries=2,
+            retry_backoff=0.0,
+        )
+
+
+def test_RateLimiter_SpacesOutRequests():
+
+    limiter = RateLimiter(100.0)
+    start = time.monotonic()
+    for _ in range(11):
+        limiter.acquire()
+    assert time.monotonic() - start >= 0.1 - 1.0e-3
+
+
+def test_PullUpToToday_DaysFromTodayFetchedAgain(stub_client, tmp_path, monkeypatch):
+
+    ## As if today were 2020-06-15, with no bar published for it yet.
+    today = data_utils.day_number(datetime(2020, 6, 15))
+    monkeypatch.setattr(data_utils, "_last_complete_day", lambda: today - 1)
+    arguments = (["AAPL"], datetime(2020, 1, 1), datetime(2020, 6, 30))
+    pull_polygon_eod(*arguments, api_key="test", cache_dir=str(tmp_path))
+
+    _, covered = PolygonEODCache(str(tmp_path)).load("AAPL")
+    assert covered == (data_utils.day_number(datetime(2020, 1, 1)), today - 1)
+
+    pull_polygon_eod(*arguments, api_key="test", cache_dir=str(tmp_path))
+    assert stub_client.requests[1:] == [("AAPL", "2020-06-15", "2020-06-30")]
+
+
+def test_ExtendCovered_CappedAtTheLastCompleteDay():
+
+    assert PolygonEODCache.extend_covered(None, 10, 20, 30) == (10, 20)
+    assert PolygonEODCache.extend_covered(None, 10, 20, 15) == (10, 15)
+    assert PolygonEODCache.extend_covered(None, 10, 20, 5) is None
+    assert PolygonEODCache.extend_covered((5, 12), 13, 20, 15) == (5, 15)
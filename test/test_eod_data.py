@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 
 import pandas as pd
@@ -25,4 +26,132 @@ def test_polygon_eod(eod_data):
     assert set(polygon_data.symbols) == symbols
 
 
+def test_FieldAccess_ReturnsReadOnlyViewsOfOneTensor(eod_data):
+
+    polygon_data = EquityEOD(polygon_symbol_indexed_to_OHCLV_indexed(eod_data))
+    close = polygon_data["close"]
+    assert close.shape == polygon_data.shape
+    assert close.dtype == np.float64
+    assert np.shares_memory(close, polygon_data.field_tensor)
+    assert polygon_data["close"] is not close
+    with pytest.raises(ValueError):
+        close[0, 0] = 0.0
+
+
+def test_SymbolsOutOfOrder_ColumnsFollowSortedSymbols(eod_data):
+
+    reversed_data = {"MSFT": eod_data["MSFT"], "AAPL": eod_data["AAPL"]}
+    polygon_data = EquityEOD(polygon_symbol_indexed_to_OHCLV_indexed(reversed_data))
+    assert polygon_data.symbols == ["AAPL", "MSFT"]
+    assert np.array_equal(polygon_data["open"][:, 0], eod_data["AAPL"]["o"].to_numpy())
+    assert np.array_equal(polygon_data["open"][:, 1], eod_data["MSFT"]["o"].to_numpy())
+
+
+def test_Float32Requested_TensorStoredAsFloat32(eod_data):
+
+    polygon_data = EquityEOD(
+        polygon_symbol_indexed_to_OHCLV_indexed(eod_data), dtype=np.float32
+    )
+    assert polygon_data.dtype == np.float32
+    assert polygon_data["volume"].dtype == np.float32
+
+
+def test_DataFrameReturnType_BuiltLazilyAndCached(eod_data):
+
+    polygon_data = EquityEOD(polygon_symbol_indexed_to_OHCLV_indexed(eod_data))
+    assert polygon_data._data_frames == {}
+
+    polygon_data.return_type = "dataframe"
+    close = polygon_data["close"]
+    assert list(close.columns) == ["AAPL", "MSFT"]
+    assert polygon_data["close"] is close
+    assert list(polygon_data._data_frames.keys()) == ["close"]
+
+
+def test_FromArrays_SharesTheGivenTensor(eod_data):
+
+    polygon_data = EquityEOD(polygon_symbol_indexed_to_OHCLV_indexed(eod_data))
+    rebuilt = EquityEOD.from_arrays(
+        polygon_data.field_tensor, polygon_data["dates"], polygon_data.symbols
+    )
+    assert rebuilt.shape == polygon_data.shape
+    assert np.shares_memory(rebuilt["high"], polygon_data["high"])
+
+    with pytest.raises(ValueError):
+        EquityEOD.from_arrays(
+            polygon_data.field_tensor, polygon_data["dates"], ["MSFT", "AAPL"]
+        )
+
+
+def test_FromWriteableArrays_CallersArrayLeftWriteable():
+
+    tensor = np.ones((5, 3, 2))
+    dates = pd.date_range("2021-01-04", periods=3)
+    eod_data = EquityEOD.from_arrays(tensor, dates, ["AAPL", "MSFT"])
+
+    assert tensor.flags.writeable
+    assert not eod_data["close"].flags.writeable
+    assert np.shares_memory(eod_data["close"], tensor)
+
+
+def test_Sliced_SharesTheSymbolMaps():
+
+    dates = pd.date_range("2021-01-04", periods=30)
+    eod_data = EquityEOD.from_arrays(np.ones((5, 30, 2)), dates, ["AAPL", "MSFT"])
+    sliced = eod_data.slice(dates[10], dates[20])
+
+    assert sliced.shape == (10, 2)
+    assert sliced.symbol_to_column_index is eod_data.symbol_to_column_index
+    assert sliced.column_index_to_symbol is eod_data.column_index_to_symbol
+
+
 ## TODO need to test open, close, volume and other fields needed to satisfy equity EOD.
+
+
+def test_WrittenToMmap_ReopenedWithSameData(eod_data, tmp_path):
+
+    polygon_data = EquityEOD(polygon_symbol_indexed_to_OHCLV_indexed(eod_data))
+    polygon_data.to_mmap(str(tmp_path))
+    mapped = EquityEOD.from_mmap(str(tmp_path))
+
+    assert mapped.mmap_path == str(tmp_path)
+    assert polygon_data.mmap_path is None
+    assert mapped.shape == polygon_data.shape
+    assert mapped.symbols == polygon_data.symbols
+    assert (mapped["dates"] == polygon_data["dates"]).all()
+    for field in ["open", "close", "high", "low", "volume"]:
+        assert isinstance(mapped[field], np.memmap)
+        assert np.array_equal(mapped[field], polygon_data[field])
+    for (mapped_field, field) in zip(mapped.field_arrays, polygon_data.field_arrays):
+        assert np.array_equal(mapped_field, field)
+    with pytest.raises(ValueError):
+        mapped.field_tensor
+
+
+def test_MmapSliced_FieldsStayMemoryMapped(eod_data, tmp_path):
+
+    ## Slices resolve dates by day, so index the bars by their dates.
+    dated = dict(
+        (symbol, bars.set_index(pd.to_datetime(bars["t"], unit="ms")))
+        for (symbol, bars) in eod_data.items()
+    )
+    polygon_data = EquityEOD(polygon_symbol_indexed_to_OHCLV_indexed(dated))
+    polygon_data.to_mmap(str(tmp_path))
+    mapped = EquityEOD.from_mmap(str(tmp_path))
+
+    dates = mapped["dates"]
+    sliced = mapped.slice(dates[10], dates[20])
+    assert sliced.shape == (10, 2)
+    assert isinstance(sliced["close"], np.memmap)
+    assert np.array_equal(sliced["close"], polygon_data["close"][10:20])
+
+
+def test_MicrosecondDatesWrittenToMmap_ReopenedAsSameDates(tmp_path):
+
+    dates = pd.DatetimeIndex(["2020-01-06", "2020-01-07"]).as_unit("us")
+    tensor = np.ones((5, 2, 1))
+    eod_data = EquityEOD.from_arrays(tensor, dates, ["AAPL"])
+    eod_data.to_mmap(str(tmp_path))
+
+    mapped = EquityEOD.from_mmap(str(tmp_path))
+    assert list(mapped["dates"]) == list(dates)
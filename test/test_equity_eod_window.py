@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+import pandas as pd
+from palm.data import EquityEOD, EquityEODWindow, polygon_symbol_indexed_to_OHCLV_indexed
+
+
+@pytest.fixture
+def eod_data():
+
+    data = {}
+    data["AAPL"] = pd.read_csv("sample_data/AAPL-Sample-Data.csv", index_col=0)
+    data["MSFT"] = pd.read_csv("sample_data/MSFT-Sample-Data.csv", index_col=0)
+
+    return EquityEOD(polygon_symbol_indexed_to_OHCLV_indexed(data))
+
+
+def test_WindowAtStop_MatchesSliceOfTheSameDates(eod_data):
+
+    window = EquityEODWindow(eod_data, look_back=30, stop=40)
+    dates = eod_data["dates"]
+    sliced = eod_data.slice(dates[10], dates[40])
+
+    assert window.shape == (30, 2)
+    assert window.shape == sliced.shape
+    for field in ["open", "close", "high", "low", "volume"]:
+        assert np.array_equal(window[field], sliced[field])
+    assert (window["dates"] == sliced["dates"]).all()
+
+
+def test_WindowAdvanced_StartAndStopMoveTogether(eod_data):
+
+    window = EquityEODWindow(eod_data, look_back=30)
+    assert window.start_index == 0
+    assert window.stop_index == 30
+
+    window.advance_to(31)
+    assert window.start_index == 1
+    assert window.stop_index == 31
+    assert np.array_equal(window["close"], eod_data["close"][1:31, :])
+
+
+def test_WindowNearTheStart_IsTruncated(eod_data):
+
+    window = EquityEODWindow(eod_data, look_back=30, stop=5)
+    assert window.shape == (5, 2)
+
+
+def test_WindowFieldAccess_ReturnsReadOnlyViews(eod_data):
+
+    window = EquityEODWindow(eod_data, look_back=30)
+    first = window["close"]
+    second = window["open"]
+    assert np.shares_memory(first, eod_data.field_tensor)
+    assert np.shares_memory(second, eod_data.field_tensor)
+    with pytest.raises(ValueError):
+        first[0, 0] = 0.0
+
+
+def test_WindowAdvancedPastEnd_ValueErrorRaised(eod_data):
+
+    window = EquityEODWindow(eod_data, look_back=30)
+    with pytest.raises(ValueError):
+        window.advance_to(eod_data.shape[0] + 1)
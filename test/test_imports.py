@@ -0,0 +1,96 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+
+def _modules_loaded_by(statement):
+    script = "import json, sys\n{}\nprint(json.dumps(sorted(sys.modules)))".format(
+        statement
+    )
+    output = subprocess.check_output([sys.executable, "-c", script])
+    return set(json.loads(output))
+
+
+def test_ImportPalm_NoSubpackageImported():
+
+    modules = _modules_loaded_by("import palm")
+
+    assert "palm" in modules
+    assert "palm.broker" not in modules
+    assert "pandas" not in modules
+
+
+def test_ImportBacktestSession_PolygonAndTqdmNotImported():
+
+    modules = _modules_loaded_by("import palm.backtestsession")
+
+    assert "palm.backtestsession" in modules
+    assert "polygon" not in modules
+    assert "tqdm" not in modules
+
+
+def test_PalmAttribute_OnlyItsModuleImported():
+
+    modules = _modules_loaded_by("import palm\npalm.MarketOrder")
+
+    assert "palm.orders.market_order" in modules
+    assert "palm.broker" not in modules
+    assert "palm.data" not in modules
+    assert "pandas" not in modules
+
+
+def test_StarImport_PublicNamesOfEverySubpackage():
+
+    namespace = {}
+    exec("from palm import *", namespace)
+
+    assert "importlib" not in namespace
+    for name in ["SimulatedTrader", "EquityEOD", "Schedule", "MarketOrder", "Trade"]:
+        assert name in namespace
+    assert namespace["data"].EquityEOD is namespace["EquityEOD"]
+
+
+def test_Subpackages_ResolvedAsSubmodules():
+
+    import palm
+    from palm.data import EquityEOD
+
+    assert palm.data.EquityEOD is EquityEOD
+    for name in ["broker", "context", "orders", "positions", "trades", "utils"]:
+        assert getattr(palm, name).__name__ == "palm." + name
+
+
+def test_NameMap_SameNamesAsStarImportOfEachSubpackage():
+
+    import importlib
+    import types
+
+    import palm
+
+    for subpackage in palm.__all__:
+        if subpackage not in palm._subpackages:
+            continue
+        module = importlib.import_module("palm." + subpackage)
+        for name in dir(module):
+            value = getattr(module, name)
+            if name.startswith("_") or isinstance(value, types.ModuleType):
+                continue
+            if getattr(value, "__module__", "").startswith("palm."):
+                assert getattr(palm, name) is value, name
+
+
+def test_PalmAttributes_SameAsFromSubpackages():
+
+    import palm
+    from palm.backtestsession import BacktestSubscribeSession
+    from palm.context import ContextEOD
+    from palm.data import pull_polygon_eod
+
+    assert palm.BacktestSubscribeSession is BacktestSubscribeSession
+    assert palm.ContextEOD is ContextEOD
+    assert palm.pull_polygon_eod is pull_polygon_eod
+    assert "SimulatedTrader" in dir(palm)
+    with pytest.raises(AttributeError):
+        palm.NotAName
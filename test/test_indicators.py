@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from palm.context import ContextEOD
+from palm.data import EquityEOD, polygon_symbol_indexed_to_OHCLV_indexed
+
+
+@pytest.fixture
+def eod_data():
+
+    data = {}
+    data["AAPL"] = pd.read_csv("sample_data/AAPL-Sample-Data.csv", index_col=0)
+    data["MSFT"] = pd.read_csv("sample_data/MSFT-Sample-Data.csv", index_col=0)
+
+    return EquityEOD(polygon_symbol_indexed_to_OHCLV_indexed(data))
+
+
+def test_RollingMeanAndStd_MatchWindowedValues(eod_data):
+
+    close = eod_data["close"]
+    mean = eod_data.indicators.rolling_mean("close", 10)
+    std = eod_data.indicators.rolling_std("close", 10)
+
+    assert np.all(np.isnan(mean[:9]))
+    for t in [9, 50, len(close) - 1]:
+        assert np.allclose(mean[t], close[t - 9 : t + 1].mean(axis=0))
+        assert np.allclose(std[t], close[t - 9 : t + 1].std(axis=0, ddof=1))
+
+
+def test_ZScore_FromMeanAndStd(eod_data):
+
+    indicators = eod_data.indicators
+    zscore = indicators.zscore("close", 20)
+
+    expected = (eod_data["close"] - indicators.rolling_mean("close", 20)) / (
+        indicators.rolling_std("close", 20)
+    )
+    assert np.allclose(zscore[19:], expected[19:])
+
+
+def test_Returns_OverWindowRows(eod_data):
+
+    close = eod_data["close"]
+    returns = eod_data.indicators.returns("close", 5)
+
+    assert np.all(np.isnan(returns[:5]))
+    assert np.allclose(returns[5:], close[5:] / close[:-5] - 1.0)
+
+
+def test_Ewma_MatchesPandas(eod_data):
+
+    ewma = eod_data.indicators.ewma("close", 10)
+    expected = eod_data._data_frame("close").ewm(span=10, adjust=False).mean()
+
+    assert np.allclose(ewma, expected.to_numpy())
+
+
+def test_SameIndicatorTwice_SameReadOnlyArray(eod_data):
+
+    first = eod_data.indicators.rolling_mean("close", 10)
+    second = eod_data.indicators.get("close", "mean", 10)
+
+    assert first is second
+    assert not first.flags.writeable
+    assert ("close", "mean", 10) in eod_data.indicators
+
+
+def test_UnknownIndicator_ValueErrorRaised(eod_data):
+    with pytest.raises(ValueError):
+        eod_data.indicators.get("close", "median", 10)
+    with pytest.raises(ValueError):
+        eod_data.indicators.get("adjusted_close", "mean", 10)
+    with pytest.raises(ValueError):
+        eod_data.indicators.get("close", "mean", 0)
+
+
+def test_ContextIndicatorAtOpening_PreviousDayForNonOpenFields(eod_data):
+
+    context = ContextEOD(eod_data, start_index=40)
+    close_mean = eod_data.indicators.rolling_mean("close", 10)
+    open_mean = eod_data.indicators.rolling_mean("open", 10)
+
+    assert np.array_equal(context.indicator("close", "mean", 10), close_mean[39])
+    assert np.array_equal(context.indicator("open", "mean", 10), open_mean[40])
+
+    context.update()
+
+    assert np.array_equal(context.indicator("close", "mean", 10), close_mean[40])
+    assert context.indicator("close", "mean", 10, symbol="MSFT") == close_mean[40, 1]
+
+
+def test_ContextIndicatorFirstOpening_NaN(eod_data):
+
+    context = ContextEOD(eod_data)
+
+    assert np.all(np.isnan(context.indicator("close", "ewma", 5)))
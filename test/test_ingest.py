@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from palm.data import (
+    EquityEOD,
+    equity_eod_from_polygon_columns,
+    load_equity_eod,
+    polygon_symbol_indexed_to_OHCLV_indexed,
+    read_bars,
+)
+
+
+@pytest.fixture
+def eod_data():
+
+    data = {}
+    data["AAPL"] = pd.read_csv("sample_data/AAPL-Sample-Data.csv", index_col=0)
+    data["MSFT"] = pd.read_csv("sample_data/MSFT-Sample-Data.csv", index_col=0)
+
+    return EquityEOD(polygon_symbol_indexed_to_OHCLV_indexed(data))
+
+
+def _write_bars(path, days, close):
+    ## Polygon style bars at 05:00 UTC of each day.
+    timestamps = np.asarray(days, dtype=np.int64) * 86_400_000 + 5 * 3_600_000
+    close = np.asarray(close, dtype=np.float64)
+    pd.DataFrame(
+        {
+            "v": 1000.0,
+            "vw": close,
+            "o": close - 1,
+            "c": close,
+            "h": close + 1,
+            "l": close - 2,
+            "t": timestamps,
+            "n": 10,
+        }
+    ).to_csv(path, index=False)
+
+
+def test_SampleDataDirectory_SameAsBuiltByHand(eod_data):
+
+    loaded = load_equity_eod("sample_data")
+
+    assert loaded.symbols == eod_data.symbols
+    assert loaded.shape == eod_data.shape
+    assert np.array_equal(loaded["dates"], eod_data["dates"].normalize())
+    assert np.array_equal(loaded.field_tensor, eod_data.field_tensor)
+
+
+def test_RaggedFiles_AlignedOnTheUnionOfDays(tmp_path):
+
+    _write_bars(tmp_path / "AAA.csv", [18000, 18001, 18003], [1.0, 2.0, 3.0])
+    _write_bars(tmp_path / "BBB.csv", [18002, 18001], [20.0, 10.0])
+
+    loaded = load_equity_eod(str(tmp_path))
+
+    assert loaded.symbols == ["AAA", "BBB"]
+    assert list(loaded.calendar.days) == [18000, 18001, 18002, 18003]
+    close = loaded["close"]
+    assert np.array_equal(close[:, 0], [1.0, 2.0, np.nan, 3.0], equal_nan=True)
+    assert np.array_equal(close[:, 1], [np.nan, 10.0, 20.0, np.nan], equal_nan=True)
+    assert np.array_equal(loaded["high"][:, 0], [2.0, 3.0, np.nan, 4.0], equal_nan=True)
+
+
+def test_SeveralBarsOnADay_LastKept(tmp_path):
+
+    _write_bars(tmp_path / "AAA.csv", [18000, 18001, 18000], [1.0, 2.0, 5.0])
+
+    bars = read_bars(str(tmp_path / "AAA.csv"))
+    loaded = load_equity_eod(str(tmp_path))
+
+    assert list(bars["c"]) == [1.0, 2.0, 5.0]
+    assert list(loaded.calendar.days) == [18000, 18001]
+    assert list(loaded["close"][:, 0]) == [5.0, 2.0]
+
+
+def test_BarsAtTwoTimesOfOneDay_OneRowOfTheLastAsPulledByDay():
+
+    ## Same columns as pulled from polygon, aligned by day as files are.
+    columns = {
+        "t": np.array([0, 3_600_000, 86_400_000]),
+        "o": np.array([1.0, 2.0, 3.0]),
+        "c": np.array([1.0, 2.0, 3.0]),
+        "h": np.array([1.0, 2.0, 3.0]),
+        "l": np.array([1.0, 2.0, 3.0]),
+        "v": np.array([1.0, 2.0, 3.0]),
+    }
+
+    by_time = equity_eod_from_polygon_columns({"AAA": columns})
+    by_day = equity_eod_from_polygon_columns({"AAA": columns}, by_day=True)
+
+    assert list(by_time["close"][:, 0]) == [1.0, 2.0, 3.0]
+    assert list(by_day["close"][:, 0]) == [2.0, 3.0]
+    assert list(by_day.calendar.days) == [0, 1]
+
+
+@pytest.mark.parametrize("use_processes", [False, True])
+def test_ReadInAPool_SameAsReadInTurn(tmp_path, use_processes):
+
+    generator = np.random.default_rng(0)
+    for i in range(8):
+        days = np.sort(generator.choice(np.arange(18000, 18040), 30, replace=False))
+        _write_bars(tmp_path / "S{}.csv".format(i), days, generator.random(30))
+
+    in_turn = load_equity_eod(str(tmp_path))
+    pooled = load_equity_eod(str(tmp_path), max_workers=4, use_processes=use_processes)
+
+    assert pooled.symbols == in_turn.symbols
+    assert np.array_equal(pooled.field_tensor, in_turn.field_tensor, equal_nan=True)
+
+
+def test_FileListWithSymbolOf_SymbolsTakenFromIt(tmp_path):
+
+    _write_bars(tmp_path / "bars_aaa.csv", [18000], [1.0])
+    _write_bars(tmp_path / "bars_bbb.csv", [18000], [2.0])
+
+    loaded = load_equity_eod(
+        [str(tmp_path / "bars_bbb.csv"), str(tmp_path / "bars_aaa.csv")],
+        symbol_of=lambda path: path[-7:-4].upper(),
+        dtype=np.float32,
+    )
+
+    assert loaded.symbols == ["AAA", "BBB"]
+    assert loaded.dtype == np.float32
+    assert list(loaded["close"][0]) == [1.0, 2.0]
+
+
+def test_BadSources_ValueErrorRaised(tmp_path):
+
+    with pytest.raises(ValueError):
+        load_equity_eod(str(tmp_path))
+    with pytest.raises(ValueError):
+        load_equity_eod(str(tmp_path / "missing"))
+
+    _write_bars(tmp_path / "AAA-1.csv", [18000], [1.0])
+    _write_bars(tmp_path / "AAA-2.csv", [18000], [1.0])
+    with pytest.raises(ValueError):
+        load_equity_eod(str(tmp_path))
+
+    pd.DataFrame({"t": [0], "c": [1.0]}).to_csv(tmp_path / "BBB.csv", index=False)
+    with pytest.raises(ValueError) as raised:
+        load_equity_eod(str(tmp_path), pattern="BBB*")
+    assert isinstance(raised.value.__cause__, ValueError)
+
+
+def test_ParquetFiles_SameAsCSV(tmp_path):
+    pytest.importorskip("pyarrow")
+
+    _write_bars(tmp_path / "AAA.csv", [18000, 18002], [1.0, 2.0])
+    pd.read_csv(tmp_path / "AAA.csv").to_parquet(tmp_path / "BBB.parquet")
+
+    loaded = load_equity_eod(str(tmp_path))
+
+    assert loaded.symbols == ["AAA", "BBB"]
+    assert np.array_equal(loaded["close"][:, 0], loaded["close"][:, 1])
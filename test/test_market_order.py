@@ -1,6 +1,15 @@
 import pytest
 
 from palm.orders import MarketOrder, MarketOrderStatus, MarketOrderType
+from palm.utils import generate_id
+from palm.utils.generate_id import IdSequence, reset_ids
+
+
+@pytest.fixture
+def restored_ids():
+    process_sequence = generate_id._process_sequence
+    yield
+    generate_id._process_sequence = process_sequence
 
 
 def test_PostiveIntegerQuantity_OrderCreated():
@@ -28,3 +37,47 @@ def test_TwoDifferentOrdersSameSymbolSameAmount_NotEqual():
     order = MarketOrder.Buy("MSFT", 1)
     second_similar_order = MarketOrder.Buy("MSFT", 1)
     assert second_similar_order != order
+
+
+def test_ResetIds_SameIdSequence(restored_ids):
+
+    reset_ids(100)
+    first_ids = [MarketOrder.Buy("MSFT", 1).id for _ in range(3)]
+    reset_ids(100)
+    second_ids = [MarketOrder.Buy("MSFT", 1).id for _ in range(3)]
+
+    assert first_ids == [100, 101, 102]
+    assert second_ids == first_ids
+
+
+def test_ActivatedIdSequence_IdsDrawnFromItUntilExit(restored_ids):
+
+    reset_ids(100)
+    with IdSequence(0).activated():
+        inner_ids = [MarketOrder.Buy("MSFT", 1).id for _ in range(2)]
+    outer_id = MarketOrder.Buy("MSFT", 1).id
+
+    assert inner_ids == [0, 1]
+    assert outer_id == 100
+
+
+def test_SameIdFromTwoSequences_NotEqual():
+
+    with IdSequence(0).activated():
+        first = MarketOrder.Buy("MSFT", 1)
+    with IdSequence(0).activated():
+        second = MarketOrder.Buy("MSFT", 1)
+
+    assert first.id == second.id
+    assert first != second
+    assert len({first, second}) == 2
+
+
+def test_Order_SlottedAndHashable():
+
+    order = MarketOrder.Buy("MSFT", 1)
+
+    assert not hasattr(order, "__dict__")
+    with pytest.raises(AttributeError):
+        order.not_an_attribute = 1
+    assert {order: 1}[order] == 1
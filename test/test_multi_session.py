@@ -0,0 +1,174 @@
+from palm.backtestsession import BacktestSubscribeSession, MultiStrategySession
+from palm.backtestsession.backtestsession import Strategy
+from palm.data.equity_eod import EquityEOD
+import numpy as np
+import pytest
+
+import pandas as pd
+
+from palm.data import polygon_symbol_indexed_to_OHCLV_indexed
+from palm.trades import Trade
+from palm.context import Schedule, TimeInMarketDay
+
+
+@pytest.fixture
+def eod_data():
+
+    data = {}
+    data["AAPL"] = pd.read_csv("sample_data/AAPL-Sample-Data.csv", index_col=0)
+    data["MSFT"] = pd.read_csv("sample_data/MSFT-Sample-Data.csv", index_col=0)
+
+    return EquityEOD(polygon_symbol_indexed_to_OHCLV_indexed(data))
+
+
+class BuyAndHoldStrategy(Strategy):
+    def __init__(self, schedule=None):
+        self.symbols = ["AAPL", "MSFT"]
+        self.schedule = schedule
+
+    def on_update(self, historical_data, context, trader):
+        if len(trader.open_trades) == 0:
+            trader.submit_trade(Trade({"AAPL": 10, "MSFT": -5}))
+
+
+class RebalancingStrategy(Strategy):
+    """
+    Alternates between two weightings, closing only.
+    """
+
+    def __init__(self, schedule=None):
+        self.symbols = ["AAPL", "MSFT"]
+        self.schedule = schedule
+        self.updates = []
+
+    def trade_on_this_time_event(self, time_event):
+        return time_event.time_in_market_day == TimeInMarketDay.Closing
+
+    def on_update(self, historical_data, context, trader):
+        self.updates.append(context.current_tick_index())
+        if len(self.updates) % 2 == 1:
+            trader.rebalance_to_weights(np.array([0.7, 0.3]))
+        else:
+            trader.rebalance_to_weights(np.array([0.2, 0.5]))
+
+
+class StopLossStrategy(Strategy):
+    def __init__(self, schedule=None):
+        self.symbols = ["AAPL"]
+        self.schedule = schedule
+
+    def on_update(self, historical_data, context, trader):
+        if len(trader.open_trades) == 0:
+            trader.submit_trade(Trade({"AAPL": 20}, stop_loss=0.02))
+
+
+def _strategies():
+    return [
+        BuyAndHoldStrategy(),
+        RebalancingStrategy(),
+        RebalancingStrategy(Schedule.weekly()),
+        StopLossStrategy(Schedule.month_end()),
+    ]
+
+
+def test_SeveralStrategies_SameResultsAsSeparateSessions(eod_data):
+
+    session = MultiStrategySession(_strategies(), eod_data, initial_capital=50000.0)
+    session.run()
+
+    for (k, strategy) in enumerate(_strategies()):
+        single = BacktestSubscribeSession(
+            strategy, eod_data, initial_capital=50000.0, record="closes"
+        )
+        single.run()
+        assert np.array_equal(session.results[k].dates, single.results.dates)
+        assert np.allclose(
+            session.results[k].portfolio_value, single.results.portfolio_value
+        )
+        assert np.array_equal(session.results[k].holdings, single.results.holdings)
+        assert len(session.traders[k].closed_trades) == len(
+            single._trader.closed_trades
+        )
+
+
+def test_StrategyWithTimeEventFilter_CalledOnSameTicksAsAlone(eod_data):
+
+    together = RebalancingStrategy()
+    MultiStrategySession([BuyAndHoldStrategy(), together], eod_data).run()
+
+    alone = RebalancingStrategy()
+    BacktestSubscribeSession(alone, eod_data).run()
+
+    assert together.updates == alone.updates
+    assert all(tick % 2 == 1 for tick in together.updates)
+
+
+def test_OnlyScheduledStrategies_OnlyScheduledTicksVisited(eod_data):
+
+    weekly = RebalancingStrategy(Schedule.weekly())
+    month_end = RebalancingStrategy(Schedule.month_end())
+    session = MultiStrategySession([weekly, month_end], eod_data, record="none")
+    session.run()
+
+    dates = eod_data["dates"]
+    assert weekly.updates == list(Schedule.weekly().compile(dates, 60))
+    assert month_end.updates == list(Schedule.month_end().compile(dates, 60))
+
+
+def test_InitialCapitalPerStrategy_EachBrokerStartsWithItsOwn(eod_data):
+
+    session = MultiStrategySession(
+        [BuyAndHoldStrategy(), BuyAndHoldStrategy()],
+        eod_data,
+        initial_capital=[10000.0, 20000.0],
+    )
+    session.run()
+
+    values = session.portfolio_value()
+    T, _ = eod_data.shape
+    assert values.shape == (T - 30, 2)
+    assert np.allclose(values[:, 1] - values[:, 0], 10000.0)
+
+
+def test_InvalidStrategiesOrCapital_ValueErrorRaised(eod_data):
+
+    class NoSymbols(Strategy):
+        pass
+
+    class UnknownSymbol(Strategy):
+        symbols = ["SPY"]
+
+    with pytest.raises(ValueError):
+        MultiStrategySession([], eod_data)
+    with pytest.raises(ValueError):
+        MultiStrategySession([BuyAndHoldStrategy(), NoSymbols()], eod_data)
+    with pytest.raises(ValueError):
+        MultiStrategySession([UnknownSymbol()], eod_data)
+    with pytest.raises(ValueError):
+        MultiStrategySession(
+            [BuyAndHoldStrategy(), BuyAndHoldStrategy()],
+            eod_data,
+            initial_capital=[10000.0],
+        )
+
+
+def test_RunTwice_RuntimeErrorRaised(eod_data):
+
+    session = MultiStrategySession([BuyAndHoldStrategy()], eod_data)
+    session.run()
+    with pytest.raises(RuntimeError):
+        session.run()
+
+
+def test_AllStrategiesScheduled_ScheduledTicksRecordedByDefault(eod_data):
+
+    weekly = RebalancingStrategy(Schedule.weekly())
+    month_end = RebalancingStrategy(Schedule.month_end())
+    session = MultiStrategySession([weekly, month_end], eod_data)
+    session.run()
+
+    T, _ = eod_data.shape
+    expected = np.union1d(weekly.updates, month_end.updates + [2 * T - 1])
+    for results in session.results:
+        assert results.granularity == "schedule"
+        assert list(results.ticks) == list(expected)
@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+
+import pandas as pd
+
+from palm.broker.simulated_broker import SimulatedBroker
+from palm.context import ContextEOD
+from palm.data import EquityEOD, polygon_symbol_indexed_to_OHCLV_indexed
+from palm.orders import MarketOrder, MarketOrderStatus
+from palm.positions import Position
+
+
+@pytest.fixture
+def eod_data():
+
+    data = {}
+    data["AAPL"] = pd.read_csv("sample_data/AAPL-Sample-Data.csv", index_col=0)
+    data["MSFT"] = pd.read_csv("sample_data/MSFT-Sample-Data.csv", index_col=0)
+
+    return EquityEOD(polygon_symbol_indexed_to_OHCLV_indexed(data))
+
+
+@pytest.fixture
+def context(eod_data):
+    return ContextEOD(eod_data)
+
+
+@pytest.fixture
+def initial_deposit():
+    return 10000
+
+
+@pytest.fixture
+def broker(context, initial_deposit):
+    return SimulatedBroker(context, initial_deposit, use_position_book=True)
+
+
+@pytest.fixture
+def object_broker(context, initial_deposit):
+    return SimulatedBroker(context, initial_deposit)
+
+
+def test_BuyAndSellOrders_QuantitiesKeptAsSignedVector(broker):
+
+    broker.submit_order(MarketOrder.Buy("AAPL", 10))
+    broker.submit_order(MarketOrder.Sell("MSFT", 3))
+
+    assert list(broker.position_book.quantities) == [10, -3]
+    assert list(broker.position_quantities()) == [10, -3]
+    with pytest.raises(ValueError):
+        broker.position_book.quantities[0] = 1
+
+
+def test_PositionRequested_SnapshotBuiltOnDemand(broker, context):
+
+    order = MarketOrder.Buy("AAPL", 10)
+    broker.submit_order(order)
+    broker.submit_order(MarketOrder.Buy("AAPL", 5))
+
+    position = broker.get_position("AAPL")
+    assert position.side == Position.Side.LONG
+    assert position.status == Position.Status.OPEN
+    assert position.quantity == 15
+    assert position.order == order
+    assert position == broker.get_position("AAPL")
+    assert position.current_dollar_value == 15 * context.current_market_price("AAPL")
+
+    broker.submit_order(MarketOrder.Sell("MSFT", 2))
+    short = broker.all_positions["MSFT"]
+    assert short.side == Position.Side.SHORT
+    assert short.quantity == 2
+
+
+def test_PositionClosed_NoPositionsLeft(broker):
+
+    broker.submit_order(MarketOrder.Sell("AAPL", 10))
+    broker.submit_order(MarketOrder.Buy("AAPL", 10))
+
+    assert broker.get_position("AAPL") is None
+    assert broker.all_positions == {}
+    assert broker.portfolio_value() == broker.cash_account.balance
+
+
+def test_OversizedOrders_ValueErrorRaised(broker):
+
+    broker.submit_order(MarketOrder.Buy("AAPL", 10))
+    with pytest.raises(ValueError):
+        broker.submit_order(MarketOrder.Sell("AAPL", 11))
+
+    broker.submit_order(MarketOrder.Sell("MSFT", 10))
+    with pytest.raises(ValueError):
+        broker.submit_order(MarketOrder.Buy("MSFT", 11))
+
+
+def test_InsufficientFunds_OrderFailed(broker):
+
+    order = MarketOrder.Buy("AAPL", 1000000)
+    broker.submit_order(order)
+    assert order.status == MarketOrderStatus.FAILED
+    assert broker.get_position("AAPL") is None
+
+
+def test_SameOrders_MatchesPositionObjectBroker(broker, object_broker, context):
+
+    for current_broker in [broker, object_broker]:
+        current_broker.submit_order(MarketOrder.Buy("AAPL", 10))
+        current_broker.submit_order(MarketOrder.Sell("MSFT", 4))
+
+    for _ in range(5):
+        context.update()
+        assert abs(broker.portfolio_value() - object_broker.portfolio_value()) < 1.0e-9
+    assert np.array_equal(
+        broker.position_quantities(), object_broker.position_quantities()
+    )
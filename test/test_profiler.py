@@ -0,0 +1,63 @@
+import tracemalloc
+
+from palm.utils.profiler import Profiler
+
+
+class Counter:
+    def __init__(self):
+        self.count = 0
+
+    def increment(self, times=1):
+        for _ in range(times - 1):
+            self.increment()
+        self.count += 1
+        return self.count
+
+
+def test_InstrumentedMethod_CallsCountedAndRestored():
+
+    counter = Counter()
+    profiler = Profiler(trace_memory=False)
+    profiler.instrument(counter, "increment", "counting")
+
+    profiler.start()
+    assert counter.increment() == 1
+    counter.increment(times=3)
+    report = profiler.stop(events=2)
+    profiler.detach()
+
+    ## The nested calls are inside the timed outer call.
+    assert report.phases["counting"].calls == 2
+    assert report.phases["counting"].total_time > 0
+    assert report.events == 2
+    assert report.peak_memory is None
+    assert counter.count == 4
+    assert "increment" not in counter.__dict__
+
+
+def test_OtherInstances_NotInstrumented():
+
+    counter, other_counter = Counter(), Counter()
+    profiler = Profiler(trace_memory=False)
+    profiler.instrument(counter, "increment", "counting")
+
+    profiler.start()
+    other_counter.increment()
+    report = profiler.stop()
+
+    assert report.phases["counting"].calls == 0
+    assert "increment" not in other_counter.__dict__
+
+
+def test_TraceMemory_PeakReportedAndTracingRestored():
+
+    was_tracing = tracemalloc.is_tracing()
+    profiler = Profiler(trace_memory=True)
+
+    profiler.start()
+    data = [bytearray(1024) for _ in range(100)]
+    report = profiler.stop()
+
+    assert report.peak_memory >= 100 * 1024
+    assert tracemalloc.is_tracing() == was_tracing
+    del data
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from palm.research.research_utils import (
+    autocovariance,
+    autocovariance_diagonal_fft,
+    autocovariance_fft,
+)
+
+
+@pytest.fixture
+def series():
+    generator = np.random.default_rng(0)
+    noise = generator.normal(size=(120, 5))
+    ## Some autocorrelation, so the lags aren't all close to zero.
+    return np.cumsum(noise, axis=0) * 0.1 + noise
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 64])
+def test_AutocovarianceFFT_MatchesOneLagAtATime(series, block_size):
+
+    A = autocovariance_fft(series, 20, block_size=block_size)
+
+    assert A.shape == (21, 5, 5)
+    for k in range(21):
+        assert np.allclose(A[k], autocovariance(series, k))
+
+
+def test_AutocovarianceDiagonalFFT_MatchesDiagonals(series):
+
+    a = autocovariance_diagonal_fft(series, 20)
+
+    assert a.shape == (21, 5)
+    for k in range(21):
+        assert np.allclose(a[k], np.diagonal(autocovariance(series, k)))
+
+
+def test_AutocovarianceDiagonalFFTOneSeries_OneDimensionalResult(series):
+
+    a = autocovariance_diagonal_fft(series[:, 2], 5)
+
+    assert a.shape == (6,)
+    assert np.allclose(a, autocovariance_diagonal_fft(series, 5)[:, 2])
+
+
+def test_MaxLagTooLong_ValueErrorRaised(series):
+    with pytest.raises(ValueError):
+        autocovariance_fft(series, 119)
+    with pytest.raises(ValueError):
+        autocovariance_diagonal_fft(series, -1)
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from palm.context import Schedule, TimeInMarketDay
+from palm.data import EquityEOD, polygon_symbol_indexed_to_OHCLV_indexed
+
+
+@pytest.fixture
+def eod_data():
+
+    data = {}
+    data["AAPL"] = pd.read_csv("sample_data/AAPL-Sample-Data.csv", index_col=0)
+    data["MSFT"] = pd.read_csv("sample_data/MSFT-Sample-Data.csv", index_col=0)
+
+    return EquityEOD(polygon_symbol_indexed_to_OHCLV_indexed(data))
+
+
+def test_EveryTick_OpeningAndClosingOfEveryDay(eod_data):
+
+    ticks = Schedule.every_tick().compile(eod_data["dates"])
+
+    assert np.array_equal(ticks, np.arange(2 * len(eod_data["dates"])))
+
+
+def test_Closes_OddTicksFromStart(eod_data):
+
+    ticks = Schedule.closes().compile(eod_data["dates"], start_tick=61)
+
+    assert ticks[0] == 61
+    assert np.all(ticks % 2 == 1)
+    assert ticks[-1] == 2 * len(eod_data["dates"]) - 1
+
+
+def test_Opens_StartTickAfterOpening_FirstOpeningSkipped(eod_data):
+
+    ticks = Schedule.opens().compile(eod_data["dates"], start_tick=61)
+
+    assert ticks[0] == 62
+
+
+def test_Weekly_LastTradingDayOfEachWeek(eod_data):
+
+    dates = eod_data["dates"]
+    ticks = Schedule.weekly().compile(dates)
+    scheduled = dates[ticks // 2]
+
+    weeks = dates.to_period("W")
+    expected = dates[~weeks.duplicated(keep="last")]
+    assert scheduled.equals(expected)
+
+
+def test_MonthEnd_LastTradingDayOfEachMonth(eod_data):
+
+    dates = eod_data["dates"]
+    ticks = Schedule.month_end(TimeInMarketDay.Opening).compile(dates)
+    scheduled = dates[ticks // 2]
+
+    assert np.all(ticks % 2 == 0)
+    assert list(scheduled.month) == list(range(1, 11))
+    assert scheduled[0].day == 31
+    assert scheduled[-1] == dates[-1]
+
+
+def test_EveryNDays_CountedFromStart(eod_data):
+
+    ticks = Schedule.every_n_days(5).compile(eod_data["dates"], start_tick=20)
+
+    assert np.array_equal(ticks // 2, np.arange(10, len(eod_data["dates"]), 5))
+
+
+def test_EveryNDaysNotPositive_ValueErrorRaised():
+    with pytest.raises(ValueError):
+        Schedule.every_n_days(0)
+
+
+def test_OnDates_TickOfEachDate(eod_data):
+
+    dates = eod_data["dates"]
+    ticks = Schedule.on_dates(["2020-03-02", "2020-02-03"]).compile(dates)
+
+    assert list(dates[ticks // 2].strftime("%Y-%m-%d")) == ["2020-02-03", "2020-03-02"]
+
+
+def test_OnDatesNotTradingDay_ValueErrorRaised(eod_data):
+    with pytest.raises(ValueError):
+        Schedule.on_dates(["2020-02-01"]).compile(eod_data["dates"])
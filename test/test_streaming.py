@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+
+from palm.research.research_utils import autocovariance
+from palm.research.streaming import (
+    EWMACovariance,
+    RollingAutocovariance,
+    RollingCovariance,
+    RunningMeanVariance,
+)
+
+
+@pytest.fixture
+def rows():
+    generator = np.random.default_rng(0)
+    return generator.normal(size=(50, 4)) + np.arange(4)
+
+
+def test_RunningMeanVariance_MatchesWholeArray(rows):
+
+    stats = RunningMeanVariance(4)
+    for row in rows:
+        stats.update(row)
+
+    assert np.allclose(stats.mean, rows.mean(axis=0))
+    assert np.allclose(stats.variance, rows.var(axis=0, ddof=1))
+
+
+def test_RunningMeanVarianceWithNaN_NaNSkippedPerColumn(rows):
+
+    rows = rows.copy()
+    rows[::3, 1] = np.nan
+    stats = RunningMeanVariance(4)
+    for row in rows:
+        stats.update(row)
+
+    assert np.allclose(stats.mean, np.nanmean(rows, axis=0))
+    assert np.allclose(stats.variance, np.nanvar(rows, axis=0, ddof=1))
+    assert stats.count[1] == np.sum(~np.isnan(rows[:, 1]))
+
+
+@pytest.mark.parametrize("window", [7, 10, 50])
+def test_RollingCovariance_MatchesLastWindowRows(rows, window):
+
+    covariance = RollingCovariance(window, 4)
+    for t, row in enumerate(rows):
+        covariance.update(row)
+        if t >= 1:
+            expected = np.cov(rows[max(0, t + 1 - window) : t + 1].T)
+            assert np.allclose(covariance.covariance, expected)
+
+    assert covariance.is_ready
+    assert np.allclose(covariance.mean, rows[-window:].mean(axis=0))
+
+
+def test_RollingCovarianceNaNRow_RecoversOnceOutOfWindow(rows):
+
+    rows = rows.copy()
+    rows[5, 2] = np.nan
+    covariance = RollingCovariance(10, 4)
+    for row in rows:
+        covariance.update(row)
+
+    assert np.allclose(covariance.covariance, np.cov(rows[-10:].T))
+
+
+@pytest.mark.parametrize("lag", [0, 1, 3])
+def test_RollingAutocovariance_MatchesResearchUtils(rows, lag):
+
+    window = 12
+    rolling = RollingAutocovariance(window, 4, lag=lag)
+    for t, row in enumerate(rows):
+        rolling.update(row)
+        if t + 1 >= lag + 2:
+            window_rows = rows[max(0, t + 1 - window) : t + 1]
+            expected = autocovariance(window_rows, lag)
+            assert np.allclose(rolling.autocovariance, expected)
+
+
+def test_RollingAutocovarianceLagTooLong_ValueErrorRaised():
+    with pytest.raises(ValueError):
+        RollingAutocovariance(5, 2, lag=4)
+
+
+def test_EWMACovariance_MatchesExplicitlyWeightedCovariance(rows):
+
+    alpha = 0.1
+    ewma = EWMACovariance(4, alpha=alpha)
+    for row in rows:
+        ewma.update(row)
+
+    ## Weight (1 - lambda) * lambda**k for the row k periods ago, the first
+    ## row, which seeds the mean, keeps the rest so the weights sum to one.
+    decay = 1 - alpha
+    ages = np.arange(len(rows))[::-1]
+    weights = (1 - decay) * decay**ages
+    weights[0] = decay ** (len(rows) - 1)
+    mean = weights @ rows
+    deviations = rows - mean
+    covariance = (weights[:, None] * deviations).T @ deviations
+
+    assert np.isclose(weights.sum(), 1.0)
+    assert np.allclose(ewma.mean, mean)
+    assert np.allclose(ewma.covariance, covariance)
+
+
+def test_EWMACovarianceHalflife_WeightHalvesAfterHalflife():
+
+    ewma = EWMACovariance(2, halflife=10)
+    assert np.isclose((1 - ewma.alpha) ** 10, 0.5)
+
+    with pytest.raises(ValueError):
+        EWMACovariance(2)
+    with pytest.raises(ValueError):
+        EWMACovariance(2, alpha=0.1, halflife=10)
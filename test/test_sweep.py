@@ -0,0 +1,158 @@
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import pytest
+
+import pandas as pd
+
+from palm.backtestsession import parameter_grid, run_parameter_sweep
+from palm.backtestsession import sweep
+from palm.backtestsession.backtestsession import Strategy
+from palm.context import TimeInMarketDay
+from palm.data import EquityEOD, polygon_symbol_indexed_to_OHCLV_indexed
+
+
+@pytest.fixture
+def eod_data():
+
+    data = {}
+    data["AAPL"] = pd.read_csv("sample_data/AAPL-Sample-Data.csv", index_col=0)
+    data["MSFT"] = pd.read_csv("sample_data/MSFT-Sample-Data.csv", index_col=0)
+
+    return EquityEOD(polygon_symbol_indexed_to_OHCLV_indexed(data))
+
+
+class FixedWeightStrategy(Strategy):
+    def __init__(self, aapl_weight, msft_weight):
+        self.symbols = ["AAPL", "MSFT"]
+        self.weights = np.array([aapl_weight, msft_weight])
+
+    def on_update(self, historical_data, context, trader):
+        if context.time_in_market_day() == TimeInMarketDay.Closing:
+            trader.rebalance_to_weights(self.weights)
+
+
+def fixed_weight_strategy(aapl_weight, msft_weight):
+    return FixedWeightStrategy(aapl_weight, msft_weight)
+
+
+def test_ParameterGrid_ExpandsEveryCombination():
+
+    grid = parameter_grid({"a": [1, 2], "b": ["x", "y", "z"]})
+    assert len(grid) == 6
+    assert grid[0] == {"a": 1, "b": "x"}
+    assert grid[-1] == {"a": 2, "b": "z"}
+
+
+def test_SweepInProcessPool_MatchesSerialSweep(eod_data):
+
+    grid = {"aapl_weight": [0.0, 0.5], "msft_weight": [0.2, 0.4]}
+    parallel_values, parallel_summary = run_parameter_sweep(
+        fixed_weight_strategy, grid, eod_data, max_workers=2
+    )
+    serial_values, serial_summary = run_parameter_sweep(
+        fixed_weight_strategy, grid, eod_data, max_workers=1
+    )
+
+    T, _ = eod_data.shape
+    assert len(parallel_values) == 4 * (T - 30)
+    assert list(parallel_values.columns) == [
+        "aapl_weight",
+        "msft_weight",
+        "date",
+        "portfolio_value",
+    ]
+    assert np.allclose(
+        parallel_values["portfolio_value"], serial_values["portfolio_value"]
+    )
+    assert len(parallel_summary) == 4
+    assert np.allclose(parallel_summary["sharpe_ratio"], serial_summary["sharpe_ratio"])
+
+
+def test_SweepWithNoWeights_PortfolioValueIsFlat(eod_data):
+
+    values, summary = run_parameter_sweep(
+        fixed_weight_strategy,
+        [{"aapl_weight": 0.0, "msft_weight": 0.0}],
+        eod_data,
+        initial_capital=1000.0,
+        max_workers=1,
+    )
+    assert np.all(values["portfolio_value"] == 1000.0)
+    assert summary["total_return"][0] == 0.0
+    assert summary["max_drawdown"][0] == 0.0
+
+
+def test_SweepOverMmapData_MatchesInMemorySweep(eod_data, tmp_path):
+
+    eod_data.to_mmap(str(tmp_path))
+    mapped = EquityEOD.from_mmap(str(tmp_path))
+
+    grid = {"aapl_weight": [0.3], "msft_weight": [0.1, 0.3]}
+    mapped_values, _ = run_parameter_sweep(
+        fixed_weight_strategy, grid, mapped, max_workers=2
+    )
+    in_memory_values, _ = run_parameter_sweep(
+        fixed_weight_strategy, grid, eod_data, max_workers=1
+    )
+    assert np.allclose(
+        mapped_values["portfolio_value"], in_memory_values["portfolio_value"]
+    )
+
+
+@pytest.mark.filterwarnings("error::RuntimeWarning")
+def test_SweepOverOneClose_ScoresWithoutReturns(eod_data):
+
+    values, summary = run_parameter_sweep(
+        fixed_weight_strategy,
+        [{"aapl_weight": 0.5, "msft_weight": 0.5}],
+        eod_data,
+        look_back_days=len(eod_data["dates"]) - 1,
+        initial_capital=1000.0,
+        max_workers=1,
+    )
+    assert len(values) == 1
+    assert summary["total_return"][0] == 0.0
+    assert np.isnan(summary["sharpe_ratio"][0])
+    assert summary["max_drawdown"][0] == 0.0
+
+
+def test_SweepOverSlicedMmapData_MatchesInMemorySweep(eod_data, tmp_path):
+
+    eod_data.to_mmap(str(tmp_path))
+    dates = eod_data["dates"]
+    ## A slice has no directory to reopen, it is copied into shared memory.
+    sliced = EquityEOD.from_mmap(str(tmp_path)).slice(dates[20], dates[120])
+    assert sliced.mmap_path is None
+
+    grid = {"aapl_weight": [0.3], "msft_weight": [0.1, 0.3]}
+    sliced_values, _ = run_parameter_sweep(
+        fixed_weight_strategy, grid, sliced, max_workers=2
+    )
+    in_memory_values, _ = run_parameter_sweep(
+        fixed_weight_strategy,
+        grid,
+        eod_data.slice(dates[20], dates[120]),
+        max_workers=1,
+    )
+    assert np.allclose(
+        sliced_values["portfolio_value"], in_memory_values["portfolio_value"]
+    )
+
+
+def test_WorkerAttachesSharedMemory_NotRegisteredWithResourceTracker(monkeypatch):
+
+    shared = shared_memory.SharedMemory(create=True, size=8)
+    registered = []
+    monkeypatch.setattr(
+        resource_tracker, "register", lambda name, rtype: registered.append(name)
+    )
+    try:
+        attached = sweep._attach_shared_memory(shared.name)
+        attached.close()
+    finally:
+        shared.close()
+        shared.unlink()
+
+    assert registered == []
+    assert shared_memory.resource_tracker is resource_tracker
@@ -0,0 +1,106 @@
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from palm.data import synthetic_equity_eod
+
+
+def test_SyntheticData_ShapeAndConsistentBars():
+
+    eod_data = synthetic_equity_eod(n_days=300, n_symbols=12)
+
+    assert eod_data.shape == (300, 12)
+    assert eod_data.symbols == sorted(eod_data.symbols)
+    assert eod_data["dates"].is_monotonic_increasing
+    assert not np.any(np.isnan(eod_data.field_tensor))
+    assert np.all(eod_data["high"] >= np.maximum(eod_data["open"], eod_data["close"]))
+    assert np.all(eod_data["low"] <= np.minimum(eod_data["open"], eod_data["close"]))
+    assert np.all(eod_data["volume"] > 0)
+
+
+def test_SameSeed_SameData():
+
+    first = synthetic_equity_eod(n_days=50, n_symbols=3, seed=5)
+    second = synthetic_equity_eod(n_days=50, n_symbols=3, seed=5)
+    other = synthetic_equity_eod(n_days=50, n_symbols=3, seed=6)
+
+    assert np.array_equal(first.field_tensor, second.field_tensor)
+    assert not np.array_equal(first.field_tensor, other.field_tensor)
+
+
+def test_Ragged_MissingBeforeListingAndAfterDelisting():
+
+    eod_data = synthetic_equity_eod(n_days=200, n_symbols=30, ragged=True)
+    trading = ~np.isnan(eod_data["close"])
+
+    assert np.all(trading[:, 0])
+    for column in range(30):
+        rows = np.flatnonzero(trading[:, column])
+        assert np.all(np.diff(rows) == 1)
+    assert np.any(~trading[0])
+    ## Every field is missing together.
+    assert np.array_equal(np.isnan(eod_data.field_tensor).any(axis=0), ~trading)
+
+
+def test_NaNFraction_RoughlyThatFractionMissing():
+
+    eod_data = synthetic_equity_eod(n_days=500, n_symbols=20, nan_fraction=0.1)
+
+    assert 0.08 < np.mean(np.isnan(eod_data["open"])) < 0.12
+
+
+def test_Float32_HalvesMemory():
+
+    eod_data = synthetic_equity_eod(n_days=10, n_symbols=2, dtype=np.float32)
+
+    assert eod_data.dtype == np.float32
+
+
+def test_InvalidSizes_ValueErrorRaised():
+    with pytest.raises(ValueError):
+        synthetic_equity_eod(n_days=0)
+    with pytest.raises(ValueError):
+        synthetic_equity_eod(nan_fraction=1.0)
+
+
+def test_BenchmarkScript_WritesResultsAsJson(tmp_path):
+
+    output = tmp_path / "results.json"
+    script = os.path.join(
+        os.path.dirname(__file__), "..", "benchmarks", "run_benchmarks.py"
+    )
+    subprocess.run(
+        [
+            sys.executable,
+            script,
+            "--days",
+            "80",
+            "--symbols",
+            "4",
+            "--repeat",
+            "1",
+            "--ragged",
+            "--output",
+            str(output),
+        ],
+        check=True,
+        capture_output=True,
+    )
+
+    with open(output) as results_file:
+        results = json.load(results_file)
+    assert results["config"]["days"] == 80
+    assert set(results["results"].keys()) == {
+        "eod_slice",
+        "context_iter",
+        "broker_submit_order",
+        "broker_portfolio_value",
+        "trader_rebalance",
+        "session_run",
+        "session_run_every_tick",
+    }
+    assert all(result["min"] > 0 for result in results["results"].values())
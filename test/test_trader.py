@@ -1,10 +1,12 @@
 import pytest
 
+import numpy as np
 import pandas as pd
 
 from palm.data import EquityEOD, polygon_symbol_indexed_to_OHCLV_indexed
 from palm.context import ContextEOD, TimeInMarketDay
 from palm.trader import SimulatedTrader
+from palm.trader.exit_rules import ExitRuleBook
 
 from palm.trades import Trade
 
@@ -67,3 +69,118 @@ def test_one_update_workflow(context):
     ## TODO: Need to ensure there was
     ## 4 orders submitted.
     ## They all are closed, and were all fullfilled.
+
+
+def test_TradeEntry_SellsSubmittedBeforeBuys(context):
+
+    trader = SimulatedTrader(context, 10000)
+    trade = Trade({"AAPL": 1, "MSFT": -1})
+    trader.submit_trade(trade)
+
+    assert [order.symbol for order in trade._entry_orders] == ["MSFT", "AAPL"]
+
+
+def test_ExitRuleBook_StopLossAndTakeProfit_Trigger():
+
+    book = ExitRuleBook({"AAPL": 0, "MSFT": 1})
+    losing = Trade({"AAPL": 10}, stop_loss=0.05)
+    winning = Trade({"MSFT": -10}, take_profit=0.05)
+    book.add(losing, np.array([100.0, 100.0]), 0)
+    book.add(winning, np.array([100.0, 100.0]), 0)
+
+    assert book.triggered(np.array([96.0, 97.0]), 1) == []
+    assert book.triggered(np.array([95.0, 94.0]), 2) == [losing, winning]
+    assert len(book) == 0
+
+
+def test_ExitRuleBook_TrailingStop_TriggersFromPeak():
+
+    book = ExitRuleBook({"AAPL": 0, "MSFT": 1})
+    trade = Trade({"AAPL": 1, "MSFT": -1}, trailing_stop=0.1)
+    book.add(trade, np.array([100.0, 100.0]), 0)
+
+    assert book.triggered(np.array([140.0, 100.0]), 1) == []
+    ## Return fell from 0.2 to 0.11, not yet 0.1 below the peak.
+    assert book.triggered(np.array([122.0, 100.0]), 2) == []
+    assert book.triggered(np.array([120.0, 100.0]), 3) == [trade]
+
+
+def test_ExitRuleBook_NaNPrices_DoNotTrigger():
+
+    book = ExitRuleBook({"AAPL": 0, "MSFT": 1})
+    trade = Trade({"AAPL": 1}, stop_loss=0.01, take_profit=0.01)
+    book.add(trade, np.array([100.0, 100.0]), 0)
+
+    assert book.triggered(np.array([np.nan, 100.0]), 1) == []
+    assert trade in book
+
+
+def test_ExitRuleBook_Remove_KeepsOtherTradesLegs():
+
+    book = ExitRuleBook({"AAPL": 0, "MSFT": 1})
+    first = Trade({"AAPL": 1, "MSFT": 1}, take_profit=0.5)
+    second = Trade({"MSFT": 1}, stop_loss=0.1)
+    book.add(first, np.array([100.0, 100.0]), 0)
+    book.add(second, np.array([100.0, 100.0]), 0)
+
+    book.remove(first)
+
+    assert first not in book
+    assert book.triggered(np.array([200.0, 85.0]), 1) == [second]
+
+
+def test_ExitRuleBook_ManyTradesRemoved_RemainingStillTrigger():
+
+    book = ExitRuleBook({"AAPL": 0, "MSFT": 1})
+    prices = np.array([100.0, 100.0])
+    trades = [
+        Trade({"AAPL" if k % 2 else "MSFT": 1}, stop_loss=0.1) for k in range(500)
+    ]
+    for trade in trades:
+        book.add(trade, prices, 0)
+    ## Removing most trades compacts the book, renumbering the legs.
+    for trade in trades[:-3]:
+        book.remove(trade)
+
+    assert len(book) == 3
+    assert trades[0] not in book
+    assert book.triggered(np.array([85.0, 100.0]), 1) == [trades[-3], trades[-1]]
+    assert book.triggered(np.array([85.0, 85.0]), 2) == [trades[-2]]
+
+
+def test_MaxHoldingPeriod_ClosesEveryTradeOnTheSameTick(context):
+
+    trader = SimulatedTrader(context, 100000)
+    trades = [Trade({"AAPL": 1}, max_holding_period=2) for _ in range(3)]
+    for trade in trades:
+        trader.submit_trade(trade)
+
+    context.update()
+    context.update()
+    assert len(trader.open_trades) == 3
+
+    context.update()
+    context.update()
+
+    assert len(trader.open_trades) == 0
+    assert trader.closed_trades == trades
+    assert all(trade.status == Trade.Status.COMPLETE for trade in trades)
+    assert trader.broker.all_positions == {}
+
+
+def test_LiquidateAllPositions_ClosesEveryTrade(context):
+
+    trader = SimulatedTrader(context, 100000)
+    trades = [
+        Trade({"AAPL": 1}, stop_loss=0.5),
+        Trade({"MSFT": 1}),
+        Trade({"AAPL": -1}),
+    ]
+    for trade in trades:
+        trader.submit_trade(trade)
+
+    trader.liquidate_all_positions()
+
+    assert len(trader.open_trades) == 0
+    assert len(trader.closed_trades) == 3
+    assert trader.broker.all_positions == {}
@@ -0,0 +1,110 @@
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from palm.context import ContextEOD, Schedule
+from palm.data import TradingCalendar, synthetic_equity_eod, to_day_number
+
+
+@pytest.fixture
+def eod_data():
+    ## Business days from Monday 2020-01-06.
+    return synthetic_equity_eod(n_days=60, n_symbols=3, start_date="2020-01-06")
+
+
+def test_DayNumbers_DaysSinceTheEpochWhateverTheType():
+
+    assert to_day_number(date(1970, 1, 2)) == 1
+    assert to_day_number(datetime(2020, 1, 6, 16, 30)) == 18267
+    assert to_day_number(pd.Timestamp("2020-01-06 23:59")) == 18267
+    assert to_day_number(pd.Timestamp("2020-01-06 23:59", tz="US/Eastern")) == 18267
+    assert to_day_number(np.datetime64("2020-01-06T12:00")) == 18267
+    assert to_day_number("2020-01-06") == 18267
+
+
+def test_IndexOf_RowOfTheDayWhateverTheTime(eod_data):
+
+    calendar = eod_data.calendar
+    assert calendar is eod_data.calendar
+    assert len(calendar) == 60
+    assert calendar.index_of(datetime(2020, 1, 6)) == 0
+    assert calendar.index_of(datetime(2020, 1, 13, 15, 45)) == 5
+    assert datetime(2020, 1, 13) in calendar
+    assert datetime(2020, 1, 11) not in calendar
+    with pytest.raises(ValueError):
+        calendar.index_of(datetime(2020, 1, 11))
+
+
+def test_IndicesOf_SameAsIndexOfEach(eod_data):
+
+    calendar = eod_data.calendar
+    dates = ["2020-01-07", "2020-02-03", "2020-01-06"]
+    assert list(calendar.indices_of(dates)) == [
+        calendar.index_of(day) for day in dates
+    ]
+    with pytest.raises(ValueError):
+        calendar.indices_of(["2020-01-07", "2020-01-12"])
+
+
+def test_OnOrAfter_RollsToTheNextTradingDay(eod_data):
+
+    calendar = eod_data.calendar
+    ## Saturday 2020-01-11.
+    assert calendar.index_on_or_after(datetime(2020, 1, 11)) == 5
+    assert calendar.index_on_or_after(datetime(2020, 1, 10, 18)) == 4
+    assert calendar.index_on_or_after(datetime(2019, 12, 31)) == 0
+    assert calendar.index_on_or_after(datetime(2021, 1, 1)) == 60
+
+
+def test_Slice_SameRowsAsComparingEveryDay(eod_data):
+
+    dates = eod_data["dates"]
+    days = dates.normalize()
+    for (from_date, to_date) in [
+        (datetime(2020, 1, 11), datetime(2020, 2, 1)),
+        (dates[3], dates[17]),
+        (datetime(2020, 1, 7, 23), datetime(2020, 1, 14, 23)),
+        (datetime(2019, 1, 1), datetime(2030, 1, 1)),
+        (datetime(2020, 2, 1), datetime(2020, 1, 1)),
+    ]:
+        from_day = pd.Timestamp(from_date).normalize()
+        to_day = pd.Timestamp(to_date).normalize()
+        rows = np.flatnonzero((days >= from_day) & (days < to_day))
+        sliced = eod_data.slice(from_date, to_date)
+        assert (sliced["dates"] == dates[rows]).all()
+
+
+def test_Slice_CalendarOfTheSlicedRows(eod_data):
+
+    sliced = eod_data.slice(datetime(2020, 1, 13), datetime(2020, 2, 3))
+
+    assert sliced.shape == (15, 3)
+    assert np.array_equal(sliced["close"], eod_data["close"][5:20])
+    assert np.array_equal(
+        sliced.calendar.days, TradingCalendar(sliced["dates"]).days
+    )
+    assert sliced.calendar.index_of(datetime(2020, 1, 13)) == 0
+
+
+def test_UnsortedDates_ValueErrorRaised():
+    with pytest.raises(ValueError):
+        TradingCalendar(pd.DatetimeIndex(["2020-01-07", "2020-01-06"]))
+
+
+def test_ContextStartDate_ResolvedThroughTheCalendar(eod_data):
+
+    context = ContextEOD(eod_data, start_date=datetime(2020, 1, 13))
+    assert context.current_date_index() == 5
+    with pytest.raises(ValueError):
+        ContextEOD(eod_data, start_date=datetime(2020, 1, 12))
+
+
+def test_DateListSchedule_NonTradingDay_ValueErrorRaised(eod_data):
+
+    dates = eod_data["dates"]
+    ticks = Schedule.on_dates(["2020-01-13", "2020-01-06"]).compile(dates)
+    assert list(ticks) == [1, 11]
+    with pytest.raises(ValueError):
+        Schedule.on_dates(["2020-01-12"]).compile(dates)